@@ -1,208 +1,428 @@
+import bisect
+import threading
+
 import flet as ft
 from database import (
-    update_contact_db, delete_contact_db, add_contact_db, 
-    get_all_contacts_db, toggle_favorite_db
+    search_contacts_db, count_contacts_db, list_sort_key,
+    HIGHLIGHT_START, HIGHLIGHT_END, PAGE_SIZE
 )
+from search_pipeline import search_tokens, filter_rows
+from contact_store import validate_contact
+from contact_import import import_file
+
+def highlight_spans(snippet):
+    """Split an FTS snippet into text spans, with matched words in bold."""
+    spans = []
+    for i, part in enumerate(snippet.replace(HIGHLIGHT_END, HIGHLIGHT_START).split(HIGHLIGHT_START)):
+        if part:
+            bold = i % 2 == 1
+            spans.append(ft.TextSpan(
+                part,
+                ft.TextStyle(weight=ft.FontWeight.BOLD, color=ft.colors.BLUE_700) if bold else None
+            ))
+    return spans
+
+def display_contacts(page, contacts_list_view, store, search_term='', category_filter='All', update_count_callback=None, results=None):
+    """Display contacts with enhanced UI using cards.
 
-def display_contacts(page, contacts_list_view, db_conn, search_term='', category_filter='All', update_count_callback=None):
-    """Display contacts with enhanced UI using cards"""
+    Only the first page is built here; ContactListLoader appends further
+    pages as the list is scrolled towards its end. Listings come from the
+    ContactStore; ``results`` are search rows already fetched by the
+    SearchPipeline.
+    """
     contacts_list_view.controls.clear()
-    contacts = get_all_contacts_db(db_conn, search_term, category_filter)
+    prefetched = results.rows if results is not None and results.rows is not None else None
+    loader = ContactListLoader(
+        page, contacts_list_view, store, search_term, category_filter, update_count_callback,
+        prefetched, results.complete if prefetched is not None else False
+    )
+    # The newest loader owns the list; pages still loading for an older filter are dropped.
+    contacts_list_view.data = loader
+    contacts_list_view.on_scroll = loader.handle_scroll
+    contacts_list_view.on_scroll_interval = 100
+    if not search_term:
+        total = store.count(category_filter)
+    elif prefetched is not None and results.complete:
+        total = len(prefetched)
+    else:
+        total = count_contacts_db(store.db_conn, search_term, category_filter)
+    loader.total = total
     
     # Update contact count
     if update_count_callback:
-        count_text = f"{len(contacts)} contact{'s' if len(contacts) != 1 else ''}"
-        # Find and update the contact count display
-        for control in page.controls:
-            if hasattr(control, 'content') and hasattr(control.content, 'controls'):
-                for row in control.content.controls:
-                    if hasattr(row, 'controls'):
-                        for item in row.controls:
-                            if hasattr(item, 'controls'):
-                                for subitem in item.controls:
-                                    if hasattr(subitem, 'content') and hasattr(subitem.content, 'value'):
-                                        if 'contact' in str(subitem.content.value):
-                                            subitem.content.value = count_text
-                                            page.update()
-                                            break
-
-    if not contacts:
-        empty_state = ft.Container(
+        update_count_callback(total)
+
+    if not total:
+        loader.exhausted = True
+        loader.show_empty()
+        page.update()
+        return
+
+    loader.load_more()
+
+def build_empty_state(search_term='', category_filter='All'):
+    empty_state = ft.Container(
+        content=ft.Column([
+            ft.Icon(
+                ft.icons.PEOPLE_OUTLINE,
+                size=80,
+                color=ft.colors.GREY_400
+            ),
+            ft.Text(
+                "No contacts found" if search_term or category_filter != 'All' else "No contacts yet",
+                size=18,
+                color=ft.colors.GREY_600,
+                text_align=ft.TextAlign.CENTER
+            ),
+            ft.Text(
+                "Add your first contact to get started!" if not search_term and category_filter == 'All' else "Try adjusting your search or filter",
+                size=14,
+                color=ft.colors.GREY_500,
+                text_align=ft.TextAlign.CENTER
+            )
+        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+        alignment=ft.alignment.center,
+        padding=40
+    )
+    return empty_state
+
+def build_contact_card(page, contact, store, contacts_list_view, search_term='', category_filter='All', update_count_callback=None, snippet=None):
+    """Card for one contact row; ``snippet`` is the highlighted search match, if any."""
+    contact_id, name, phone, email, address, category, notes, favorite = contact
+    
+    # Category icons and colors
+    category_config = {
+        'Family': {'icon': ft.icons.FAMILY_RESTROOM, 'color': ft.colors.PINK_400},
+        'Friends': {'icon': ft.icons.PEOPLE, 'color': ft.colors.GREEN_400},
+        'Work': {'icon': ft.icons.WORK, 'color': ft.colors.BLUE_400},
+        'Other': {'icon': ft.icons.PERSON, 'color': ft.colors.GREY_400}
+    }
+    
+    config = category_config.get(category, category_config['Other'])
+    
+    # Create contact card
+    contact_card = ft.Card(
+        content=ft.Container(
             content=ft.Column([
-                ft.Icon(
-                    ft.icons.PEOPLE_OUTLINE,
-                    size=80,
-                    color=ft.colors.GREY_400
-                ),
-                ft.Text(
-                    "No contacts found" if search_term or category_filter != 'All' else "No contacts yet",
-                    size=18,
-                    color=ft.colors.GREY_600,
-                    text_align=ft.TextAlign.CENTER
-                ),
-                ft.Text(
-                    "Add your first contact to get started!" if not search_term and category_filter == 'All' else "Try adjusting your search or filter",
-                    size=14,
-                    color=ft.colors.GREY_500,
-                    text_align=ft.TextAlign.CENTER
-                )
-            ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
-            alignment=ft.alignment.center,
-            padding=40
-        )
-        contacts_list_view.controls.append(empty_state)
-    else:
-        for contact in contacts:
-            contact_id, name, phone, email, address, category, notes, favorite = contact
-            
-            # Category icons and colors
-            category_config = {
-                'Family': {'icon': ft.icons.FAMILY_RESTROOM, 'color': ft.colors.PINK_400},
-                'Friends': {'icon': ft.icons.PEOPLE, 'color': ft.colors.GREEN_400},
-                'Work': {'icon': ft.icons.WORK, 'color': ft.colors.BLUE_400},
-                'Other': {'icon': ft.icons.PERSON, 'color': ft.colors.GREY_400}
-            }
-            
-            config = category_config.get(category, category_config['Other'])
-            
-            # Create contact card
-            contact_card = ft.Card(
-                content=ft.Container(
-                    content=ft.Column([
-                        # Header row with avatar and favorite
-                        ft.Row([
-                            ft.Container(
-                                content=ft.Stack([
-                                    ft.CircleAvatar(
-                                        content=ft.Icon(
-                                            config['icon'],
-                                            size=24,
-                                            color=ft.colors.WHITE
-                                        ),
-                                        bgcolor=config['color'],
-                                        radius=25
-                                    ),
-                                    ft.Container(
-                                        content=ft.Icon(
-                                            ft.icons.STAR,
-                                            size=16,
-                                            color=ft.colors.ORANGE
-                                        ),
-                                        visible=bool(favorite),
-                                        top=-5,
-                                        right=-5,
-                                        bgcolor=ft.colors.WHITE,
-                                        border_radius=10,
-                                        padding=2
-                                    )
-                                ]),
-                                width=60,
-                                height=60
-                            ),
-                            ft.Expanded(
-                                child=ft.Column([
-                                    ft.Text(
-                                        name,
-                                        size=18,
-                                        weight=ft.FontWeight.BOLD,
-                                        color=ft.colors.GREY_800
-                                    ),
-                                    ft.Text(
-                                        f"📱 {phone}",
-                                        size=14,
-                                        color=ft.colors.GREY_600
-                                    ),
-                                    ft.Text(
-                                        f"📧 {email}" if email else "📧 No email",
-                                        size=12,
-                                        color=ft.colors.GREY_500
-                                    ) if email else ft.Container()
-                                ], spacing=2)
+                # Header row with avatar and favorite
+                ft.Row([
+                    ft.Container(
+                        content=ft.Stack([
+                            ft.CircleAvatar(
+                                content=ft.Icon(
+                                    config['icon'],
+                                    size=24,
+                                    color=ft.colors.WHITE
+                                ),
+                                bgcolor=config['color'],
+                                radius=25
                             ),
                             ft.Container(
-                                content=ft.Chip(
-                                    label=ft.Text(category, size=12),
-                                    bgcolor=config['color'],
-                                    color=ft.colors.WHITE
+                                content=ft.Icon(
+                                    ft.icons.STAR,
+                                    size=16,
+                                    color=ft.colors.ORANGE
                                 ),
-                                alignment=ft.alignment.top_right
+                                visible=bool(favorite),
+                                top=-5,
+                                right=-5,
+                                bgcolor=ft.colors.WHITE,
+                                border_radius=10,
+                                padding=2
                             )
-                        ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
-                        
-                        # Additional info (if available)
-                        ft.Column([
-                            ft.Row([
-                                ft.Icon(ft.icons.HOME, size=16, color=ft.colors.GREY_500),
-                                ft.Text(address, size=12, color=ft.colors.GREY_600)
-                            ]) if address else ft.Container(),
-                            ft.Row([
-                                ft.Icon(ft.icons.NOTES, size=16, color=ft.colors.GREY_500),
-                                ft.Text(notes, size=12, color=ft.colors.GREY_600, italic=True)
-                            ]) if notes else ft.Container()
-                        ], spacing=5),
-                        
-                        # Action buttons
-                        ft.Row([
-                            ft.IconButton(
-                                icon=ft.icons.STAR if favorite else ft.icons.STAR_BORDER,
-                                icon_color=ft.colors.ORANGE if favorite else ft.colors.GREY_400,
-                                tooltip="Toggle Favorite",
-                                on_click=lambda e, cid=contact_id: toggle_favorite(page, cid, db_conn, contacts_list_view, search_term, category_filter, update_count_callback)
-                            ),
-                            ft.IconButton(
-                                icon=ft.icons.VISIBILITY,
-                                icon_color=ft.colors.BLUE_600,
-                                tooltip="View Details",
-                                on_click=lambda e, c=contact: show_contact_details(page, c, db_conn, contacts_list_view, search_term, category_filter, update_count_callback)
-                            ),
-                            ft.IconButton(
-                                icon=ft.icons.EDIT,
-                                icon_color=ft.colors.GREEN_600,
-                                tooltip="Edit Contact",
-                                on_click=lambda e, c=contact: open_edit_dialog(page, c, db_conn, contacts_list_view, search_term, category_filter, update_count_callback)
+                        ]),
+                        width=60,
+                        height=60
+                    ),
+                    ft.Expanded(
+                        child=ft.Column([
+                            ft.Text(
+                                name,
+                                size=18,
+                                weight=ft.FontWeight.BOLD,
+                                color=ft.colors.GREY_800
                             ),
-                            ft.IconButton(
-                                icon=ft.icons.DELETE,
-                                icon_color=ft.colors.RED_600,
-                                tooltip="Delete Contact",
-                                on_click=lambda e, cid=contact_id, cname=name: confirm_delete_contact(page, cid, cname, db_conn, contacts_list_view, search_term, category_filter, update_count_callback)
+                            ft.Text(
+                                f"📱 {phone}",
+                                size=14,
+                                color=ft.colors.GREY_600
                             ),
-                        ], alignment=ft.MainAxisAlignment.END)
-                    ], spacing=10),
-                    padding=15
-                ),
-                elevation=3,
-                margin=ft.margin.only(bottom=10)
+                            ft.Text(
+                                f"📧 {email}" if email else "📧 No email",
+                                size=12,
+                                color=ft.colors.GREY_500
+                            ) if email else ft.Container(),
+                            ft.Text(
+                                spans=highlight_spans(snippet),
+                                size=12,
+                                color=ft.colors.GREY_600
+                            ) if snippet else ft.Container()
+                        ], spacing=2)
+                    ),
+                    ft.Container(
+                        content=ft.Chip(
+                            label=ft.Text(category, size=12),
+                            bgcolor=config['color'],
+                            color=ft.colors.WHITE
+                        ),
+                        alignment=ft.alignment.top_right
+                    )
+                ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                
+                # Additional info (if available)
+                ft.Column([
+                    ft.Row([
+                        ft.Icon(ft.icons.HOME, size=16, color=ft.colors.GREY_500),
+                        ft.Text(address, size=12, color=ft.colors.GREY_600)
+                    ]) if address else ft.Container(),
+                    ft.Row([
+                        ft.Icon(ft.icons.NOTES, size=16, color=ft.colors.GREY_500),
+                        ft.Text(notes, size=12, color=ft.colors.GREY_600, italic=True)
+                    ]) if notes else ft.Container()
+                ], spacing=5),
+                
+                # Action buttons
+                ft.Row([
+                    ft.IconButton(
+                        icon=ft.icons.STAR if favorite else ft.icons.STAR_BORDER,
+                        icon_color=ft.colors.ORANGE if favorite else ft.colors.GREY_400,
+                        tooltip="Toggle Favorite",
+                        on_click=lambda e, cid=contact_id: toggle_favorite(page, cid, store, contacts_list_view, search_term, category_filter, update_count_callback)
+                    ),
+                    ft.IconButton(
+                        icon=ft.icons.VISIBILITY,
+                        icon_color=ft.colors.BLUE_600,
+                        tooltip="View Details",
+                        on_click=lambda e, c=contact: show_contact_details(page, c, store, contacts_list_view, search_term, category_filter, update_count_callback)
+                    ),
+                    ft.IconButton(
+                        icon=ft.icons.EDIT,
+                        icon_color=ft.colors.GREEN_600,
+                        tooltip="Edit Contact",
+                        on_click=lambda e, c=contact: open_edit_dialog(page, c, store, contacts_list_view, search_term, category_filter, update_count_callback)
+                    ),
+                    ft.IconButton(
+                        icon=ft.icons.DELETE,
+                        icon_color=ft.colors.RED_600,
+                        tooltip="Delete Contact",
+                        on_click=lambda e, cid=contact_id, cname=name: confirm_delete_contact(page, cid, cname, store, contacts_list_view, search_term, category_filter, update_count_callback)
+                    ),
+                ], alignment=ft.MainAxisAlignment.END)
+            ], spacing=10),
+            padding=15
+        ),
+        elevation=3,
+        margin=ft.margin.only(bottom=10),
+        data=contact
+    )
+    return contact_card
+
+class ContactListLoader:
+    """Feeds a contact ListView one page at a time.
+
+    Listings are sliced from the ContactStore after the sort key of the
+    last row shown. Ranked search results come from SQLite and continue by
+    offset, after any rows the search pipeline already fetched have been
+    shown. The Flutter ListView only builds the cards near the viewport;
+    this keeps the server from creating and sending the rest until the
+    user scrolls towards them.
+    """
+
+    LOAD_AHEAD = 800  # Pixels before the end of the list at which the next page is fetched
+
+    def __init__(self, page, contacts_list_view, store, search_term='', category_filter='All', update_count_callback=None,
+                 prefetched=None, complete=False):
+        self.page = page
+        self.contacts_list_view = contacts_list_view
+        self.store = store
+        self.search_term = search_term
+        self.category_filter = category_filter
+        self.update_count_callback = update_count_callback
+        self.prefetched = prefetched or []
+        self.complete = complete
+        self.after = None  # list_sort_key() of the last listed contact
+        self.offset = 0
+        self.exhausted = False
+        self.total = 0
+        self.cards = {}  # contact id -> its card, for every card in the list
+        self.empty_state = None
+        self.lock = threading.Lock()
+
+    def fetch_page(self):
+        """Next page of contact rows and their search snippets."""
+        if self.offset < len(self.prefetched) or self.complete:
+            matches = self.prefetched[self.offset:self.offset + PAGE_SIZE]
+            self.offset += len(matches)
+            contacts = [row[:8] for row in matches]
+            snippets = {row[0]: row[8] for row in matches}
+            if self.complete and self.offset >= len(self.prefetched):
+                self.exhausted = True
+            return contacts, snippets
+        if self.search_term:
+            matches = search_contacts_db(self.store.db_conn, self.search_term, self.category_filter, PAGE_SIZE, self.offset)
+            self.offset += len(matches)
+            contacts = [row[:8] for row in matches]
+            snippets = {row[0]: row[8] for row in matches}
+        else:
+            contacts = self.store.page(self.category_filter, self.after)
+            if contacts:
+                self.after = list_sort_key(contacts[-1])
+            snippets = {}
+        if len(contacts) < PAGE_SIZE:
+            self.exhausted = True
+        return contacts, snippets
+
+    def load_more(self):
+        # Scroll events arrive on worker threads; one page at a time is enough.
+        if self.exhausted or not self.lock.acquire(blocking=False):
+            return
+        try:
+            contacts, snippets = self.fetch_page()
+            if self.contacts_list_view.data is not self:
+                return
+            self.contacts_list_view.controls.extend(
+                self.build_card(contact, snippets.get(contact[0])) for contact in contacts
             )
-            
-            contacts_list_view.controls.append(contact_card)
-    
-    page.update()
+            self.page.update()
+        finally:
+            self.lock.release()
+
+    def build_card(self, contact, snippet=None):
+        card = build_contact_card(
+            self.page, contact, self.store, self.contacts_list_view,
+            self.search_term, self.category_filter, self.update_count_callback, snippet
+        )
+        self.cards[contact[0]] = card
+        return card
+
+    def show_empty(self):
+        self.empty_state = build_empty_state(self.search_term, self.category_filter)
+        self.contacts_list_view.controls.append(self.empty_state)
+
+    def snippet_for(self, contact):
+        """The card snippet for a contact, or False if it does not belong in this list."""
+        if contact is None or (self.category_filter != 'All' and contact[5] != self.category_filter):
+            return False
+        tokens = search_tokens(self.search_term)
+        if not tokens:
+            return None
+        matches = filter_rows([contact], tokens)
+        return matches[0][8] if matches else False
+
+    def apply(self, contact, old):
+        """Show one store change by patching only the affected card.
+
+        ``contact`` and ``old`` are the row after and before the change,
+        None for an added or removed contact. The card is rebuilt in place,
+        moved if its place in the list order changed, inserted if the
+        contact now falls within the loaded pages, or removed if it no
+        longer belongs to this list. The caller sends the change with one
+        page.update(). Returns False when the list must be redisplayed
+        instead, because ranked search results cannot place a contact
+        without its bm25 score.
+        """
+        contact_id = (contact or old)[0]
+        with self.lock:
+            if self.contacts_list_view.data is not self:
+                return True
+            card = self.cards.get(contact_id)
+            snippet = self.snippet_for(contact)
+            if self.search_term:
+                if card is None:
+                    # A new or changed match would need its rank to be placed.
+                    return snippet is False and self.snippet_for(old) is False
+                if snippet is not False and not self.complete and self.may_reorder(card.data, contact):
+                    return False
+            controls = self.contacts_list_view.controls
+            if snippet is False:
+                if card is not None:
+                    controls.remove(card)
+                    del self.cards[contact_id]
+                    self.removed(card.data)
+            elif self.search_term:
+                # bm25 ranks are not known here, so search results stay in place.
+                controls[controls.index(card)] = self.build_card(contact, snippet)
+            else:
+                self.move(card, contact)
+            if not self.search_term:
+                self.total = self.store.count(self.category_filter)
+            empty = not self.cards
+
+        if self.update_count_callback:
+            self.update_count_callback(self.total)
+        if empty and self.exhausted and self.empty_state is None:
+            self.show_empty()
+        elif empty:
+            self.load_more()
+        return True
+
+    def may_reorder(self, old, new):
+        """Whether a search result's rank can change (favorite or indexed text)."""
+        return any(old[i] != new[i] for i in (1, 2, 3, 6, 7))
 
-def add_contact(page, inputs, contacts_list_view, db_conn, update_count_callback=None, refresh_callback=None):
+    def removed(self, contact):
+        """Keep paging consistent once a shown contact has left the list."""
+        if self.search_term:
+            # The search now has one row fewer before the next page.
+            self.total -= 1
+            self.prefetched = [row for row in self.prefetched if row[0] != contact[0]]
+            self.offset -= 1
+        else:
+            controls = self.contacts_list_view.controls
+            self.after = list_sort_key(controls[-1].data) if self.cards else None
+
+    def move(self, card, contact):
+        """Put ``contact``'s card in list order, re-sorting only if its order changed."""
+        controls = self.contacts_list_view.controls
+        key = list_sort_key(contact)
+        if card is not None:
+            index = controls.index(card)
+            in_order = (
+                (index == 0 or list_sort_key(controls[index - 1].data) < key)
+                and (index == len(controls) - 1 or key < list_sort_key(controls[index + 1].data))
+            )
+            if in_order:
+                controls[index] = self.build_card(contact)
+                return
+            controls.pop(index)
+            del self.cards[contact[0]]
+        if self.empty_state is not None:
+            controls.remove(self.empty_state)
+            self.empty_state = None
+        position = bisect.bisect_left([list_sort_key(card.data) for card in controls], key)
+        if position < len(controls) or self.exhausted:
+            controls.insert(position, self.build_card(contact))
+        # Otherwise it sorts after the loaded pages, and a later page brings it in.
+        self.after = list_sort_key(controls[-1].data) if controls else None
+
+    def handle_scroll(self, e):
+        if e.max_scroll_extent - e.pixels < self.LOAD_AHEAD:
+            self.load_more()
+
+def show_contact_change(page, contacts_list_view, event, contact, old):
+    """ContactStore listener: patch the list for one change, or redisplay it."""
+    loader = contacts_list_view.data
+    if isinstance(loader, ContactListLoader) and (event == 'imported' or not loader.apply(contact, old)):
+        display_contacts(
+            page, contacts_list_view, loader.store, loader.search_term, loader.category_filter, loader.update_count_callback
+        )
+
+def add_contact(page, inputs, contacts_list_view, store, update_count_callback=None, refresh_callback=None):
     """Add a new contact with validation"""
     name_input, phone_input, email_input, address_input, category_input, notes_input = inputs
     
     # Validation
-    if not name_input.value or not name_input.value.strip():
-        show_snack_bar(page, "Name is required!", ft.colors.RED)
+    try:
+        fields = validate_contact(
+            name_input.value, phone_input.value, email_input.value,
+            address_input.value, category_input.value, notes_input.value
+        )
+    except ValueError as error:
+        show_snack_bar(page, str(error), ft.colors.RED)
         return
     
-    if not phone_input.value or not phone_input.value.strip():
-        show_snack_bar(page, "Phone number is required!", ft.colors.RED)
-        return
-    
-    # Add contact to database
-    add_contact_db(
-        db_conn,
-        name_input.value.strip(),
-        phone_input.value.strip(),
-        email_input.value.strip() if email_input.value else '',
-        address_input.value.strip() if address_input.value else '',
-        category_input.value if category_input.value else 'Other',
-        notes_input.value.strip() if notes_input.value else '',
-        0  # favorite
-    )
+    # Add contact through the store; its listeners show the new card
+    store.add(*fields)
     
     # Clear form
     for field in inputs:
@@ -214,19 +434,56 @@ def add_contact(page, inputs, contacts_list_view, db_conn, update_count_callback
     if refresh_callback:
         refresh_callback()
     
-    show_snack_bar(page, f"Contact '{name_input.value}' added successfully!", ft.colors.GREEN)
+    show_snack_bar(page, f"Contact '{fields[0]}' added successfully!", ft.colors.GREEN)
+    page.update()
+
+def import_contacts(page, path, store, progress_bar, status_text, import_button):
+    """Import a CSV or vCard file on a worker thread, showing its progress."""
+    def report(progress):
+        progress_bar.value = progress.fraction
+        status_text.value = (
+            f"{progress.imported:,} imported, {progress.skipped:,} skipped "
+            f"({progress.rate:,.0f} rows/s)"
+        )
+        page.update()
+
+    def run():
+        try:
+            progress = import_file(store, path, report)
+        except (OSError, ValueError) as error:
+            status_text.value = f"Import failed: {error}"
+            show_snack_bar(page, "Import failed, no contacts were added", ft.colors.RED)
+        else:
+            status_text.value = (
+                f"Imported {progress.imported:,} contacts in {progress.elapsed:.1f} s "
+                f"({progress.rate:,.0f} rows/s), skipped {progress.skipped:,}"
+            )
+            status_text.tooltip = "\n".join(progress.errors) or None
+            show_snack_bar(page, f"Imported {progress.imported:,} contacts", ft.colors.GREEN)
+        finally:
+            progress_bar.visible = False
+            import_button.disabled = False
+            page.update()
+
+    import_button.disabled = True
+    progress_bar.value = None  # Indeterminate until the first batch lands
+    progress_bar.visible = True
+    status_text.value = f"Importing {path}..."
+    status_text.tooltip = None
     page.update()
+    # The import has its own connection: the list, search and edits stay usable
+    # while the rows stream in, and edits only wait for its final copy.
+    threading.Thread(target=run, daemon=True).start()
 
-def toggle_favorite(page, contact_id, db_conn, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
+def toggle_favorite(page, contact_id, store, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
     """Toggle favorite status of a contact"""
-    toggle_favorite_db(db_conn, contact_id)
-    display_contacts(page, contacts_list_view, db_conn, search_term, category_filter, update_count_callback)
+    store.toggle_favorite(contact_id)
+    page.update()
 
-def confirm_delete_contact(page, contact_id, contact_name, db_conn, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
+def confirm_delete_contact(page, contact_id, contact_name, store, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
     """Show confirmation dialog before deleting contact"""
     def delete_confirmed(e):
-        delete_contact_db(db_conn, contact_id)
-        display_contacts(page, contacts_list_view, db_conn, search_term, category_filter, update_count_callback)
+        store.delete(contact_id)
         dialog.open = False
         page.update()
         show_snack_bar(page, f"Contact '{contact_name}' deleted successfully!", ft.colors.ORANGE)
@@ -279,7 +536,7 @@ def confirm_delete_contact(page, contact_id, contact_name, db_conn, contacts_lis
     dialog.open = True
     page.update()
 
-def open_edit_dialog(page, contact, db_conn, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
+def open_edit_dialog(page, contact, store, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
     """Open edit dialog for contact"""
     contact_id, name, phone, email, address, category, notes, favorite = contact
     
@@ -303,30 +560,20 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view, search_term='',
     edit_favorite = ft.Checkbox(label="Favorite Contact", value=bool(favorite))
 
     def save_changes(e):
-        if not edit_name.value or not edit_name.value.strip():
-            show_snack_bar(page, "Name is required!", ft.colors.RED)
-            return
-        
-        if not edit_phone.value or not edit_phone.value.strip():
-            show_snack_bar(page, "Phone number is required!", ft.colors.RED)
+        try:
+            fields = validate_contact(
+                edit_name.value, edit_phone.value, edit_email.value, edit_address.value,
+                edit_category.value, edit_notes.value, edit_favorite.value
+            )
+        except ValueError as error:
+            show_snack_bar(page, str(error), ft.colors.RED)
             return
         
-        update_contact_db(
-            db_conn,
-            contact_id,
-            edit_name.value.strip(),
-            edit_phone.value.strip(),
-            edit_email.value.strip() if edit_email.value else '',
-            edit_address.value.strip() if edit_address.value else '',
-            edit_category.value if edit_category.value else 'Other',
-            edit_notes.value.strip() if edit_notes.value else '',
-            1 if edit_favorite.value else 0
-        )
+        store.update(contact_id, *fields)
         
         dialog.open = False
         page.update()
-        display_contacts(page, contacts_list_view, db_conn, search_term, category_filter, update_count_callback)
-        show_snack_bar(page, f"Contact '{edit_name.value}' updated successfully!", ft.colors.GREEN)
+        show_snack_bar(page, f"Contact '{fields[0]}' updated successfully!", ft.colors.GREEN)
 
     def cancel_edit(e):
         dialog.open = False
@@ -372,7 +619,7 @@ def open_edit_dialog(page, contact, db_conn, contacts_list_view, search_term='',
     dialog.open = True
     page.update()
 
-def show_contact_details(page, contact, db_conn, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
+def show_contact_details(page, contact, store, contacts_list_view, search_term='', category_filter='All', update_count_callback=None):
     """Show detailed view of contact"""
     contact_id, name, phone, email, address, category, notes, favorite = contact
     
@@ -0,0 +1,194 @@
+import csv
+import os
+import re
+import time
+
+from contact_store import validate_contact, CATEGORIES
+
+BATCH_SIZE = 5000  # Rows per executemany; progress is reported after each batch
+MAX_ERRORS = 20    # Skipped rows whose reasons are kept for the report
+
+# Normalized CSV header -> contact field. Covers our own export and the
+# common address book exports (Google, Outlook).
+CSV_HEADERS = {
+    'name': 'name', 'fullname': 'name', 'displayname': 'name',
+    'firstname': 'first_name', 'givenname': 'first_name',
+    'lastname': 'last_name', 'familyname': 'last_name',
+    'phone': 'phone', 'phonenumber': 'phone', 'mobile': 'phone', 'mobilephone': 'phone',
+    'telephone': 'phone', 'tel': 'phone', 'phone1value': 'phone', 'primaryphone': 'phone',
+    'email': 'email', 'emailaddress': 'email', 'email1value': 'email',
+    'address': 'address', 'homeaddress': 'address', 'address1formatted': 'address',
+    'category': 'category', 'group': 'category', 'groupmembership': 'category', 'labels': 'category',
+    'notes': 'notes', 'note': 'notes',
+    'favorite': 'favorite', 'starred': 'favorite',
+}
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 'x', '*')
+
+
+class ImportProgress:
+    """Running totals of one import, handed to the progress callback."""
+
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []  # "Line N: reason" for the first MAX_ERRORS skipped rows
+        self.fraction = 0.0  # Share of the file read so far
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        """Imported rows per second."""
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+
+def _category(value):
+    """First known category named in a free-form group/category cell."""
+    for part in re.split(r"[,;:]", value or ''):
+        part = part.strip().lstrip('*').strip().capitalize()
+        if part in CATEGORIES:
+            return part
+    return 'Other'
+
+def read_csv(file):
+    """Yield (line number, contact fields) for every record of a CSV file."""
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = {}
+    for index, title in enumerate(header):
+        field = CSV_HEADERS.get(re.sub(r"[^a-z0-9]", '', title.lower()))
+        if field and field not in columns:
+            columns[field] = index
+    if 'name' not in columns and 'first_name' not in columns:
+        raise ValueError("The CSV file has no name column")
+    if 'phone' not in columns:
+        raise ValueError("The CSV file has no phone column")
+
+    for row in reader:
+        if not any(row):
+            continue  # Blank line
+        values = {field: row[index] if index < len(row) else '' for field, index in columns.items()}
+        name = values.get('name') or ' '.join(
+            part for part in (values.get('first_name'), values.get('last_name')) if part
+        )
+        yield reader.line_num, {
+            'name': name,
+            'phone': values['phone'],
+            'email': values.get('email', ''),
+            'address': values.get('address', ''),
+            'category': _category(values.get('category')),
+            'notes': values.get('notes', ''),
+            'favorite': (values.get('favorite') or '').strip().lower() in TRUE_VALUES,
+        }
+
+def _unescape(value):
+    return re.sub(r"\\(.)", lambda m: '\n' if m.group(1) in 'nN' else m.group(1), value)
+
+def _components(value):
+    """Split a structured vCard value (N, ADR) on its unescaped semicolons."""
+    return [_unescape(part).strip() for part in re.split(r"(?<!\\);", value)]
+
+def _vcard_fields(properties):
+    names = properties.get('N')
+    if properties.get('FN'):
+        name = _unescape(properties['FN'])
+    elif names:
+        parts = _components(names) + [''] * 5
+        name = ' '.join(part for part in (parts[3], parts[1], parts[2], parts[0], parts[4]) if part)
+    else:
+        name = ''
+    return {
+        'name': name,
+        'phone': _unescape(properties.get('TEL', '')),
+        'email': _unescape(properties.get('EMAIL', '')),
+        'address': ', '.join(part for part in _components(properties.get('ADR', '')) if part),
+        'category': _category(_unescape(properties.get('CATEGORIES', ''))),
+        'notes': _unescape(properties.get('NOTE', '')),
+        'favorite': False,
+    }
+
+def _unfold(file):
+    """Yield (line number, logical line), joining folded continuation lines."""
+    pending = None
+    for number, line in enumerate(file, start=1):
+        line = line.rstrip('\r\n')
+        if line[:1] in (' ', '\t') and pending is not None:
+            pending = (pending[0], pending[1] + line[1:])
+            continue
+        if pending is not None:
+            yield pending
+        pending = (number, line)
+    if pending is not None:
+        yield pending
+
+def read_vcards(file):
+    """Yield (line number, contact fields) for every card of a vCard file.
+
+    The file is read line by line, never held in memory. The first value of
+    a repeated property (several TEL or EMAIL lines) is the one kept.
+    """
+    properties = None
+    start = 0
+    for number, line in _unfold(file):
+        key, colon, value = line.partition(':')
+        if not colon:
+            continue
+        # "item1.TEL;TYPE=CELL" -> "TEL"
+        name = key.split(';', 1)[0].rsplit('.', 1)[-1].upper()
+        if name == 'BEGIN' and value.strip().upper() == 'VCARD':
+            properties, start = {}, number
+        elif name == 'END' and properties is not None:
+            yield start, _vcard_fields(properties)
+            properties = None
+        elif properties is not None:
+            properties.setdefault(name, value)
+
+def import_file(store, path, on_progress=None, batch_size=BATCH_SIZE):
+    """Stream a .csv or .vcf file into the contact store.
+
+    Rows are validated like the add form, and invalid ones are skipped and
+    counted. The rest are inserted in batches of ``batch_size``.
+    ``on_progress(progress)`` is called after every batch. Returns the
+    final ImportProgress; raises ValueError for a file that cannot be read
+    as contacts.
+    """
+    progress = ImportProgress()
+    size = os.path.getsize(path) or 1
+
+    with open(path, encoding='utf-8-sig', errors='replace', newline='') as file:
+        is_vcard = path.lower().endswith(('.vcf', '.vcard'))
+        records = read_vcards(file) if is_vcard else read_csv(file)
+
+        def batches():
+            batch = []
+            for line, fields in records:
+                try:
+                    batch.append(validate_contact(**fields))
+                except ValueError as error:
+                    progress.skipped += 1
+                    if len(progress.errors) < MAX_ERRORS:
+                        progress.errors.append(f"Line {line}: {error}")
+                    continue
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+            if batch:
+                yield batch
+
+        def batch_done(inserted):
+            progress.imported = inserted
+            progress.fraction = min(file.buffer.tell() / size, 1.0)
+            progress.elapsed = time.perf_counter() - progress.started
+            if on_progress:
+                on_progress(progress)
+
+        try:
+            store.import_contacts(batches(), batch_done)
+        except csv.Error as error:
+            raise ValueError(f"Malformed CSV: {error}") from error
+
+    progress.fraction = 1.0
+    progress.elapsed = time.perf_counter() - progress.started
+    return progress
@@ -0,0 +1,187 @@
+import bisect
+import heapq
+import threading
+from operator import itemgetter
+
+from db_engine import connect
+from database import (
+    get_all_contacts_db, add_contact_db, update_contact_db, toggle_favorite_db, delete_contact_db,
+    import_contacts_db, get_contacts_after_db, list_sort_key, PAGE_SIZE
+)
+
+CATEGORIES = ('Family', 'Friends', 'Work', 'Other')
+
+def validate_contact(name, phone, email='', address='', category='Other', notes='', favorite=0):
+    """Clean contact fields the way the contact forms do.
+
+    Returns the tuple of arguments for add(); raises ValueError with the
+    message to show when a required field is missing.
+    """
+    if not name or not name.strip():
+        raise ValueError("Name is required!")
+    if not phone or not phone.strip():
+        raise ValueError("Phone number is required!")
+    return (
+        name.strip(),
+        phone.strip(),
+        email.strip() if email else '',
+        address.strip() if address else '',
+        category if category in CATEGORIES else 'Other',
+        notes.strip() if notes else '',
+        1 if favorite else 0
+    )
+
+
+class ContactStore:
+    """Every contact in memory, kept in list order and written through to SQLite.
+
+    Contacts are read from the database once. The store keeps one sorted
+    view of all contacts and one per category, so listings, pages and
+    counts never touch the database. Writes go to database.py first and
+    then update the views. Writes are serialized by ``write_lock``, while
+    ``lock`` guards only the views, so reads never wait on the database.
+    Listeners registered with subscribe() are then called as
+    ``listener(event, contact, old)``, where ``event`` is 'added',
+    'updated' or 'removed' and ``contact`` / ``old`` are the rows after
+    and before the change (None where there is none). After a bulk import
+    the event is 'imported', with no rows.
+    """
+
+    def __init__(self, db_conn):
+        self.db_conn = db_conn
+        self.lock = threading.RLock()
+        self.write_lock = threading.Lock()
+        self.listeners = []
+        self.load()
+
+    def load(self):
+        with self.lock:
+            self.contacts = {}
+            self.views = {'All': []}  # category -> contact rows in LIST_ORDER
+            self.keys = {'All': []}   # category -> their list_sort_key(), for bisect
+            for contact in get_all_contacts_db(self.db_conn):
+                self.contacts[contact[0]] = contact
+                for view in ('All', contact[5]):
+                    self.views.setdefault(view, []).append(contact)
+                    self.keys.setdefault(view, []).append(list_sort_key(contact))
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+    def notify(self, event, contact, old=None):
+        for listener in self.listeners:
+            listener(event, contact, old)
+
+    # ---- Reads
+
+    def get(self, contact_id):
+        return self.contacts.get(contact_id)
+
+    def count(self, category_filter='All'):
+        return len(self.views.get(category_filter, ()))
+
+    def category_counts(self):
+        with self.lock:
+            return {category: self.count(category) for category in ('All',) + CATEGORIES}
+
+    def page(self, category_filter='All', after=None, limit=PAGE_SIZE):
+        """The next ``limit`` contacts after the list_sort_key() ``after``."""
+        with self.lock:
+            view = self.views.get(category_filter, [])
+            start = bisect.bisect_right(self.keys[category_filter], after) if after is not None and view else 0
+            return view[start:start + limit]
+
+    # ---- Writes
+
+    def add(self, name, phone, email, address='', category='Other', notes='', favorite=0):
+        with self.write_lock:
+            contact_id = add_contact_db(self.db_conn, name, phone, email, address, category, notes, favorite)
+            contact = (contact_id, name, phone, email, address, category, notes, 1 if favorite else 0)
+            with self.lock:
+                self._insert(contact)
+        self.notify('added', contact)
+        return contact
+
+    def update(self, contact_id, name, phone, email, address='', category='Other', notes='', favorite=0):
+        with self.write_lock:
+            update_contact_db(self.db_conn, contact_id, name, phone, email, address, category, notes, favorite)
+            contact = (contact_id, name, phone, email, address, category, notes, 1 if favorite else 0)
+            with self.lock:
+                old = self._remove(contact_id)
+                self._insert(contact)
+        self.notify('updated', contact, old)
+        return contact
+
+    def toggle_favorite(self, contact_id):
+        with self.write_lock:
+            toggle_favorite_db(self.db_conn, contact_id)
+            with self.lock:
+                old = self._remove(contact_id)
+                contact = old[:7] + (0 if old[7] else 1,)
+                self._insert(contact)
+        self.notify('updated', contact, old)
+        return contact
+
+    def delete(self, contact_id):
+        with self.write_lock:
+            delete_contact_db(self.db_conn, contact_id)
+            with self.lock:
+                old = self._remove(contact_id)
+        self.notify('removed', None, old)
+        return old
+
+    def import_contacts(self, batches, on_batch=None):
+        """Bulk insert through import_contacts_db(), then merge the new rows in.
+
+        The import runs on a connection of its own, so searches on the
+        shared one carry on, and writes only wait for its final copy. The
+        store stays readable throughout: the merged views are built aside,
+        holding off writes alone, and then swapped in under the lock.
+        """
+        import_conn = connect(self.db_conn.path)
+        try:
+            inserted, last_id = import_contacts_db(import_conn, batches, on_batch)
+            contacts = get_contacts_after_db(import_conn, last_id, inserted)
+        finally:
+            import_conn.close()
+        with self.write_lock:
+            views, keys = self._merged(contacts)
+            with self.lock:
+                self.contacts.update((contact[0], contact) for contact in contacts)
+                self.views.update(views)
+                self.keys.update(keys)
+        self.notify('imported', None)
+        return inserted
+
+    def _insert(self, contact):
+        self.contacts[contact[0]] = contact
+        key = list_sort_key(contact)
+        for view in ('All', contact[5]):
+            keys = self.keys.setdefault(view, [])
+            index = bisect.bisect_left(keys, key)
+            keys.insert(index, key)
+            self.views.setdefault(view, []).insert(index, contact)
+
+    def _merged(self, contacts):
+        """The views and keys that ``contacts`` change, with them sorted in."""
+        added = {}
+        for contact in contacts:
+            for view in ('All', contact[5]):
+                added.setdefault(view, []).append((list_sort_key(contact), contact))
+        views, keys = {}, {}
+        for view, pairs in added.items():
+            pairs.sort(key=itemgetter(0))
+            # The existing view is already sorted, so one merge pass places the new rows.
+            merged = list(heapq.merge(zip(self.keys.get(view, []), self.views.get(view, [])), pairs, key=itemgetter(0)))
+            keys[view] = [key for key, contact in merged]
+            views[view] = [contact for key, contact in merged]
+        return views, keys
+
+    def _remove(self, contact_id):
+        contact = self.contacts.pop(contact_id)
+        key = list_sort_key(contact)
+        for view in ('All', contact[5]):
+            index = bisect.bisect_left(self.keys[view], key)
+            del self.keys[view][index]
+            del self.views[view][index]
+        return contact
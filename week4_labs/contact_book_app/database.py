@@ -1,65 +1,342 @@
-import sqlite3
+import re
+import string
+import sys
 
-def init_db():
+from db_engine import connect, close
+
+CONTACT_COLUMNS = "id, name, phone, email, address, category, notes, favorite"
+JOINED_CONTACT_COLUMNS = "c.id, c.name, c.phone, c.email, c.address, c.category, c.notes, c.favorite"
+
+INSERT_CONTACT = "INSERT INTO contacts (name, phone, email, address, category, notes, favorite) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+# Bulk imports collect their rows here before copying them into `contacts`.
+# A TEMP table belongs to its connection, and writing it locks nothing else.
+IMPORT_STAGING = '''CREATE TEMP TABLE IF NOT EXISTS import_rows (
+            name TEXT, phone TEXT, email TEXT, address TEXT, category TEXT, notes TEXT, favorite INTEGER
+        )'''
+
+# Index maintenance that bulk imports suspend and redo once at the end.
+FTS_INSERT_TRIGGER = '''CREATE TRIGGER IF NOT EXISTS contacts_ai AFTER INSERT ON contacts BEGIN
+            INSERT INTO contacts_fts(rowid, name, phone, email, notes)
+            VALUES (new.id, new.name, new.phone, new.email, new.notes);
+        END'''
+ORDER_INDEXES = {
+    'idx_contacts_category_order': "CREATE INDEX IF NOT EXISTS idx_contacts_category_order ON contacts (category, favorite DESC, name COLLATE NOCASE)",
+    'idx_contacts_order': "CREATE INDEX IF NOT EXISTS idx_contacts_order ON contacts (favorite DESC, name COLLATE NOCASE)",
+}
+
+# Schema changes, applied in order; PRAGMA user_version records how many have run.
+MIGRATIONS = [
+    # 1: full-text index over the searchable fields. It is an external-content
+    # table, so the text lives only in `contacts`; triggers keep it in sync.
+    [
+        '''CREATE VIRTUAL TABLE IF NOT EXISTS contacts_fts USING fts5(
+            name, phone, email, notes,
+            content='contacts', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )''',
+        FTS_INSERT_TRIGGER,
+        '''CREATE TRIGGER IF NOT EXISTS contacts_ad AFTER DELETE ON contacts BEGIN
+            INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email, notes)
+            VALUES ('delete', old.id, old.name, old.phone, old.email, old.notes);
+        END''',
+        '''CREATE TRIGGER IF NOT EXISTS contacts_au AFTER UPDATE OF name, phone, email, notes ON contacts BEGIN
+            INSERT INTO contacts_fts(contacts_fts, rowid, name, phone, email, notes)
+            VALUES ('delete', old.id, old.name, old.phone, old.email, old.notes);
+            INSERT INTO contacts_fts(rowid, name, phone, email, notes)
+            VALUES (new.id, new.name, new.phone, new.email, new.notes);
+        END''',
+        # Index the rows that existed before this migration.
+        "INSERT INTO contacts_fts(contacts_fts) VALUES ('rebuild')",
+    ],
+    # 2: indexes matching the list order, with and without a category filter,
+    # so listings walk an index instead of sorting the table every time.
+    list(ORDER_INDEXES.values()),
+]
+
+# Favorites first, then case-insensitive by name; id breaks ties so the
+# order is total. Must stay in step with the indexes above.
+LIST_ORDER = "favorite DESC, name COLLATE NOCASE ASC, id ASC"
+PAGE_SIZE = 50
+
+# NOCASE folds ASCII letters only and then compares UTF-8 bytes, which is
+# code point order -- the same as comparing Python strings.
+_NOCASE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# A word as the unicode61 tokenizer sees it: letters and digits only, so
+# '_' and punctuation separate words ("john_doe" is "john" and "doe").
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# snippet() wraps matches in these so the UI can highlight them.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+def init_db(path='contacts.db'):
     """Initializes the database and creates the contacts table if it doesn't exist."""
-    conn = sqlite3.connect('contacts.db', check_same_thread=False)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS contacts (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            phone TEXT,
-            email TEXT,
-            address TEXT,
-            category TEXT DEFAULT 'Other',
-            notes TEXT,
-            favorite INTEGER DEFAULT 0,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
+    conn = connect(path)
+    with conn.transaction():
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS contacts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                phone TEXT,
+                email TEXT,
+                address TEXT,
+                category TEXT DEFAULT 'Other',
+                notes TEXT,
+                favorite INTEGER DEFAULT 0,
+                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+    migrate(conn)
     return conn
 
+def migrate(conn):
+    """Bring an existing database up to the current schema."""
+    with conn.transaction():
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+
+def close_db(conn):
+    close(conn)
+
+def fts_query(search_term):
+    """Turn user input into an FTS5 prefix query: every word must start a token.
+
+    Returns None when the input has no searchable characters.
+    """
+    tokens = TOKEN_PATTERN.findall(search_term.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
 def add_contact_db(conn, name, phone, email, address='', category='Other', notes='', favorite=0):
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO contacts (name, phone, email, address, category, notes, favorite) VALUES (?, ?, ?, ?, ?, ?, ?)",
-        (name, phone, email, address, category, notes, favorite)
+    """Insert a contact and return its id."""
+    # Joins the caller's transaction if there is one, so grouped adds commit once.
+    with conn.transaction():
+        cursor = conn.execute(INSERT_CONTACT, (name, phone, email, address, category, notes, favorite))
+    return cursor.lastrowid
+
+def import_contacts_db(conn, batches, on_batch=None):
+    """Insert batches of contact tuples, committed as a single transaction.
+
+    The batches are first staged in a TEMP table, one executemany each, so
+    reading and validating them holds no database lock; only the final
+    copy into `contacts` does. Per-row index upkeep dominates a bulk load,
+    so the FTS insert trigger is dropped for the copy and the new rows are
+    indexed with one statement. When the import outgrows the rows already
+    stored, the list-order indexes are dropped too and rebuilt in one pass.
+    ``on_batch(staged)`` is called after every batch. Returns the number
+    of rows inserted and the highest id before the import: the new rows
+    are the first ones after it.
+
+    Run it on a connection of its own: other connections keep reading
+    throughout, and their writes only wait for the final copy.
+    """
+    with conn.lock:
+        conn.execute(IMPORT_STAGING)
+        try:
+            staged = 0
+            for batch in batches:
+                # A transaction that writes only TEMP tables takes no lock on the database.
+                conn.execute("BEGIN")
+                conn.executemany("INSERT INTO temp.import_rows VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                conn.execute("COMMIT")
+                staged += len(batch)
+                if on_batch:
+                    on_batch(staged)
+
+            with conn.transaction():
+                existing, last_id = conn.execute("SELECT COUNT(*), COALESCE(MAX(id), 0) FROM contacts").fetchone()
+                conn.execute("DROP TRIGGER IF EXISTS contacts_ai")
+                if staged > existing:
+                    for name in ORDER_INDEXES:
+                        conn.execute(f"DROP INDEX IF EXISTS {name}")
+                conn.execute(
+                    "INSERT INTO contacts (name, phone, email, address, category, notes, favorite) "
+                    "SELECT name, phone, email, address, category, notes, favorite FROM temp.import_rows ORDER BY rowid"
+                )
+                # AUTOINCREMENT ids only grow, so the new rows are exactly those past last_id.
+                conn.execute(
+                    "INSERT INTO contacts_fts(rowid, name, phone, email, notes) "
+                    "SELECT id, name, phone, email, notes FROM contacts WHERE id > ?",
+                    (last_id,)
+                )
+                conn.execute(FTS_INSERT_TRIGGER)
+                for statement in ORDER_INDEXES.values():
+                    conn.execute(statement)  # Only the dropped ones are rebuilt
+        finally:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")  # A batch failed while being staged
+            conn.execute("DELETE FROM temp.import_rows")
+    return staged, last_id
+
+def get_contacts_after_db(conn, after_id, limit):
+    """The first ``limit`` contacts by id after ``after_id``."""
+    return conn.query(f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+
+def _search_query(match, category_filter='All', limit=None, offset=0):
+    query = (
+        f"SELECT {JOINED_CONTACT_COLUMNS}, "
+        "snippet(contacts_fts, -1, ?, ?, '…', 8) "
+        "FROM contacts_fts JOIN contacts c ON c.id = contacts_fts.rowid "
+        "WHERE contacts_fts MATCH ?"
     )
-    conn.commit()
+    params = [HIGHLIGHT_START, HIGHLIGHT_END, match]
 
-def get_all_contacts_db(conn, search_term='', category_filter='All'):
-    cursor = conn.cursor()
-    query = "SELECT id, name, phone, email, address, category, notes, favorite FROM contacts WHERE 1=1"
+    if category_filter != 'All':
+        query += " AND c.category = ?"
+        params.append(category_filter)
+
+    query += " ORDER BY c.favorite DESC, contacts_fts.rank, c.id"
+    if limit is not None:
+        query += " LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+    return query, params
+
+def _list_query(category_filter='All'):
+    query = f"SELECT {CONTACT_COLUMNS} FROM contacts"
     params = []
-    
-    if search_term:
-        query += " AND (name LIKE ? OR phone LIKE ? OR email LIKE ? OR notes LIKE ?)"
-        search_param = f"%{search_term}%"
-        params.extend([search_param, search_param, search_param, search_param])
-    
+
+    if category_filter != 'All':
+        query += " WHERE category = ?"
+        params.append(category_filter)
+
+    query += f" ORDER BY {LIST_ORDER}"
+    return query, params
+
+def _page_query(category_filter, favorite, after_name=None, after_id=None, limit=PAGE_SIZE):
+    # One favorite value at a time: the index then serves an equality on
+    # favorite plus a range seek on (name, id), whatever the page number.
+    query = f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE favorite = ?"
+    params = [favorite]
+
     if category_filter != 'All':
         query += " AND category = ?"
         params.append(category_filter)
-    
-    query += " ORDER BY favorite DESC, name ASC"
-    cursor.execute(query, params)
-    return cursor.fetchall()
+
+    if after_name is not None:
+        # The plain bound lets SQLite seek the index; the row value settles ties on name.
+        query += " AND name COLLATE NOCASE >= ? AND (name COLLATE NOCASE, id) > (?, ?)"
+        params.extend([after_name, after_name, after_id])
+
+    query += " ORDER BY name COLLATE NOCASE, id LIMIT ?"
+    params.append(limit)
+    return query, params
+
+def page_key(contact):
+    """Keyset position of a contact row in LIST_ORDER."""
+    return (1 if contact[7] else 0, contact[1], contact[0])
+
+def list_sort_key(contact):
+    """Python sort key that orders contact rows exactly like LIST_ORDER."""
+    return (0 if contact[7] else 1, contact[1].translate(_NOCASE), contact[0])
+
+def get_contacts_page_db(conn, category_filter='All', after=None, limit=PAGE_SIZE):
+    """The next ``limit`` contacts in LIST_ORDER after ``page_key`` ``after``."""
+    favorite, name, contact_id = after if after is not None else (1, None, None)
+    rows = conn.query(*_page_query(category_filter, favorite, name, contact_id, limit))
+    if favorite == 1 and len(rows) < limit:
+        rows += conn.query(*_page_query(category_filter, 0, limit=limit - len(rows)))
+    return rows
+
+def count_contacts_db(conn, search_term='', category_filter='All'):
+    if search_term:
+        match = fts_query(search_term)
+        if match is None:
+            return 0
+        query = "SELECT COUNT(*) FROM contacts_fts JOIN contacts c ON c.id = contacts_fts.rowid WHERE contacts_fts MATCH ?"
+        params = [match]
+        if category_filter != 'All':
+            query += " AND c.category = ?"
+            params.append(category_filter)
+    else:
+        query = "SELECT COUNT(*) FROM contacts"
+        params = []
+        if category_filter != 'All':
+            query += " WHERE category = ?"
+            params.append(category_filter)
+    return conn.query(query, params)[0][0]
+
+def search_contacts_db(conn, search_term, category_filter='All', limit=None, offset=0):
+    """Full-text search; rows are contact tuples plus a highlighted snippet.
+
+    Favorites come first, then the best matches by bm25 rank. Ranked
+    results have no stable key, so they page by ``offset``.
+    """
+    match = fts_query(search_term)
+    if match is None:
+        return []
+    return conn.query(*_search_query(match, category_filter, limit, offset))
+
+def get_all_contacts_db(conn, search_term='', category_filter='All'):
+    if search_term:
+        return [row[:8] for row in search_contacts_db(conn, search_term, category_filter)]
+    return conn.query(*_list_query(category_filter))
+
+def get_contact_db(conn, contact_id):
+    """One contact row by id, or None if it no longer exists."""
+    rows = conn.query(f"SELECT {CONTACT_COLUMNS} FROM contacts WHERE id = ?", (contact_id,))
+    return rows[0] if rows else None
 
 def update_contact_db(conn, contact_id, name, phone, email, address='', category='Other', notes='', favorite=0):
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE contacts SET name = ?, phone = ?, email = ?, address = ?, category = ?, notes = ?, favorite = ? WHERE id = ?",
-        (name, phone, email, address, category, notes, favorite, contact_id)
-    )
-    conn.commit()
+    with conn.transaction():
+        conn.execute(
+            "UPDATE contacts SET name = ?, phone = ?, email = ?, address = ?, category = ?, notes = ?, favorite = ? WHERE id = ?",
+            (name, phone, email, address, category, notes, favorite, contact_id)
+        )
 
 def toggle_favorite_db(conn, contact_id):
-    cursor = conn.cursor()
-    cursor.execute("UPDATE contacts SET favorite = 1 - favorite WHERE id = ?", (contact_id,))
-    conn.commit()
+    with conn.transaction():
+        conn.execute("UPDATE contacts SET favorite = 1 - favorite WHERE id = ?", (contact_id,))
 
 def delete_contact_db(conn, contact_id):
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
-    conn.commit()
\ No newline at end of file
+    with conn.transaction():
+        conn.execute("DELETE FROM contacts WHERE id = ?", (contact_id,))
+
+# ---- Query plan check
+
+# One entry per query shape the list and search functions can produce.
+QUERY_SHAPES = {
+    'list': _list_query(),
+    'list by category': _list_query('Work'),
+    'page': _page_query('All', 1, 'jo', 1),
+    'page by category': _page_query('Work', 0, 'jo', 1),
+    'search': _search_query('"jo"*'),
+    'search by category': _search_query('"jo"*', 'Work'),
+}
+
+def query_plan_problems(conn):
+    """EXPLAIN QUERY PLAN every query shape and report regressions.
+
+    Listings must walk an index in order: a plain table scan or a temp
+    B-tree sort is a problem, and pages must seek to their start key.
+    Searches may sort (by rank) but must reach contacts through the
+    full-text index, never by scanning the table.
+    """
+    problems = []
+    for shape, (query, params) in QUERY_SHAPES.items():
+        for row in conn.query(f"EXPLAIN QUERY PLAN {query}", params):
+            detail = row[3]
+            if re.fullmatch(r"SCAN (c|contacts)", detail):
+                problems.append((shape, detail))
+            elif 'TEMP B-TREE' in detail and not shape.startswith('search'):
+                problems.append((shape, detail))
+            elif shape.startswith('page') and 'name>' not in detail:
+                problems.append((shape, detail))  # Walks the index from the start instead of seeking
+    return problems
+
+if __name__ == '__main__':
+    # python database.py [contacts.db] -- exits non-zero if a query plan regressed
+    conn = init_db(sys.argv[1] if len(sys.argv) > 1 else 'contacts.db')
+    for shape, (query, params) in QUERY_SHAPES.items():
+        print(f"{shape}:")
+        for row in conn.query(f"EXPLAIN QUERY PLAN {query}", params):
+            print(f"  {row[3]}")
+    problems = query_plan_problems(conn)
+    for shape, detail in problems:
+        print(f"REGRESSION in {shape}: {detail}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,93 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+DB_PATH = 'contacts.db'
+
+# Applied to every connection. WAL lets readers run while a write is in
+# progress, and with synchronous=NORMAL a commit no longer waits for an fsync
+# (the WAL is synced at checkpoints), which is still safe against app crashes.
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -16000,       # KiB (negative) -> ~16 MB page cache
+    'mmap_size': 268435456,     # Map up to 256 MB of the file instead of read() calls
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+
+class Connection(sqlite3.Connection):
+    """SQLite connection with a lock and explicit transaction scopes.
+
+    The connection is opened in autocommit mode; writes are grouped with
+    ``with conn.transaction():`` and commit once at the end of the block.
+    Nested scopes become savepoints, so an inner failure only undoes the
+    inner block.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+        self.path = None  # Set by connect()
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            depth = self._depth
+            if depth == 0:
+                self.execute("BEGIN IMMEDIATE")
+            else:
+                self.execute(f"SAVEPOINT sp{depth}")
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if depth == 0:
+                    self.execute("ROLLBACK")
+                else:
+                    self.execute(f"ROLLBACK TO sp{depth}")
+                    self.execute(f"RELEASE sp{depth}")
+                raise
+            self._depth -= 1
+            if depth == 0:
+                self.execute("COMMIT")
+            else:
+                self.execute(f"RELEASE sp{depth}")
+
+    def data_version(self):
+        """A value that changes with every committed write to the database.
+
+        ``total_changes`` counts only this connection's writes and ``PRAGMA
+        data_version`` only other connections' commits, so both are needed.
+        """
+        with self.lock:
+            return self.total_changes, self.execute("PRAGMA data_version").fetchone()[0]
+
+    def query(self, sql, params=()):
+        """Run a read under the connection lock and return all rows."""
+        with self.lock:
+            return self.execute(sql, params).fetchall()
+
+
+def connect(path=DB_PATH, pragmas=PRAGMAS):
+    """Open a tuned connection usable from Flet's handler threads."""
+    conn = sqlite3.connect(
+        path,
+        factory=Connection,
+        check_same_thread=False,
+        isolation_level=None,  # Transactions are managed by Connection.transaction()
+    )
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    conn.path = path  # So other connections can be opened to the same file
+    return conn
+
+
+def close(conn):
+    """Let SQLite refresh its planner statistics, then close."""
+    with conn.lock:
+        conn.execute("PRAGMA optimize")
+        conn.close()
@@ -1,6 +1,8 @@
 import flet as ft
-from database import init_db, toggle_favorite_db
-from app_logic import display_contacts, add_contact, show_contact_details
+from database import init_db, close_db, toggle_favorite_db
+from app_logic import display_contacts, add_contact, show_contact_details, show_contact_change, import_contacts, show_snack_bar
+from contact_store import ContactStore
+from search_pipeline import SearchPipeline, DEBOUNCE_SECONDS
 
 def main(page: ft.Page):
     page.title = "📱 Enhanced Contact Book"
@@ -12,6 +14,9 @@ def main(page: ft.Page):
     page.bgcolor = ft.colors.GREY_50
 
     db_conn = init_db()
+    page.on_close = lambda e: close_db(db_conn)
+    # Contacts are loaded once; the list, count and category filter follow its changes.
+    store = ContactStore(db_conn)
     
     # Theme toggle state
     is_dark_mode = False
@@ -39,6 +44,8 @@ def main(page: ft.Page):
         icon_size=24
     )
     
+    contact_count = ft.Text("0 contacts", size=14, color=ft.colors.GREY_600)
+    
     header = ft.Container(
         content=ft.Row([
             ft.Row([
@@ -52,10 +59,7 @@ def main(page: ft.Page):
             ]),
             ft.Row([
                 theme_icon,
-                ft.Container(
-                    content=ft.Text("0 contacts", size=14, color=ft.colors.GREY_600),
-                    id="contact_count"
-                )
+                ft.Container(content=contact_count)
             ])
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
         padding=ft.padding.only(bottom=20)
@@ -68,7 +72,7 @@ def main(page: ft.Page):
         border_radius=10,
         filled=True,
         bgcolor=ft.colors.WHITE,
-        on_change=lambda e: filter_contacts()
+        on_change=lambda e: filter_contacts(DEBOUNCE_SECONDS)
     )
     
     category_dropdown = ft.Dropdown(
@@ -88,21 +92,28 @@ def main(page: ft.Page):
         on_change=lambda e: filter_contacts()
     )
     
-    def filter_contacts():
+    def show_results(results):
         display_contacts(
             page, 
             contacts_list_view, 
-            db_conn,
-            search_field.value or '',
-            category_dropdown.value or 'All',
-            update_contact_count
+            store,
+            results.search_term,
+            results.category_filter,
+            update_contact_count,
+            results
         )
     
+    # Searches run on a worker thread; typing only reschedules them.
+    search_pipeline = SearchPipeline(db_conn, show_results)
+    
+    def filter_contacts(delay=0):
+        search_pipeline.submit(search_field.value or '', category_dropdown.value or 'All', delay)
+    
     # Contact list view
     contacts_list_view = ft.ListView(
         expand=1,
         spacing=10,
-        auto_scroll=True,
+        auto_scroll=False,  # New pages are appended while scrolling; do not jump to them
         padding=ft.padding.all(10)
     )
     
@@ -184,7 +195,7 @@ def main(page: ft.Page):
             color=ft.colors.WHITE,
             shape=ft.RoundedRectangleBorder(radius=10)
         ),
-        on_click=lambda e: add_contact(page, inputs, contacts_list_view, db_conn, update_contact_count, filter_contacts)
+        on_click=lambda e: add_contact(page, inputs, contacts_list_view, store, update_contact_count)
     )
     
     clear_button = ft.OutlinedButton(
@@ -198,6 +209,34 @@ def main(page: ft.Page):
         on_click=lambda e: clear_form()
     )
     
+    # Bulk import from a CSV or vCard file
+    import_progress = ft.ProgressBar(width=400, visible=False)
+    import_status = ft.Text("", size=12, color=ft.colors.GREY_600)
+    
+    def import_file_picked(e):
+        if not e.files:
+            return
+        if not e.files[0].path:
+            show_snack_bar(page, "Importing needs the desktop app (file paths are not available in the browser)", ft.colors.RED)
+            return
+        import_contacts(page, e.files[0].path, store, import_progress, import_status, import_button)
+    
+    import_picker = ft.FilePicker(on_result=import_file_picked)
+    page.overlay.append(import_picker)
+    
+    import_button = ft.OutlinedButton(
+        text="Import CSV / vCard",
+        icon=ft.icons.UPLOAD_FILE,
+        height=50,
+        style=ft.ButtonStyle(
+            shape=ft.RoundedRectangleBorder(radius=10)
+        ),
+        on_click=lambda e: import_picker.pick_files(
+            dialog_title="Import contacts",
+            allowed_extensions=["csv", "vcf", "vcard"]
+        )
+    )
+    
     def clear_form():
         for field in inputs:
             if hasattr(field, 'value'):
@@ -207,9 +246,17 @@ def main(page: ft.Page):
         category_input.value = "Other"
         page.update()
     
-    def update_contact_count():
-        # This will be called from app_logic to update the count
-        pass
+    def update_contact_count(total):
+        contact_count.value = f"{total} contact{'s' if total != 1 else ''}"
+    
+    def update_category_counts(*change):
+        counts = store.category_counts()
+        for option in category_dropdown.options:
+            option.text = f"{option.key} ({counts[option.key]})"
+    
+    store.subscribe(lambda event, contact, old: show_contact_change(page, contacts_list_view, event, contact, old))
+    store.subscribe(update_category_counts)
+    update_category_counts()
     
     # Create tabs for better organization
     tabs = ft.Tabs(
@@ -271,7 +318,17 @@ def main(page: ft.Page):
                             add_button,
                             ft.Container(width=20),
                             clear_button
-                        ])
+                        ]),
+                        ft.Container(height=30),
+                        ft.Text(
+                            "Import Contacts",
+                            size=18,
+                            weight=ft.FontWeight.BOLD,
+                            color=ft.colors.BLUE_700
+                        ),
+                        ft.Row([import_button]),
+                        import_progress,
+                        import_status
                     ], scroll=ft.ScrollMode.AUTO),
                     padding=20
                 )
@@ -0,0 +1,144 @@
+import threading
+import unicodedata
+
+from database import search_contacts_db, HIGHLIGHT_START, HIGHLIGHT_END, TOKEN_PATTERN
+
+DEBOUNCE_SECONDS = 0.25  # Quiet time after the last keystroke before searching
+NARROW_LIMIT = 500       # Result sets up to this size are kept and narrowed in memory
+
+SEARCH_FIELDS = (1, 2, 3, 6)  # name, phone, email, notes -- the indexed columns, in row order
+
+def fold(text):
+    """Lowercase and strip accents, like the FTS tokenizer (remove_diacritics)."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+def search_tokens(search_term):
+    return TOKEN_PATTERN.findall(fold(search_term))
+
+def narrows(old_tokens, new_tokens):
+    """True if every match for ``new_tokens`` is also a match for ``old_tokens``.
+
+    Each query word must start some word of the contact, so a query whose
+    every old word is extended by a new one ("jo" -> "joh", "ana" -> "ana s")
+    can only lose matches.
+    """
+    return all(any(new.startswith(old) for new in new_tokens) for old in old_tokens)
+
+def _highlight(text, tokens):
+    """``text`` with matched words wrapped in the snippet markers, or None if nothing matched."""
+    hit = False
+
+    def mark(match):
+        nonlocal hit
+        if any(fold(match.group()).startswith(token) for token in tokens):
+            hit = True
+            return f"{HIGHLIGHT_START}{match.group()}{HIGHLIGHT_END}"
+        return match.group()
+
+    marked = TOKEN_PATTERN.sub(mark, text)
+    return marked if hit else None
+
+def filter_rows(rows, tokens):
+    """Keep search rows matching every token, with a fresh snippet for the new term."""
+    kept = []
+    for row in rows:
+        fields = [row[i] or '' for i in SEARCH_FIELDS]
+        words = set(search_tokens(' '.join(fields)))
+        if not all(any(word.startswith(token) for word in words) for token in tokens):
+            continue
+        snippet = next((marked for marked in (_highlight(f, tokens) for f in fields) if marked), '')
+        kept.append(row[:8] + (snippet,))
+    return kept
+
+
+class SearchResults:
+    """Outcome of one search: contact rows with snippets, or None for a plain listing.
+
+    ``complete`` means ``rows`` holds every match; otherwise the list view
+    pages the rest from the database.
+    """
+
+    def __init__(self, search_term, category_filter, tokens=(), rows=None, complete=True):
+        self.search_term = search_term
+        self.category_filter = category_filter
+        self.tokens = tokens
+        self.rows = rows
+        self.complete = complete
+
+
+class SearchPipeline:
+    """Debounced search-as-you-type that runs queries off the UI thread.
+
+    Every submit() supersedes the previous one: its pending timer is
+    cancelled, and a query that was already running has its results
+    dropped instead of shown. When a complete result set is narrowed
+    ("jo" -> "joh") the new results are filtered from it in memory
+    without touching the database.
+    """
+
+    def __init__(self, db_conn, on_results, delay=DEBOUNCE_SECONDS):
+        self.db_conn = db_conn
+        self.on_results = on_results
+        self.delay = delay
+        self.generation = 0
+        self.stats = {'queries': 0, 'narrowed': 0, 'dropped': 0}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self._last = None
+        self._last_version = None
+
+    def submit(self, search_term, category_filter='All', delay=None):
+        """Schedule a search; ``delay=0`` runs it without waiting for more input."""
+        with self._lock:
+            self.generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(
+                self.delay if delay is None else delay,
+                self._run,
+                (self.generation, search_term, category_filter)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _run(self, generation, search_term, category_filter):
+        if generation != self.generation:
+            self.stats['dropped'] += 1
+            return
+        results = self.search(search_term, category_filter)
+        # Checked again under the delivery lock so an older search can never
+        # replace the results of a newer one.
+        with self._deliver_lock:
+            if generation != self.generation:
+                self.stats['dropped'] += 1
+                return
+            self.on_results(results)
+
+    def search(self, search_term, category_filter='All'):
+        tokens = search_tokens(search_term)
+        if not tokens:
+            return SearchResults(search_term, category_filter)
+
+        last = self._last
+        # Any write since the cached search invalidates it, including imports
+        # committed on another connection.
+        if (
+            last is not None
+            and last.category_filter == category_filter
+            and self._last_version == self.db_conn.data_version()
+            and narrows(last.tokens, tokens)
+        ):
+            self.stats['narrowed'] += 1
+            results = SearchResults(search_term, category_filter, tokens, filter_rows(last.rows, tokens))
+            self._last = results
+        else:
+            self.stats['queries'] += 1
+            version = self.db_conn.data_version()
+            rows = search_contacts_db(self.db_conn, search_term, category_filter, NARROW_LIMIT + 1)
+            complete = len(rows) <= NARROW_LIMIT
+            results = SearchResults(search_term, category_filter, tokens, rows[:NARROW_LIMIT], complete)
+            if complete:
+                self._last, self._last_version = results, version
+        return results
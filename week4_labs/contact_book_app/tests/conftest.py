@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app runs from its own directory and imports its modules flat.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from database import init_db, close_db
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = init_db(str(tmp_path / 'contacts.db'))
+    yield conn
+    close_db(conn)
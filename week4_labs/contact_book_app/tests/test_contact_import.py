@@ -0,0 +1,117 @@
+import csv
+import io
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from contact_import import import_file, read_csv, read_vcards
+from contact_store import ContactStore
+from database import get_all_contacts_db, import_contacts_db
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def imported(conn):
+    return {row[1]: row[2:] for row in get_all_contacts_db(conn)}
+
+
+def test_google_csv(conn):
+    progress = import_file(ContactStore(conn), str(FIXTURES / 'google.csv'))
+
+    assert progress.imported == 3
+    assert progress.skipped == 2
+    assert progress.errors == ["Line 4: Phone number is required!", "Line 6: Name is required!"]
+    assert progress.fraction == 1.0
+    assert imported(conn) == {
+        'Juan Dela Cruz': ('0917 111 2222', 'juan@example.ph', '', 'Work', 'Met at PyCon', 0),
+        'Maria Clara': ('0917 333 4444', 'maria@example.ph', '', 'Family', '', 0),
+        'Andres Bonifacio': ('0917 777 8888', 'andres@example.ph', '', 'Other', 'Notes with a comma, and a "quote"', 0),
+    }
+
+
+def test_own_csv_export_with_favorites():
+    text = "Name,Phone,Email,Address,Category,Notes,Favorite\nAna,0917,a@x.ph,Cebu,friends,,yes\nBen,0918,,,Nope,,0\n"
+
+    rows = [fields for line, fields in read_csv(io.StringIO(text))]
+
+    assert [(r['name'], r['category'], r['favorite'], r['address']) for r in rows] == [
+        ('Ana', 'Friends', True, 'Cebu'),
+        ('Ben', 'Other', False, ''),
+    ]
+
+
+def test_first_and_last_name_columns_are_joined():
+    text = "First Name,Last Name,Mobile Phone\nJose,Rizal,0917\nLapu-Lapu,,0918\n"
+
+    assert [fields['name'] for line, fields in read_csv(io.StringIO(text))] == ['Jose Rizal', 'Lapu-Lapu']
+
+
+@pytest.mark.parametrize('header, message', [
+    ("Email,Phone", "no name column"),
+    ("Name,Email", "no phone column"),
+])
+def test_missing_required_column(conn, tmp_path, header, message):
+    with pytest.raises(ValueError, match=message):
+        list(read_csv(io.StringIO(header + "\nx,y\n")))
+
+    path = tmp_path / 'contacts.csv'
+    path.write_text(header + "\nx,y\n", encoding='utf-8')
+    with pytest.raises(ValueError, match=message):
+        import_file(ContactStore(conn), str(path))
+    assert imported(conn) == {}
+
+
+def test_vcards(conn):
+    store = ContactStore(conn)
+    progress = import_file(store, str(FIXTURES / 'contacts.vcf'))
+
+    assert progress.imported == 2
+    assert progress.errors == ["Line 19: Phone number is required!"]
+    assert imported(conn) == {
+        # FN wins over N; the first of several TEL lines is kept.
+        'Dr. José Rizal': (
+            '+63 917 000 0001', 'jose@example.ph', 'Calle Real, 12, Calamba, Laguna, 4027, Philippines',
+            'Friends', 'Line one\nLine two is folded', 0,
+        ),
+        # Without FN the name is built from N; grouped "item1.TEL" still counts.
+        'Gabriela Silang': ('0917 000 0002', '', '', 'Family', '', 0),
+    }
+    assert store.count() == 2
+
+
+def test_vcard_name_from_structured_fields():
+    text = "BEGIN:VCARD\nN:Rizal;José;Protasio;Dr.;Jr.\nTEL:1\nEND:VCARD\n"
+
+    [(line, fields)] = read_vcards(io.StringIO(text))
+
+    assert line == 1
+    assert fields['name'] == 'Dr. José Protasio Rizal Jr.'
+
+
+def test_failed_import_adds_nothing(conn, tmp_path):
+    store = ContactStore(conn)
+    store.add('Existing', '0917', '')
+    path = tmp_path / 'contacts.csv'
+    # A field over the csv module's size limit fails after the first batch is staged.
+    oversized = 'x' * (csv.field_size_limit() + 1)
+    path.write_text(f"Name,Phone\nAna,0917\nBen,0918\n{oversized},0919\n", encoding='utf-8')
+
+    with pytest.raises(ValueError, match="Malformed CSV"):
+        import_file(store, str(path), batch_size=1)
+
+    assert list(imported(conn)) == ['Existing']
+    assert store.count() == 1
+
+
+def test_failing_batch_leaves_nothing_staged(conn):
+    def batches():
+        yield [('Ana', '0917', '', '', 'Other', '', 0)]
+        yield [('Ben', '0918')]  # Wrong number of columns
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        import_contacts_db(conn, batches())
+
+    assert conn.query("SELECT COUNT(*) FROM temp.import_rows") == [(0,)]
+    assert conn.query("SELECT COUNT(*) FROM contacts") == [(0,)]
+    assert not conn.in_transaction
@@ -0,0 +1,83 @@
+import random
+
+from contact_store import CATEGORIES, ContactStore
+from database import get_all_contacts_db, list_sort_key
+
+# Mixed case, duplicates and non-ASCII names exercise the NOCASE ordering.
+NAMES = ['ana', 'Ana', 'ANA', 'Ben', 'ben', 'Émile', 'émile', 'Zoe', 'Ñino', 'nino', 'Carlo', 'carla']
+
+
+def assert_matches_database(store, conn):
+    for category in ('All',) + CATEGORIES:
+        view = get_all_contacts_db(conn, '', category)
+        assert store.views.get(category, []) == view, category
+        assert store.keys.get(category, []) == [list_sort_key(contact) for contact in view], category
+        assert store.count(category) == len(view)
+
+        paged, after = [], None
+        while True:
+            page = store.page(category, after, limit=7)
+            if not page:
+                break
+            paged += page
+            after = list_sort_key(page[-1])
+        assert paged == view, category
+
+    assert store.contacts == {contact[0]: contact for contact in get_all_contacts_db(conn)}
+    assert store.category_counts() == ContactStore(conn).category_counts()
+
+
+def random_contact(rng):
+    return (rng.choice(NAMES), f"09{rng.randrange(10**9):09d}", '', '', rng.choice(CATEGORIES), '', rng.random() < 0.3)
+
+
+def test_views_follow_a_mix_of_writes(conn):
+    rng = random.Random(7)
+    store = ContactStore(conn)
+    events = []
+    store.subscribe(lambda event, contact, old: events.append(event))
+
+    for step in range(400):
+        ids = list(store.contacts)
+        action = rng.random()
+        if action < 0.4 or not ids:
+            store.add(*random_contact(rng))
+        elif action < 0.6:
+            store.update(rng.choice(ids), *random_contact(rng))
+        elif action < 0.75:
+            store.toggle_favorite(rng.choice(ids))
+        elif action < 0.9:
+            store.delete(rng.choice(ids))
+        else:
+            store.import_contacts([[random_contact(rng) for _ in range(rng.randint(1, 30))]])
+        if step % 50 == 49:
+            assert_matches_database(store, conn)
+
+    assert_matches_database(store, conn)
+    assert ContactStore(conn).views == store.views  # Same as loading from scratch
+    assert set(events) == {'added', 'updated', 'removed', 'imported'}
+
+
+def test_import_into_an_empty_store(conn):
+    store = ContactStore(conn)
+    rng = random.Random(3)
+
+    store.import_contacts([[random_contact(rng) for _ in range(200)] for _ in range(3)])
+
+    assert store.count() == 600
+    assert_matches_database(store, conn)
+
+
+def test_change_events_carry_the_rows(conn):
+    store = ContactStore(conn)
+    events = []
+    store.subscribe(lambda event, contact, old: events.append((event, contact, old)))
+
+    added = store.add('Ana', '0917', 'ana@x.ph', category='Work')
+    toggled = store.toggle_favorite(added[0])
+    removed = store.delete(added[0])
+
+    assert toggled == added[:7] + (1,)
+    assert removed == toggled
+    assert events == [('added', added, None), ('updated', toggled, added), ('removed', None, toggled)]
+    assert store.count('Work') == 0
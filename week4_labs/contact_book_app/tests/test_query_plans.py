@@ -0,0 +1,58 @@
+import random
+
+from database import add_contact_db, import_contacts_db, query_plan_problems, search_contacts_db
+from contact_store import CATEGORIES
+
+NAMES = ['John', 'Joan', 'Maria', 'Jose', 'Ana', 'Mark', 'Liza', 'Paolo']
+
+
+def contact_rows(count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        name = f"{rng.choice(NAMES)} {i}"
+        yield (name, f"0917{i:07d}", f"{name.split()[0].lower()}{i}@example.com", '', rng.choice(CATEGORIES), '', rng.random() < 0.1)
+
+
+def seed(conn, count=2000):
+    rows = list(contact_rows(count))
+    import_contacts_db(conn, [rows[i:i + 500] for i in range(0, count, 500)])
+
+
+def test_seeded_database_has_no_plan_problems(conn):
+    seed(conn)
+
+    assert query_plan_problems(conn) == []
+
+
+def test_plans_hold_after_analyze(conn):
+    seed(conn)
+    conn.execute("ANALYZE")
+
+    assert query_plan_problems(conn) == []
+
+
+def test_plans_hold_after_single_adds(conn):
+    with conn.transaction():
+        for row in contact_rows(300):
+            add_contact_db(conn, *row)
+
+    assert query_plan_problems(conn) == []
+
+
+def test_import_into_a_filled_table_keeps_the_indexes(conn):
+    seed(conn, 2000)
+    import_contacts_db(conn, [list(contact_rows(100, seed=2))])
+
+    assert query_plan_problems(conn) == []
+    assert len(search_contacts_db(conn, 'jo')) > 0
+
+
+def test_missing_order_index_is_reported(conn):
+    seed(conn)
+    conn.execute("DROP INDEX idx_contacts_order")
+
+    problems = query_plan_problems(conn)
+
+    shapes = {shape for shape, detail in problems}
+    assert {'list', 'page'} <= shapes
+    assert not any(shape.startswith('search') for shape in shapes)
@@ -0,0 +1,149 @@
+import threading
+import time
+
+from contact_store import ContactStore
+from database import search_contacts_db
+from search_pipeline import SearchPipeline, _highlight, search_tokens
+
+
+def test_import_invalidates_narrowing_cache(conn):
+    store = ContactStore(conn)
+    store.add('Jo March', '0917000001', 'jo@example.com')
+    pipeline = SearchPipeline(conn, on_results=None)
+    assert len(pipeline.search('jo').rows) == 1
+
+    # The import commits on a connection of its own.
+    store.import_contacts([[(f'Johnny {i}', f'091800000{i}', '', '', 'Other', '', 0) for i in range(3)]])
+
+    results = pipeline.search('joh')
+    assert len(results.rows) == len(search_contacts_db(conn, 'joh')) == 3
+    assert pipeline.stats['narrowed'] == 0
+
+
+def test_narrowing_without_writes_skips_the_database(conn):
+    store = ContactStore(conn)
+    store.add('Jo March', '0917000001', 'jo@example.com')
+    store.add('John Brooke', '0917000002', '')
+    pipeline = SearchPipeline(conn, on_results=None)
+
+    pipeline.search('jo')
+    results = pipeline.search('joh')
+
+    assert [row[1] for row in results.rows] == ['John Brooke']
+    assert pipeline.stats == {'queries': 1, 'narrowed': 1, 'dropped': 0}
+
+
+def test_own_write_invalidates_narrowing_cache(conn):
+    store = ContactStore(conn)
+    store.add('Jo March', '0917000001', '')
+    pipeline = SearchPipeline(conn, on_results=None)
+    pipeline.search('jo')
+
+    store.add('John Brooke', '0917000002', '')
+
+    assert len(pipeline.search('joh').rows) == 1
+    assert pipeline.stats['narrowed'] == 0
+
+
+CONTACTS = [
+    ('John Doe', '0917000001', 'john_doe@x.com', '', 'Work', 'met at PyCon', 1),
+    ('José Rizal', '0917000002', 'jose@example.ph', '', 'Friends', '', 0),
+    ('Mary-Jo Santos', '0917000003', 'mj.santos@example.com', '', 'Family', 'likes jollibee', 0),
+    ('Joan Dela Cruz', '0917000004', 'joan_dc@mail.ph', '', 'Work', '', 0),
+    ('Anna Doe', '0918123456', 'anna@doe.org', '', 'Other', 'john_doe sister', 0),
+    ('Johnny Cash', '0917000006', 'jo_dee@x.com', '', 'Other', '', 0),
+]
+
+# Each sequence narrows step by step, so later steps filter in memory.
+NARROWING = [
+    ['jo', 'jo d', 'jo do', 'joh'],
+    ['do', 'doe', 'doe j'],
+    ['jos', 'jose'],
+    ['j', 'jo', 'jol'],
+    ['09', '0917', '0917000003'],
+    ['sa', 'sant', 'santos m'],
+    ['mj', 'mj s'],
+]
+
+
+def seeded_pipeline(conn):
+    store = ContactStore(conn)
+    for contact in CONTACTS:
+        store.add(*contact)
+    return SearchPipeline(conn, on_results=None)
+
+
+def test_narrowing_agrees_with_full_text_search(conn):
+    pipeline = seeded_pipeline(conn)
+
+    for sequence in NARROWING:
+        for term in sequence:
+            narrowed = {row[0] for row in pipeline.search(term).rows}
+            assert narrowed == {row[0] for row in search_contacts_db(conn, term)}, term
+    assert pipeline.stats['narrowed'] > len(NARROWING)
+
+
+def test_underscore_separates_words(conn):
+    pipeline = seeded_pipeline(conn)
+    pipeline.search('jo')
+
+    rows = pipeline.search('jo d').rows
+
+    assert 'Johnny Cash' in {row[1] for row in rows}
+    assert _highlight('jo_dee@x.com', ['jo', 'd']) == '\x02jo\x03_\x02dee\x03@x.com'
+
+
+def test_search_tokens_match_the_tokenizer():
+    assert search_tokens('John_Doe@X.com') == ['john', 'doe', 'x', 'com']
+    assert search_tokens('  José-María ') == ['jose', 'maria']
+    assert search_tokens('__') == []
+
+
+def test_typing_is_debounced(conn):
+    seeded_pipeline(conn)
+    delivered = []
+    done = threading.Event()
+
+    def on_results(results):
+        delivered.append(results.search_term)
+        done.set()
+
+    pipeline = SearchPipeline(conn, on_results, delay=0.05)
+    for term in ('j', 'jo', 'joh'):
+        pipeline.submit(term)
+
+    assert done.wait(2)
+    time.sleep(0.1)
+    assert delivered == ['joh']
+    assert pipeline.stats['queries'] == 1
+
+
+def test_superseded_results_are_dropped(conn):
+    seeded_pipeline(conn)
+    started, release = threading.Event(), threading.Event()
+    delivered = []
+    finished = threading.Event()
+
+    class SlowPipeline(SearchPipeline):
+        def search(self, search_term, category_filter='All'):
+            if search_term == 'jo':
+                started.set()
+                release.wait(2)
+            return super().search(search_term, category_filter)
+
+    def on_results(results):
+        delivered.append(results.search_term)
+        finished.set()
+
+    pipeline = SlowPipeline(conn, on_results)
+    pipeline.submit('jo', delay=0)
+    assert started.wait(2)
+    pipeline.submit('ana', delay=0)
+    assert finished.wait(2)
+    release.set()
+
+    deadline = time.monotonic() + 2
+    while pipeline.stats['dropped'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert delivered == ['ana']
+    assert pipeline.stats['dropped'] == 1
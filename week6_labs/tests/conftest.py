@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Callable
+
+import httpx
+import pytest
+
+# Make ``weather_app`` importable as a package, the way ``flet run`` sees it.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from payloads import LAST_MODIFIED, air_payload, forecast_payload, weather_payload  # noqa: E402
+
+
+class WeatherStub:
+    """Local stand-in for the OpenWeatherMap endpoints, served in-process.
+
+    ``latency(n)`` gives the delay in seconds before answering the n-th
+    request (counting from 0). With ``validators`` on, responses carry an
+    ETag and Last-Modified, and a matching ``If-None-Match`` gets a 304
+    until ``version`` changes.
+    """
+
+    def __init__(self) -> None:
+        self.requests: list[httpx.Request] = []
+        self.statuses: list[int] = []
+        self.latency: Callable[[int], float] = lambda n: 0.0
+        self.validators = False
+        self.version = 1
+        self.transport = httpx.MockTransport(self._handle)
+
+    def calls(self, endpoint: str) -> int:
+        """Requests received for one endpoint, e.g. ``"weather"``."""
+        return sum(1 for r in self.requests if r.url.path.endswith("/" + endpoint))
+
+    async def _handle(self, request: httpx.Request) -> httpx.Response:
+        delay = self.latency(len(self.requests))
+        self.requests.append(request)
+        if delay:
+            await asyncio.sleep(delay)
+        response = self._respond(request)
+        self.statuses.append(response.status_code)
+        return response
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        endpoint = request.url.path.rsplit("/", 1)[-1]
+        params = request.url.params
+        if endpoint == "weather":
+            body = weather_payload(params.get("q") or "London")
+        elif endpoint == "air_pollution":
+            body = air_payload()
+        elif endpoint == "forecast":
+            body = forecast_payload(int(params.get("cnt", 40)))
+        else:
+            return httpx.Response(404, json={"message": "not found"})
+
+        headers = {}
+        if self.validators:
+            etag = f'"{endpoint}-{self.version}"'
+            headers = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304, headers=headers)
+        return httpx.Response(200, json=body, headers=headers)
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.addinivalue_line("markers", "benchmark: timing measurements, only run with -m benchmark")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    # Timings depend on the machine's load, so they stay out of the default run.
+    if "benchmark" in config.getoption("markexpr"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; run with -m benchmark")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def stub() -> WeatherStub:
+    return WeatherStub()
@@ -0,0 +1,40 @@
+"""OpenWeatherMap-shaped response bodies served by the test stub."""
+
+from __future__ import annotations
+
+from typing import Any
+
+OBSERVED_AT = 1_760_868_000  # 2025-10-19 10:00 UTC
+LAST_MODIFIED = "Sun, 19 Oct 2025 10:00:00 GMT"
+
+
+def weather_payload(city: str) -> dict[str, Any]:
+    return {
+        "name": city,
+        "coord": {"lat": 51.5074, "lon": -0.1278},
+        "sys": {"country": "GB", "sunrise": OBSERVED_AT - 14_000, "sunset": OBSERVED_AT + 26_000},
+        "main": {"temp": 14.2, "feels_like": 13.1, "humidity": 71, "pressure": 1012},
+        "wind": {"speed": 4.6, "deg": 240},
+        "weather": [{"id": 803, "main": "Clouds", "description": "broken clouds", "icon": "04d"}],
+        "timezone": 3600,
+        "dt": OBSERVED_AT,
+    }
+
+
+def air_payload() -> dict[str, Any]:
+    components = {"co": 230.3, "no2": 18.5, "o3": 41.2, "pm2_5": 6.1, "pm10": 9.8}
+    return {"list": [{"main": {"aqi": 2}, "components": components, "dt": OBSERVED_AT}]}
+
+
+def forecast_payload(count: int) -> dict[str, Any]:
+    return {
+        "cnt": count,
+        "list": [
+            {
+                "dt": OBSERVED_AT + 10_800 * i,
+                "main": {"temp": 14.0 + i / 4, "feels_like": 13.0, "humidity": 70 - i},
+                "weather": [{"id": 500, "main": "Rain", "description": "light rain", "icon": "10d"}],
+            }
+            for i in range(count)
+        ],
+    }
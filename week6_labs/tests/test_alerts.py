@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from weather_app.alerts import AlertEngine, AlertRule, observation_values
+from weather_app.models import AirQualityData, ForecastSlot, WeatherData
+
+NOW = datetime(2025, 10, 19, 12, tzinfo=timezone.utc)
+HOT = AlertRule("temperature", ">", 30)
+
+
+def test_unchanged_observation_fires_and_evaluates_nothing():
+    engine = AlertEngine([HOT, AlertRule("humidity", ">=", 80)])
+    assert len(engine.observe("Manila", {"temperature": 32.0, "humidity": 85.0})) == 2
+    evaluations = engine.evaluations
+
+    assert engine.observe("Manila", {"temperature": 32.0, "humidity": 85.0}) == []
+    assert engine.evaluations == evaluations
+
+
+def test_crossing_fires_once_and_clearing_rearms():
+    engine = AlertEngine([HOT])
+
+    assert engine.observe("Manila", {"temperature": 29.0}) == []
+    [alert] = engine.observe("Manila", {"temperature": 31.0}, at=NOW)
+    assert (alert.rule, alert.city, alert.value, alert.at) == (HOT, "Manila", 31.0, NOW)
+    assert engine.observe("Manila", {"temperature": 33.0}) == []  # Still above: no repeat
+
+    assert engine.observe("Manila", {"temperature": 28.0}) == []
+    assert len(engine.observe("Manila", {"temperature": 31.0})) == 1
+    assert len(engine.log) == 2
+
+
+def test_only_changed_fields_are_evaluated():
+    engine = AlertEngine([HOT, AlertRule("wind_speed", ">", 10)])
+    engine.observe("Manila", {"temperature": 25.0, "wind_speed": 3.0})
+    evaluations = engine.evaluations
+
+    engine.observe("Manila", {"temperature": 25.0, "wind_speed": 4.0})
+
+    assert engine.evaluations == evaluations + 1
+
+
+def test_rules_are_indexed_by_city():
+    manila_only = AlertRule("temperature", ">", 30, city="Manila")
+    engine = AlertEngine([manila_only])
+
+    assert engine.observe("Cebu", {"temperature": 35.0}) == []
+    assert engine.evaluations == 0
+    assert [a.rule for a in engine.observe("Manila", {"temperature": 35.0})] == [manila_only]
+
+
+def test_cities_fire_independently():
+    engine = AlertEngine([HOT])
+    engine.observe("Manila", {"temperature": 31.0})
+
+    assert [a.city for a in engine.observe("Cebu", {"temperature": 31.0})] == ["Cebu"]
+
+
+def test_new_rule_checks_readings_already_seen():
+    engine = AlertEngine()
+    engine.observe("Manila", {"temperature": 31.0})
+    engine.observe("Cebu", {"temperature": 25.0})
+
+    assert [a.city for a in engine.add_rule(HOT)] == ["Manila"]
+    assert engine.add_rule(HOT) == []  # Already registered
+    assert engine.rules == [HOT]
+
+
+def test_removing_a_rule_or_forgetting_a_city_rearms():
+    engine = AlertEngine([HOT])
+    engine.observe("Manila", {"temperature": 31.0})
+
+    engine.forget("Manila")
+    assert len(engine.observe("Manila", {"temperature": 31.0})) == 1
+
+    engine.remove_rule(HOT)
+    assert engine.rules == []
+    assert engine.observe("Manila", {"temperature": 35.0}) == []
+    assert len(engine.add_rule(HOT)) == 1
+
+
+def test_missing_reading_never_matches():
+    engine = AlertEngine([AlertRule("rain_in_hours", "<=", 3)])
+
+    assert engine.observe("Manila", {"rain_in_hours": math.nan}) == []
+    assert engine.observe("Manila", {"rain_in_hours": math.nan}) == []
+    assert len(engine.observe("Manila", {"rain_in_hours": 2.0})) == 1
+
+
+def test_observation_values():
+    weather = WeatherData("Manila", "PH", 31.0, 36.0, "Clouds", 70, 4.0, "03d", NOW, NOW, 28800, 14.6, 121.0)
+    forecast = [
+        ForecastSlot(NOW + timedelta(hours=3), 30.0, 70, "Broken Clouds", "04d"),
+        ForecastSlot(NOW + timedelta(hours=6), 28.0, 80, "Light Rain", "10d"),
+    ]
+
+    values = observation_values(weather, AirQualityData(3, 0, 0, 0, 0, 0), forecast, now=NOW)
+
+    assert values == {
+        "temperature": 31.0, "feels_like": 36.0, "humidity": 70.0, "wind_speed": 4.0,
+        "aqi": 3.0, "rain_in_hours": 6.0,
+    }
+    assert "aqi" not in observation_values(weather)
+
+
+def test_rule_validation_and_message():
+    with pytest.raises(ValueError):
+        AlertRule("pressure", ">", 1000)
+    with pytest.raises(ValueError):
+        AlertRule("temperature", "==", 30)
+
+    [alert] = AlertEngine([HOT]).observe("Manila", {"temperature": 31.5})
+    assert alert.message() == "Manila: Temperature 31.5 (Temperature > 30)"
+    assert alert.message("Manila, PH") == "Manila, PH: Temperature 31.5 (Temperature > 30)"
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import random
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from weather_app.codec import CodecError, RecordBatch, decode, encode, read_snapshot, write_snapshot
+from weather_app.models import AirQualityData, ForecastSlot, WeatherData
+
+rng = random.Random(1)
+
+
+def _at(epoch: float) -> datetime:
+    return datetime.fromtimestamp(int(epoch), tz=timezone.utc)
+
+
+def _weather(i: int) -> WeatherData:
+    return WeatherData(
+        city=rng.choice(["Manila", "Cebu", "Zürich", "東京"]),
+        country="PH",
+        temperature=rng.uniform(-10, 40),
+        feels_like=rng.uniform(-10, 40),
+        description=rng.choice(["clear sky", "light rain"]),
+        humidity=rng.randint(0, 100),
+        wind_speed=rng.random() * 10,
+        icon="01d",
+        sunrise=_at(1.7e9 + i),
+        sunset=_at(1.7e9 + i + 40_000),
+        timezone_offset=28_800,
+        latitude=rng.uniform(-90, 90),
+        longitude=rng.uniform(-180, 180),
+        observed_at=None if i % 7 == 0 else _at(1.7e9 + i * 60),
+    )
+
+
+WEATHER = [_weather(i) for i in range(2_000)]
+AIR = [AirQualityData(rng.randint(1, 5), *(rng.random() * 100 for _ in range(5))) for _ in range(200)]
+FORECAST = [ForecastSlot(_at(1.7e9 + i * 3600), rng.random() * 30, rng.randint(0, 100), "rain", "10d") for i in range(200)]
+
+
+@pytest.mark.parametrize("records", [WEATHER, AIR, FORECAST], ids=["weather", "air", "forecast"])
+def test_round_trip(records):
+    assert decode(encode(records)) == records
+
+
+def test_none_and_unicode_survive():
+    assert WEATHER[0].observed_at is None
+    assert {w.city for w in decode(encode(WEATHER))} >= {"Zürich", "東京"}
+
+
+def test_batch_indexes_without_decoding_everything():
+    batch = RecordBatch(encode(WEATHER))
+
+    assert len(batch) == len(WEATHER)
+    assert batch[5] == WEATHER[5]
+    assert batch[-1] == WEATHER[-1]
+    assert len(list(batch.rows())) == len(WEATHER)
+    with pytest.raises(IndexError):
+        batch[len(WEATHER)]
+
+
+def test_strings_are_stored_once():
+    batch = RecordBatch(encode(WEATHER))
+
+    assert len(batch.strings) <= 10
+
+
+def test_snapshot_round_trip(tmp_path):
+    path = tmp_path / "watchlist.wxb"
+    write_snapshot(path, WEATHER)
+
+    snapshot = read_snapshot(path)
+
+    assert list(snapshot) == WEATHER
+    assert snapshot[100] == WEATHER[100]
+    assert not (tmp_path / "watchlist.wxb.tmp").exists()
+
+
+def test_snapshot_replaces_previous_file(tmp_path):
+    path = tmp_path / "watchlist.wxb"
+    write_snapshot(path, WEATHER)
+    write_snapshot(path, WEATHER[:3])
+
+    assert list(read_snapshot(path)) == WEATHER[:3]
+
+
+def test_failed_snapshot_write_leaves_no_temporary_file(tmp_path):
+    path = tmp_path / "watchlist.wxb"
+    write_snapshot(path, WEATHER[:3])
+    (tmp_path / "watchlist.wxb.tmp").mkdir()  # Blocks the temporary file
+
+    with pytest.raises(OSError):
+        write_snapshot(path, WEATHER)
+
+    assert list(read_snapshot(path)) == WEATHER[:3]
+
+
+def test_unwritable_snapshot_does_not_reach_the_ui(tmp_path):
+    from weather_app.main import WeatherApp
+
+    app = SimpleNamespace(
+        page=SimpleNamespace(web=False),
+        watch_snapshot_file=tmp_path / "missing" / "watchlist.wxb",
+        watch_weather={w.city: w for w in WEATHER[:3]},
+    )
+    WeatherApp._save_watch_snapshot(app)
+
+    app.watch_weather = {}
+    WeatherApp._save_watch_snapshot(app)
+
+
+@pytest.mark.parametrize(
+    "records, message",
+    [([], "empty"), ([WEATHER[0], AIR[0]], "mix"), (["London"], "layout")],
+)
+def test_encode_rejects(records, message):
+    with pytest.raises(CodecError, match=message):
+        encode(records)
+
+
+@pytest.mark.parametrize(
+    "buffer",
+    [b"", b"xx" * 20, encode(WEATHER)[:100]],
+    ids=["empty", "foreign", "truncated"],
+)
+def test_decode_rejects(buffer):
+    with pytest.raises(CodecError):
+        decode(buffer)
+
+
+def _json_encode(records: list[WeatherData]) -> str:
+    return json.dumps(
+        [
+            {k: v.isoformat() if isinstance(v, datetime) else v for k, v in dataclasses.asdict(r).items()}
+            for r in records
+        ]
+    )
+
+
+def _json_decode(text: str) -> list[WeatherData]:
+    records = []
+    for fields in json.loads(text):
+        for key in ("sunrise", "sunset", "observed_at"):
+            if fields[key]:
+                fields[key] = datetime.fromisoformat(fields[key])
+        records.append(WeatherData(**fields))
+    return records
+
+
+def _best_of(call, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def test_binary_is_smaller_than_json():
+    binary = encode(WEATHER)
+    text = _json_encode(WEATHER)
+
+    assert _json_decode(text) == WEATHER
+    assert len(binary) < len(text) / 2
+
+
+@pytest.mark.benchmark
+def test_binary_decodes_faster_than_json():
+    binary = encode(WEATHER)
+    text = _json_encode(WEATHER)
+
+    binary_time = _best_of(lambda: decode(binary))
+    json_time = _best_of(lambda: _json_decode(text))
+    print(
+        f"\n{len(WEATHER)} records: binary {len(binary) / 1024:.0f} KiB, {binary_time * 1000:.1f} ms; "
+        f"JSON {len(text) / 1024:.0f} KiB, {json_time * 1000:.1f} ms"
+    )
+
+    assert binary_time < json_time
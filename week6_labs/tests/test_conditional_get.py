@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from weather_app import providers
+from weather_app.services import WeatherService
+from weather_app.transport import HttpClient
+
+URL = "https://api.openweathermap.org/data/2.5/weather"
+PARAMS = {"q": "London"}
+
+
+@pytest.fixture
+def decodes(monkeypatch) -> list[bytes]:
+    """Bodies passed through JSON decoding by the providers."""
+    decoded: list[bytes] = []
+    decode = providers.decode_json
+
+    def counting(content: bytes):
+        decoded.append(content)
+        return decode(content)
+
+    monkeypatch.setattr(providers, "decode_json", counting)
+    return decoded
+
+
+def test_repeat_request_is_revalidated(stub):
+    stub.validators = True
+    http = HttpClient(transport=stub.transport)
+
+    async def scenario():
+        return await http.get(URL, params=PARAMS), await http.get(URL, params=PARAMS)
+
+    first, second = asyncio.run(scenario())
+
+    assert stub.statuses == [200, 304]
+    assert "If-None-Match" not in stub.requests[0].headers
+    assert stub.requests[1].headers["If-None-Match"] == '"weather-1"'
+    assert stub.requests[1].headers["If-Modified-Since"]
+    assert second is first
+    assert http.stats.not_modified == 1
+    assert http.stats.bytes_saved == len(first.content) > 0
+    assert http.stats.bytes_received == len(first.content)
+
+
+def test_changed_resource_is_fetched_in_full(stub):
+    stub.validators = True
+    http = HttpClient(transport=stub.transport)
+
+    async def scenario():
+        first = await http.get(URL, params=PARAMS)
+        stub.version = 2
+        second = await http.get(URL, params=PARAMS)
+        third = await http.get(URL, params=PARAMS)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert stub.statuses == [200, 200, 304]
+    assert second is not first
+    assert third is second
+    assert stub.requests[2].headers["If-None-Match"] == '"weather-2"'
+
+
+def test_requests_without_validators_stay_unconditional(stub):
+    http = HttpClient(transport=stub.transport)
+
+    async def scenario():
+        await http.get(URL, params=PARAMS)
+        await http.get(URL, params=PARAMS)
+
+    asyncio.run(scenario())
+
+    assert stub.statuses == [200, 200]
+    assert "If-None-Match" not in stub.requests[1].headers
+    assert http.stats.not_modified == 0
+
+
+def test_expired_service_cache_revalidates_without_decoding(stub, decodes):
+    stub.validators = True
+    service = WeatherService(api_key="test", weather_ttl=0, http=HttpClient(transport=stub.transport))
+    service.router.providers = service.router.providers[:1]  # OpenWeatherMap only
+
+    async def scenario():
+        return await service.fetch_weather("London"), await service.fetch_weather("London")
+
+    first, second = asyncio.run(scenario())
+
+    assert stub.statuses == [200, 304]
+    assert second == first
+    assert second is not first  # Callers still get their own copy
+    assert len(decodes) == 1
+    assert service.http.stats.not_modified == 1
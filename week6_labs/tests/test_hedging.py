@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from weather_app.transport import HttpClient
+
+URL = "https://api.openweathermap.org/data/2.5/weather"
+FAST = 0.002
+SPIKE = 1.0
+
+
+async def _learn(http: HttpClient, requests: int = 30) -> None:
+    """Send enough quick requests for the client to learn its p95 latency."""
+    for _ in range(requests):
+        await http.get(URL, params={"q": "London"})
+
+
+def test_slow_request_is_hedged_and_the_hedge_wins(stub):
+    # Request 30 is the spike; request 31 is its hedge and answers quickly.
+    stub.latency = lambda n: SPIKE if n == 30 else FAST
+    http = HttpClient(hedge=True, hedge_budget=0.5, transport=stub.transport)
+
+    async def scenario() -> float:
+        await _learn(http)
+        started = time.perf_counter()
+        response = await http.get(URL, params={"q": "London"})
+        assert response.status_code == 200
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(scenario())
+
+    assert elapsed < SPIKE / 2
+    assert http.stats.hedges == 1
+    assert http.stats.hedge_wins == 1
+    assert len(stub.requests) == 32
+
+
+def test_hedges_stay_within_the_budget(stub):
+    # After the learning phase every request is slower than the hedge delay.
+    stub.latency = lambda n: FAST if n < 30 else 0.2
+    http = HttpClient(hedge=True, hedge_budget=0.05, transport=stub.transport)
+
+    async def scenario() -> None:
+        await _learn(http)
+        await asyncio.gather(*(http.get(URL, params={"q": "London"}) for _ in range(40)))
+
+    asyncio.run(scenario())
+
+    assert http.stats.requests == 70
+    assert 0 < http.stats.hedges <= 0.05 * http.stats.requests
+    assert len(stub.requests) == http.stats.requests + http.stats.hedges
+
+
+def test_no_hedging_before_latency_is_learned(stub):
+    stub.latency = lambda n: 0.2
+    http = HttpClient(hedge=True, hedge_budget=1.0, transport=stub.transport)
+
+    asyncio.run(http.get(URL, params={"q": "London"}))
+
+    assert http.stats.hedges == 0
+    assert len(stub.requests) == 1
+
+
+def test_hedging_is_off_by_default(stub):
+    stub.latency = lambda n: SPIKE if n == 30 else FAST
+    http = HttpClient(transport=stub.transport)
+
+    async def scenario() -> None:
+        await _learn(http)
+        await http.get(URL, params={"q": "London"})
+
+    asyncio.run(scenario())
+
+    assert http.stats.hedges == 0
+    assert len(stub.requests) == 31
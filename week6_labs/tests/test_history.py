@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from weather_app.history import DAY, HOUR, HistoryStore, RetentionPolicy
+from weather_app.models import AirQualityData, ForecastSlot, WeatherData
+
+NOW = datetime(2025, 10, 19, 12, tzinfo=timezone.utc)
+KEEP_ALL = RetentionPolicy(raw=10_000 * DAY, hourly=10_000 * DAY, forecasts=10_000 * DAY)
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2025, 10, 19, hour, minute, tzinfo=timezone.utc)
+
+
+def reading(observed_at, temp=20.0, humidity=60, wind=3.0, city="Manila") -> WeatherData:
+    return WeatherData(
+        city, "PH", temp, temp + 2, "Clouds", humidity, wind, "03d",
+        NOW, NOW, 28800, 14.6, 121.0, observed_at,
+    )
+
+
+def air(aqi: int) -> AirQualityData:
+    return AirQualityData(aqi, 200.0, 10.0, 30.0, 5.0, 8.0)
+
+
+def rows(store: HistoryStore, sql: str) -> list[tuple]:
+    with sqlite3.connect(store.path) as conn:
+        return conn.execute(sql).fetchall()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(tmp_path / "history.sqlite3", retention=KEEP_ALL, clock=NOW.timestamp)
+    yield store
+    store.close()
+
+
+def test_flush_commits_queued_observations(store):
+    store.record(reading(at(10, 5), temp=18.0), air(2))
+    store.record(reading(at(10, 5), temp=99.0))  # Same upstream reading again
+    store.record(reading(None, temp=25.0))  # No observation time: stamped with the clock
+    store.record(reading(at(10, 30), city="Cebu"))
+    store.flush()
+
+    points = store.observations("Manila", "PH", since=at(0))
+
+    assert [(p.time, p.temperature, p.aqi) for p in points] == [(at(10, 5), 18.0, 2)]
+    assert [p.time for p in store.observations("Manila", "PH", since=at(0), until=NOW + timedelta(1))] == [
+        at(10, 5), NOW,
+    ]
+    assert len(store.observations("Cebu", "PH", since=at(0))) == 1
+
+
+def test_hourly_rollups_follow_each_batch(store):
+    store.record(reading(at(10, 5), temp=18.0, humidity=50, wind=2.0), air(2))
+    store.record(reading(at(10, 25), temp=24.0, humidity=70, wind=4.0))
+    store.record(reading(at(11, 10), temp=30.0), air(4))
+    store.flush()
+
+    rollups = "SELECT hour, samples, temp_avg, temp_min, temp_max, humidity_avg, wind_avg, aqi_avg FROM observations_hourly ORDER BY hour"
+    assert rows(store, rollups) == [
+        (at(10).timestamp(), 2, 21.0, 18.0, 24.0, 60.0, 3.0, 2.0),  # AQI average skips the missing one
+        (at(11).timestamp(), 1, 30.0, 30.0, 30.0, 60.0, 3.0, 4.0),
+    ]
+
+    # A later batch landing in an hour that already has a rollup recomputes it.
+    store.record(reading(at(10, 55), temp=12.0, humidity=60, wind=3.0))
+    store.flush()
+
+    assert rows(store, rollups)[0] == (at(10).timestamp(), 3, 18.0, 12.0, 24.0, 60.0, 3.0, 2.0)
+
+
+def test_downsample_weights_rollups_by_samples(store):
+    temps = {at(9, 0): 10.0, at(10, 0): 16.0, at(10, 20): 20.0, at(10, 40): 24.0, at(12, 30): 30.0}
+    for when, temp in temps.items():
+        store.record(reading(when, temp=temp))
+    store.flush()
+
+    buckets = store.downsample("Manila", "PH", since=at(0), until=at(23), bucket_seconds=3 * HOUR)
+
+    assert [(b.start, b.samples, b.temp_min, b.temp_max) for b in buckets] == [
+        (at(9), 4, 10.0, 24.0),
+        (at(12), 1, 30.0, 30.0),
+    ]
+    # Weighted by samples: the mean of the four readings, not of the two hourly means.
+    assert buckets[0].temperature == pytest.approx(17.5)
+
+    # Sub-hour buckets come straight from the raw rows.
+    half_hours = store.downsample("Manila", "PH", since=at(0), until=at(23), bucket_seconds=HOUR // 2)
+    assert [(b.start, b.samples, b.temperature) for b in half_hours] == [
+        (at(9), 1, 10.0), (at(10), 2, 18.0), (at(10, 30), 1, 24.0), (at(12, 30), 1, 30.0),
+    ]
+
+
+def test_retention_prunes_each_table(tmp_path):
+    path = tmp_path / "history.sqlite3"
+    week_ago = NOW - timedelta(days=8)
+    old = HistoryStore(path, retention=KEEP_ALL, clock=week_ago.timestamp)
+    old.record_forecast(reading(week_ago), [ForecastSlot(week_ago + timedelta(hours=3), 20.0, 60, "Clouds", "03d")])
+    for days in (400, 20, 0):
+        old.record(reading(NOW - timedelta(days=days, hours=1)))
+    old.flush()
+    old.close()
+
+    # The writer prunes with its first batch, using the default policy.
+    store = HistoryStore(path, clock=NOW.timestamp)
+    store.record(reading(NOW))
+    store.flush()
+    store.close()
+
+    raw = [datetime.fromtimestamp(t, tz=timezone.utc) for (t,) in rows(store, "SELECT observed_at FROM observations")]
+    hours = [datetime.fromtimestamp(t, tz=timezone.utc) for (t,) in rows(store, "SELECT hour FROM observations_hourly")]
+    assert raw == [NOW - timedelta(hours=1), NOW]  # Raw rows keep 14 days
+    assert hours == [NOW - timedelta(days=20, hours=1), NOW - timedelta(hours=1), NOW]  # Rollups keep a year
+    assert rows(store, "SELECT COUNT(*) FROM forecasts") == [(0,)]  # Forecasts keep a week
+
+    # Coarse history outlives the raw rows it was built from.
+    [bucket] = store.downsample("Manila", "PH", since=NOW - timedelta(days=21), until=NOW - timedelta(days=19))
+    assert bucket.samples == 1
+
+
+def test_failed_batch_is_dropped_and_writer_keeps_going(store, caplog):
+    with caplog.at_level(logging.ERROR, logger="weather_app.history"):
+        store.record(reading(at(9), humidity=None))  # Violates NOT NULL
+        store.flush()
+    assert "Dropped 1 history writes" in caplog.text
+
+    store.record(reading(at(10)))
+    store.flush()
+
+    assert [p.time for p in store.observations("Manila", "PH", since=at(0))] == [at(10)]
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from payloads import air_payload, forecast_payload, weather_payload
+from weather_app import providers
+from weather_app.providers import FORECAST_SLOTS, OpenWeatherMapProvider, decode_json
+from weather_app.transport import HttpClient
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+needs_orjson = pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+
+BODIES = [
+    json.dumps(weather_payload("Zürich")).encode(),
+    json.dumps(air_payload()).encode(),
+    json.dumps(forecast_payload(40)).encode(),
+]
+
+
+@pytest.fixture(params=[pytest.param("orjson", marks=needs_orjson), "json"])
+def backend(request, monkeypatch):
+    monkeypatch.setattr(providers, "orjson", orjson if request.param == "orjson" else None)
+    return request.param
+
+
+@pytest.mark.parametrize("body", BODIES, ids=["weather", "air", "forecast"])
+def test_backends_decode_alike(body, backend):
+    assert decode_json(body) == json.loads(body)
+
+
+def test_invalid_json_raises_value_error(backend):
+    # get_json() relies on this to fall back to a generic error message.
+    with pytest.raises(ValueError):
+        decode_json(b"<html>Bad Gateway</html>")
+
+
+def _fetch_all(stub) -> tuple:
+    provider = OpenWeatherMapProvider(HttpClient(transport=stub.transport), "k")
+
+    async def scenario() -> tuple:
+        return (
+            await provider.weather_by_name("Zürich", "metric"),
+            await provider.air_quality(51.5, -0.13),
+            await provider.hourly_forecast(51.5, -0.13, "metric"),
+        )
+
+    return asyncio.run(scenario())
+
+
+@needs_orjson
+def test_provider_output_is_backend_independent(stub, monkeypatch):
+    monkeypatch.setattr(providers, "orjson", None)
+    expected = _fetch_all(stub)
+    monkeypatch.setattr(providers, "orjson", orjson)
+
+    assert _fetch_all(stub) == expected
+
+
+def test_forecast_asks_only_for_shown_slots(stub, backend):
+    forecast = _fetch_all(stub)[2]
+
+    request = stub.requests[-1]
+    assert request.url.params["cnt"] == str(FORECAST_SLOTS)
+    assert len(forecast) == FORECAST_SLOTS
+
+
+def test_trimmed_forecast_is_smaller():
+    full = json.dumps(forecast_payload(40)).encode()
+    lean = json.dumps(forecast_payload(FORECAST_SLOTS)).encode()
+
+    assert len(lean) < len(full) / 2
+
+
+def _per_call(call, number: int = 500) -> float:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        best = min(best, time.perf_counter() - started)
+    return best / number
+
+
+@needs_orjson
+@pytest.mark.benchmark
+def test_orjson_is_faster():
+    full = json.dumps(forecast_payload(40)).encode()
+    lean = json.dumps(forecast_payload(FORECAST_SLOTS)).encode()
+    timings = {
+        (name, size): _per_call(lambda: loads(body))
+        for size, body in (("40 slots", full), (f"{FORECAST_SLOTS} slots", lean))
+        for name, loads in (("json", json.loads), ("orjson", orjson.loads))
+    }
+    print()
+    for (name, size), seconds in timings.items():
+        print(f"{name:>6} {size}: {seconds * 1e6:.1f} us")
+
+    assert timings["orjson", "40 slots"] < timings["json", "40 slots"]
+    assert timings["json", f"{FORECAST_SLOTS} slots"] < timings["json", "40 slots"]
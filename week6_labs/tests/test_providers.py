@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from weather_app import providers
+from weather_app.models import AirQualityData, ForecastSlot, WeatherData
+from weather_app.providers import ProviderError, ProviderRouter, WeatherProvider
+from weather_app.services import WeatherService, WeatherServiceError
+
+NOON = datetime(2025, 10, 19, 12, tzinfo=timezone.utc)
+
+
+class FakeProvider(WeatherProvider):
+    """In-process provider whose behaviour each test sets.
+
+    ``mode`` is ``"ok"``, ``"fail"`` (a retryable upstream error),
+    ``"refuse"`` (a non-retryable one, like a bad key) or ``"garbled"``
+    (a response missing fields).
+    """
+
+    WARMUP_URL = "https://example.invalid/"
+
+    def __init__(self, name: str, mode: str = "ok", delay: float = 0.0) -> None:
+        super().__init__(http=None)
+        self.name = name
+        self.mode = mode
+        self.delay = delay
+        self.calls = 0
+
+    async def _answer(self, value):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.mode == "fail":
+            raise ProviderError("Service unavailable")
+        if self.mode == "refuse":
+            raise ProviderError("City not found", retryable=False)
+        if self.mode == "garbled":
+            raise KeyError("main")
+        return value
+
+    async def weather_by_name(self, city: str, units: str) -> WeatherData:
+        return await self._answer(
+            WeatherData(city, "GB", 14.0, 13.0, self.name, 70, 4.0, "01d", NOON, NOON, 0, 51.5, -0.13, NOON)
+        )
+
+    async def weather_at(self, lat: float, lon: float, units: str) -> WeatherData:
+        return await self.weather_by_name("", units)
+
+    async def air_quality(self, lat: float, lon: float) -> AirQualityData:
+        return await self._answer(AirQualityData(2, 230.0, 18.0, 41.0, 6.0, 9.0))
+
+    async def hourly_forecast(self, lat: float, lon: float, units: str) -> list[ForecastSlot]:
+        return await self._answer([ForecastSlot(NOON, 14.0, 70, self.name, "10d")])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls ``time.monotonic`` as seen by the router's cooldowns."""
+    now = [1000.0]
+    monkeypatch.setattr(providers.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _service(*fakes: FakeProvider) -> WeatherService:
+    return WeatherService(providers=list(fakes))
+
+
+def _weather(service: WeatherService, city: str) -> WeatherData:
+    return asyncio.run(service.fetch_weather(city))
+
+
+def test_fails_over_to_the_next_provider():
+    primary, backup = FakeProvider("primary", "fail"), FakeProvider("backup")
+    service = _service(primary, backup)
+
+    assert _weather(service, "London").description == "backup"
+    assert service.router.health["primary"].failed == 1
+    assert service.router.health["backup"].served == 1
+    assert service.router.ranked() == [backup, primary]
+
+
+@pytest.mark.parametrize("mode", ["fail", "garbled"])
+def test_all_providers_failing_raises(mode):
+    service = _service(FakeProvider("a", mode), FakeProvider("b", mode))
+
+    with pytest.raises(WeatherServiceError):
+        _weather(service, "London")
+    assert [h.failed for h in service.router.health.values()] == [1, 1]
+
+
+def test_unhealthy_provider_cools_down_and_recovers(clock):
+    primary, backup = FakeProvider("primary", "fail"), FakeProvider("backup")
+    service = _service(primary, backup)
+    router = service.router
+
+    for city in ("London", "Paris", "Rome"):
+        _weather(service, city)
+    assert primary.calls == 1  # Demoted after its first failure, so not tried again
+    for _ in range(router.failure_threshold - 1):
+        router.record_failure(primary)
+    assert router.ranked() == [backup]
+
+    clock[0] += router.cooldown
+    assert router.ranked() == [backup, primary]
+
+    primary.mode, backup.mode = "ok", "fail"
+    assert _weather(service, "Tokyo").description == "primary"
+    assert router.health["primary"].consecutive_failures == 0
+    assert router.ranked()[0] is primary
+
+
+def test_everything_cooling_down_still_tries_providers(clock):
+    a, b = FakeProvider("a"), FakeProvider("b")
+    router = ProviderRouter([a, b], failure_threshold=1)
+    router.record_failure(a)
+    router.record_failure(b)
+
+    assert router.ranked() == [a, b]
+
+
+def test_refusal_another_provider_answers_counts_as_failure():
+    picky, backup = FakeProvider("picky", "refuse"), FakeProvider("backup")
+    service = _service(picky, backup)
+
+    assert _weather(service, "London").description == "backup"
+    assert service.router.health["picky"].failed == 1
+    assert service.router.ranked()[0] is backup
+
+
+def test_refusal_every_provider_gives_counts_against_none():
+    service = _service(FakeProvider("a", "refuse"), FakeProvider("b", "refuse"))
+
+    with pytest.raises(WeatherServiceError, match="City not found"):
+        _weather(service, "Atlantis")
+    assert [h.failed for h in service.router.health.values()] == [0, 0]
+
+
+def test_faster_provider_is_preferred():
+    slow, fast = FakeProvider("slow", delay=0.05), FakeProvider("fast")
+    service = _service(slow, fast)
+    _weather(service, "London")  # Measures slow, which is tried first
+    service.router.providers.reverse()
+    _weather(service, "Paris")  # Measures fast
+    service.router.providers.reverse()
+
+    assert service.router.ranked() == [fast, slow]
+
+
+def test_unmeasured_provider_scores_at_the_mean():
+    a, b, c = FakeProvider("a"), FakeProvider("b"), FakeProvider("c")
+    router = ProviderRouter([a, b, c])
+    router.record_success(a, 0.1)
+    router.record_success(b, 0.3)
+
+    assert router.ranked() == [a, c, b]
+
+
+def test_cached_entries_outlive_a_failover():
+    primary, backup = FakeProvider("primary"), FakeProvider("backup")
+    service = _service(primary, backup)
+    asyncio.run(service.fetch_weather("London"))
+    asyncio.run(service.fetch_hourly_forecast(51.5, -0.13))
+    asyncio.run(service.fetch_air_quality(51.5, -0.13))
+
+    primary.mode = "fail"
+    _weather(service, "Paris")  # Fails over and re-ranks
+    assert service.router.ranked()[0] is backup
+
+    calls = backup.calls
+    assert _weather(service, "London").description == "primary"
+    assert asyncio.run(service.fetch_hourly_forecast(51.5, -0.13))[0].description == "primary"
+    asyncio.run(service.fetch_air_quality(51.5, -0.13))
+    assert backup.calls == calls
+    assert service._weather_cache.get(("name", "london", "metric"))[0] == "primary"
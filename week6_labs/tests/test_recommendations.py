@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import itertools
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from weather_app.models import AirQualityData, ForecastSlot, WeatherData
+from weather_app.recommendations import RuleEngine, evaluate_dashboard
+
+SUNRISE = datetime(2025, 10, 19, 6, tzinfo=timezone.utc)
+
+
+def weather(temp=20.0, feels=None, description="Scattered Clouds", icon="03d", humidity=50, wind=3.0, city="Manila"):
+    return WeatherData(
+        city, "PH", temp, temp if feels is None else feels, description, humidity, wind, icon,
+        SUNRISE, SUNRISE + timedelta(hours=12), 0, 14.6, 121.0, None,
+    )
+
+
+def air(aqi: int) -> AirQualityData:
+    return AirQualityData(aqi, 200.0, 10.0, 30.0, 5.0, 8.0)
+
+
+def at(hour: int) -> datetime:
+    return datetime(2025, 10, 19, hour, tzinfo=timezone.utc)
+
+
+def titles(w: WeatherData, hour: int = 12, aqi: int | None = None) -> list[str]:
+    evaluation = evaluate_dashboard(RuleEngine(), w, air(aqi) if aqi else None, [], [], now=at(hour))
+    return [r.title for r in evaluation.main]
+
+
+def legacy(w: WeatherData, hour: int, aqi: int | None) -> list[tuple[str, str, str]]:
+    """The if/elif chain the rule table replaced, plus the air-quality rule added with it."""
+    out = []
+    temp, feels = w.temperature, w.feels_like
+    if temp > 30:
+        out.append(("🌡️ Hot day ahead", "Stay hydrated and seek shade", "#FED7D7"))
+    elif temp < 10:
+        out.append(("🧥 Bundle up", "Wear warm clothing", "#BEE3F8"))
+    if abs(feels - temp) > 5:
+        if feels > temp:
+            out.append(("🌡️ Feels warmer", f"Humidity makes it feel like {feels:.0f}°", "#FED7D7"))
+        else:
+            out.append(("❄️ Feels colder", f"Wind chill makes it feel like {feels:.0f}°", "#BEE3F8"))
+    condition = w.description.lower()
+    if "rain" in condition or "drizzle" in condition:
+        out.append(("☔ Bring an umbrella", "Rain expected today", "#BEE3F8"))
+    elif "clear" in condition and "d" in w.icon:
+        out.append(("☀️ Sunny day", "Don't forget sunscreen", "#FEF5E7"))
+    elif "cloud" in condition:
+        out.append(("☁️ Cloudy skies", "Good day for outdoor activities", "#E6FFFA"))
+    elif "snow" in condition:
+        out.append(("❄️ Snowy weather", "Drive carefully and dress warmly", "#E6F7FF"))
+    elif "storm" in condition or "thunder" in condition:
+        out.append(("⚡ Thunderstorm alert", "Stay indoors if possible", "#FED7D7"))
+    if w.humidity > 80:
+        out.append(("💧 High humidity", "May feel muggy outside", "#E6FFFA"))
+    elif w.humidity < 30:
+        out.append(("🏜️ Low humidity", "Use moisturizer for dry skin", "#FEF5E7"))
+    if w.wind_speed > 10:
+        out.append(("💨 Windy conditions", "Secure loose objects", "#E6F7FF"))
+    if aqi is not None and aqi >= 4:
+        out.append(("😷 Poor air quality", "Limit strenuous outdoor activity", "#FED7D7"))
+    if 20 <= hour or hour < 6:
+        subtitle = "Good time for stargazing" if "clear" in condition else "Stay cozy indoors"
+        out.append(("🌙 Evening/Night", subtitle, "#E6E6FA"))
+    if 18 <= temp <= 26 and w.humidity < 70 and "clear" in condition:
+        out.append(("✨ Perfect weather", "Great day for outdoor activities!", "#C6F6D5"))
+    return out
+
+
+CASES = [
+    # (description, weather, hour, aqi, expected titles)
+    ("hot and humid", weather(33, humidity=85), 12, None,
+     ["🌡️ Hot day ahead", "☁️ Cloudy skies", "💧 High humidity"]),
+    ("bundle up, feels colder", weather(4, feels=-3, description="Light Snow", icon="13d"), 12, None,
+     ["🧥 Bundle up", "❄️ Feels colder", "❄️ Snowy weather"]),
+    ("perfect clear day", weather(22, description="Clear Sky", icon="01d"), 12, None,
+     ["☀️ Sunny day", "✨ Perfect weather"]),
+    ("rain beats storm in the condition group", weather(24, description="Thunderstorm With Light Rain", icon="11d"), 12, None,
+     ["☔ Bring an umbrella"]),
+    ("storm alone", weather(24, description="Thunderstorm", icon="11d"), 12, None,
+     ["⚡ Thunderstorm alert"]),
+    ("clear night: stargazing, not sunny", weather(20, description="Clear Sky", icon="01n"), 22, None,
+     ["🌙 Evening/Night", "✨ Perfect weather"]),
+    ("cloudy night", weather(20, icon="03n"), 2, None,
+     ["☁️ Cloudy skies", "🌙 Evening/Night"]),
+    ("windy and dry", weather(15, description="Mist", icon="50d", humidity=20, wind=12), 12, None,
+     ["🏜️ Low humidity", "💨 Windy conditions"]),
+    ("poor air", weather(20), 12, 4, ["☁️ Cloudy skies", "😷 Poor air quality"]),
+    ("moderate air stays quiet", weather(20), 12, 3, ["☁️ Cloudy skies"]),
+]
+
+
+@pytest.mark.parametrize("w, hour, aqi, expected", [case[1:] for case in CASES], ids=[case[0] for case in CASES])
+def test_rule_table(w, hour, aqi, expected):
+    assert titles(w, hour, aqi) == expected
+
+
+def test_night_subtitle_depends_on_the_sky():
+    engine = RuleEngine()
+    clear = evaluate_dashboard(engine, weather(description="Clear Sky", icon="01n"), None, [], [], now=at(23)).main
+    cloudy = evaluate_dashboard(engine, weather(icon="04n"), None, [], [], now=at(23)).main
+
+    assert [r.subtitle for r in clear if r.title == "🌙 Evening/Night"] == ["Good time for stargazing"]
+    assert [r.subtitle for r in cloudy if r.title == "🌙 Evening/Night"] == ["Stay cozy indoors"]
+
+
+def test_matches_the_if_elif_chain():
+    grid = itertools.product(
+        (-5.0, 9.9, 10.0, 18.0, 22.0, 26.0, 30.0, 30.5),   # temperature
+        (-6.0, 0.0, 5.0, 6.0),                              # feels-like delta
+        ("Clear Sky", "Light Rain", "Broken Clouds", "Snow", "Thunderstorm", "Drizzle", "Mist"),
+        ("01d", "01n"),
+        (20, 30, 69, 81),                                   # humidity
+        (3.0, 10.5),                                        # wind
+        (3, 12, 20),                                        # local hour
+        (None, 2, 4),                                       # AQI
+    )
+    rows = [(weather(t, t + d, desc, icon, hum, wind, city=str(i)), hour, aqi)
+            for i, (t, d, desc, icon, hum, wind, hour, aqi) in enumerate(grid)]
+    engine = RuleEngine()
+
+    for hour in (3, 12, 20):
+        batch = [(w, aqi) for w, h, aqi in rows if h == hour]
+        evaluation = evaluate_dashboard(
+            engine, None, None, [], [w for w, _ in batch],
+            watch_air={w.city: air(aqi) if aqi else None for w, aqi in batch}, now=at(hour),
+        )
+        for w, aqi in batch:
+            got = [(r.title, r.subtitle, r.color) for r in evaluation.watchlist[w.city]]
+            assert got == legacy(w, hour, aqi), (w, hour, aqi)
+
+
+def test_batch_larger_than_the_memo():
+    engine = RuleEngine(memo_size=2)
+    cities = [weather(t, city=str(t)) for t in range(5, 35, 5)]
+
+    first = evaluate_dashboard(engine, None, None, [], cities, now=at(12)).watchlist
+    again = evaluate_dashboard(engine, None, None, [], cities, now=at(12)).watchlist
+
+    assert first == again
+    assert [r.title for r in first["5"]] == ["🧥 Bundle up", "☁️ Cloudy skies"]
+    assert len(engine._memo) == 2
+
+
+def test_best_slot_prefers_pleasant_weather():
+    now = at(6)
+    slots = [
+        ForecastSlot(now + timedelta(hours=3), 24.0, 80, "Light Rain", "10d"),
+        ForecastSlot(now + timedelta(hours=6), 22.0, 50, "Clear Sky", "01d"),
+        ForecastSlot(now + timedelta(hours=9), 22.0, 50, "Clear Sky", "01d"),
+        ForecastSlot(now + timedelta(hours=30), 22.0, 50, "Clear Sky", "01d"),
+    ]
+
+    evaluation = evaluate_dashboard(RuleEngine(), weather(), None, slots, [], now=now)
+
+    assert evaluation.best_slot is slots[1]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from weather_app.scheduler import RefreshScheduler
+
+START = 1_760_868_000.0
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = START
+
+    def __call__(self) -> float:
+        return self.now
+
+    def ago(self, seconds: float) -> datetime:
+        return datetime.fromtimestamp(self.now - seconds, tz=timezone.utc)
+
+
+class Upstream:
+    """Refresh callback that answers from a script of observation times or errors."""
+
+    def __init__(self, *outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.calls: list[str] = []
+
+    async def __call__(self, key: str) -> datetime | None:
+        self.calls.append(key)
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def scheduler(refresh, clock: Clock, **options) -> RefreshScheduler:
+    return RefreshScheduler(refresh, jitter=0.0, clock=clock, **options)
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def drive(s: RefreshScheduler, clock: Clock, upstream: Upstream, steps: int) -> list[float]:
+    """Jump the clock to each due time and return the delay scheduled after each refresh."""
+    task = asyncio.ensure_future(s.run())
+    delays = []
+    try:
+        for _ in range(steps):
+            job = min(s.jobs.values(), key=lambda j: j.due)
+            clock.now = max(clock.now, job.due)
+            calls = len(upstream.calls)
+            s.resume()  # Wakes the loop
+            await _settle()
+            assert len(upstream.calls) == calls + 1
+            delays.append(round(job.due - clock.now, 6))
+    finally:
+        task.cancel()
+    return delays
+
+
+def test_fresh_data_is_due_a_cadence_after_observation():
+    clock = Clock()
+    s = scheduler(Upstream(None), clock)
+
+    s.track("Manila", observed_at=clock.ago(100))
+    assert s.jobs["Manila"].due == clock.now + 500
+
+    s.track("Cebu", observed_at=clock.ago(900))  # Older than the cadence
+    assert s.jobs["Cebu"].due == clock.now + s.min_interval
+
+
+def test_hidden_cards_wait_longer_and_catch_up_when_shown():
+    clock = Clock()
+    s = scheduler(Upstream(None), clock)
+    s.track("Manila", visible=False, observed_at=clock.ago(0))
+    assert s.jobs["Manila"].due == clock.now + 600 * 3
+
+    s.set_visible("Manila", True)
+    assert s.jobs["Manila"].due == clock.now + s.min_interval
+
+
+def test_same_observation_backs_off_to_the_cadence():
+    clock = Clock()
+    observed = clock.ago(550)
+    upstream = Upstream(observed)
+    s = scheduler(upstream, clock)
+    s.track("Manila", observed_at=observed)
+
+    assert asyncio.run(drive(s, clock, upstream, 5)) == [240, 480, 600, 600, 600]
+
+
+def test_new_observation_resets_the_wait():
+    clock = Clock()
+    first = clock.ago(0)
+    # The second refresh brings back the same observation, the third a newer one.
+    newer = first + timedelta(seconds=600 + 570)  # Published 30 s before the third refresh
+    upstream = Upstream(first, first, newer)
+    s = scheduler(upstream, clock)
+    s.track("Manila")
+
+    assert asyncio.run(drive(s, clock, upstream, 3)) == [600, 600, 570]
+
+
+def test_failures_back_off_exponentially_up_to_the_cap():
+    clock = Clock()
+    error = RuntimeError("upstream down")
+    upstream = Upstream(*[error] * 6, None)
+    s = scheduler(upstream, clock, max_backoff=1800)
+    s.track("Manila")
+
+    delays = asyncio.run(drive(s, clock, upstream, 7))
+
+    assert delays == [120, 240, 480, 960, 1800, 1800, 600]
+    assert s.jobs["Manila"].failures == 0
+
+
+def test_jitter_stays_within_bounds():
+    random.seed(5)
+    clock = Clock()
+    s = RefreshScheduler(Upstream(None), jitter=0.15, clock=clock)
+    s.track("Manila")
+
+    delays = []
+    for _ in range(500):
+        s.mark_fresh("Manila", clock.ago(0))
+        delays.append(s.jobs["Manila"].due - clock.now)
+
+    assert all(600 * 0.85 <= delay <= 600 * 1.15 for delay in delays)
+    assert max(delays) - min(delays) > 60  # Actually spread out
+
+
+def test_paused_scheduler_fetches_nothing_until_resumed():
+    clock = Clock()
+    upstream = Upstream(None)
+    s = scheduler(upstream, clock)
+
+    async def scenario() -> None:
+        s.pause()
+        task = asyncio.ensure_future(s.run())
+        s.track("Manila")  # Due immediately
+        await _settle()
+        assert upstream.calls == []
+
+        s.resume()
+        await _settle()
+        assert upstream.calls == ["Manila"]
+        task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_pause_from_another_thread():
+    s = scheduler(Upstream(None), Clock())
+
+    async def scenario() -> None:
+        task = asyncio.ensure_future(s.run())
+        await _settle()
+        await asyncio.to_thread(s.pause)
+        await _settle()
+        assert s.paused
+        await asyncio.to_thread(s.resume)
+        await _settle()
+        assert not s.paused
+        task.cancel()
+
+    asyncio.run(scenario())
+
+
+def test_untracked_cities_are_ignored():
+    clock = Clock()
+    s = scheduler(Upstream(None), clock)
+    s.track("Manila")
+    s.untrack("Manila")
+
+    s.mark_fresh("Manila", clock.ago(0))
+    s.set_visible("Manila", False)
+
+    assert s.jobs == {}
+
+
+@pytest.mark.parametrize("visible, expected", [(True, 600), (False, 1800)])
+def test_delay_after_refresh_depends_on_visibility(visible, expected):
+    clock = Clock()
+    upstream = Upstream(None)
+    s = scheduler(upstream, clock)
+    s.track("Manila", visible=visible)
+    upstream.outcomes = [clock.ago(0)]
+
+    assert asyncio.run(drive(s, clock, upstream, 1)) == [expected]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import random
+
+import pytest
+
+from weather_app.cache import SingleFlight
+from weather_app.services import WeatherService
+from weather_app.transport import HttpClient
+
+CITIES = ["London", "Paris", "Tokyo", "Manila", "Cebu", "Berlin", "Madrid", "Rome"]
+
+
+def test_single_flight_collapses_concurrent_calls():
+    flights: SingleFlight[str, int] = SingleFlight()
+    upstream = 0
+
+    async def load() -> int:
+        nonlocal upstream
+        upstream += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def scenario() -> list[int]:
+        return await asyncio.gather(*(flights.run("london", load) for _ in range(100)))
+
+    results = asyncio.run(scenario())
+
+    assert results == [42] * 100
+    assert upstream == 1
+    assert flights.stats.calls == 100
+    assert flights.stats.joined == 99
+    assert len(flights) == 0  # Forgotten once done, so the next call goes upstream again
+
+
+def test_single_flight_shares_failures_and_survives_a_cancelled_caller():
+    flights: SingleFlight[str, int] = SingleFlight()
+
+    async def fail() -> int:
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def slow() -> int:
+        await asyncio.sleep(0.02)
+        return 7
+
+    async def scenario() -> None:
+        failures = await asyncio.gather(*(flights.run("a", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(error, RuntimeError) for error in failures)
+
+        first = asyncio.ensure_future(flights.run("b", slow))
+        second = asyncio.ensure_future(flights.run("b", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == 7
+
+    asyncio.run(scenario())
+
+
+async def _session(service: WeatherService, rng: random.Random) -> None:
+    """Network work of one dashboard session: a main city plus a 3-city watchlist."""
+    await asyncio.sleep(rng.uniform(0, 0.01))  # Sessions arrive staggered
+    for city in [rng.choice(CITIES), *rng.sample(CITIES, 3)]:
+        weather = await service.fetch_weather(city)
+        await service.fetch_air_quality(weather.latitude, weather.longitude)
+    await service.fetch_hourly_forecast(weather.latitude, weather.longitude)
+
+
+def _service(stub) -> WeatherService:
+    service = WeatherService(api_key="test", http=HttpClient(transport=stub.transport))
+    service.router.providers = service.router.providers[:1]  # OpenWeatherMap only
+    return service
+
+
+@pytest.mark.parametrize("sessions", [300])
+def test_shared_service_load(stub, sessions):
+    """Hundreds of concurrent sessions against one shared service vs one service each."""
+    stub.latency = lambda n: 0.02
+    rng = random.Random(1)
+
+    async def run(shared: bool) -> int:
+        before = len(stub.requests)
+        service = _service(stub)
+        services = [service if shared else _service(stub) for _ in range(sessions)]
+        await asyncio.gather(*(_session(s, rng) for s in services))
+        return len(stub.requests) - before
+
+    isolated = asyncio.run(run(shared=False))
+    shared = asyncio.run(run(shared=True))
+    print(
+        f"\n{sessions} sessions: {isolated / sessions:.2f} upstream calls per session "
+        f"with a service each, {shared / sessions:.3f} with one shared service"
+    )
+
+    # Each city's weather once; every stub city shares one air and forecast cell.
+    assert shared <= len(CITIES) + 2
+    assert isolated >= sessions * 4
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from weather_app.solar import SolarTable, next_event, solar_day
+
+TOLERANCE = timedelta(minutes=3)
+
+LONDON = (51.5074, -0.1278)
+NEW_YORK = (40.7128, -74.006)
+SYDNEY = (-33.8688, 151.2093)
+TROMSO = (69.6492, 18.9553)
+
+
+def utc(*fields: int) -> datetime:
+    return datetime(*fields, tzinfo=timezone.utc)
+
+
+# Published almanac times (NOAA solar calculator), converted to UTC.
+ALMANAC = [
+    (LONDON, date(2024, 6, 21), utc(2024, 6, 21, 3, 43), utc(2024, 6, 21, 20, 21)),
+    (LONDON, date(2024, 12, 21), utc(2024, 12, 21, 8, 4), utc(2024, 12, 21, 15, 54)),
+    # Local evening falls on the next UTC day west of Greenwich...
+    (NEW_YORK, date(2024, 6, 20), utc(2024, 6, 20, 9, 25), utc(2024, 6, 21, 0, 31)),
+    # ...and local morning on the previous UTC day east of it.
+    (SYDNEY, date(2024, 1, 1), utc(2023, 12, 31, 18, 48), utc(2024, 1, 1, 9, 9)),
+]
+
+
+@pytest.mark.parametrize("place, day, sunrise, sunset", ALMANAC, ids=["london-june", "london-dec", "new-york", "sydney"])
+def test_matches_almanac(place, day, sunrise, sunset):
+    sun = solar_day(*place, day)
+
+    assert abs(sun.sunrise - sunrise) < TOLERANCE
+    assert abs(sun.sunset - sunset) < TOLERANCE
+    assert abs(sun.daylight - (sun.sunset - sun.sunrise)) < timedelta(seconds=1)
+
+
+def test_polar_day_and_night():
+    summer = solar_day(*TROMSO, date(2024, 6, 21))
+    winter = solar_day(*TROMSO, date(2024, 12, 21))
+
+    assert summer.sunrise is None and summer.sunset is None
+    assert summer.daylight == timedelta(days=1)
+    assert winter.sunrise is None and winter.sunset is None
+    assert winter.daylight == timedelta(0)
+
+
+def test_table_agrees_with_single_days():
+    start = date(2024, 3, 18)
+    places = [LONDON, NEW_YORK, SYDNEY, TROMSO]
+    table = SolarTable(places, start, days=7)
+
+    assert len(table) == len(places)
+    for row, place in enumerate(places):
+        for offset in range(7):
+            assert table.day(row, offset) == solar_day(*place, start + timedelta(days=offset))
+
+
+def test_table_needs_a_day():
+    with pytest.raises(ValueError):
+        SolarTable([LONDON], date(2024, 1, 1), days=0)
+
+
+def test_next_event():
+    bst = timezone(timedelta(hours=1))
+
+    name, when = next_event(*LONDON, utc(2024, 6, 21, 12), bst)
+    assert name == "sunset"
+    assert abs(when - utc(2024, 6, 21, 20, 21)) < TOLERANCE
+
+    name, when = next_event(*LONDON, utc(2024, 6, 21, 22), bst)
+    assert name == "sunrise"
+    assert when.date() == date(2024, 6, 22)
+
+    assert next_event(*TROMSO, utc(2024, 6, 21, 12), timezone.utc) is None
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from weather_app.startup import IMPORT_BUDGET_MS, StartupTimer, import_times
+
+BASELINE = Path(__file__).resolve().parents[1] / "benchmarks" / "importtime.txt"
+
+
+def test_timer_keeps_the_first_mark():
+    timer = StartupTimer(origin=0.0)
+    timer.mark("imports")
+    first = timer.phases["imports"]
+    timer.mark("imports")
+
+    assert timer.phases == {"imports": first}
+    assert "imports" in timer.report()
+
+
+@pytest.mark.benchmark
+def test_app_modules_import_within_budget():
+    totals = import_times()
+    own_ms = totals["weather_app"] / 1000
+    baseline = BASELINE.read_text(encoding="utf-8").splitlines()[-1]
+    print(f"\nweather_app modules: {own_ms:.1f} ms, flet {totals.get('flet', 0) / 1000:.1f} ms")
+    print(f"baseline {baseline}")
+
+    assert own_ms <= IMPORT_BUDGET_MS
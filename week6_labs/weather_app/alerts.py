@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Final, Iterable, Mapping, Sequence
+
+try:
+    from .models import AirQualityData, ForecastSlot, WeatherData
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, ForecastSlot, WeatherData
+
+ANY_CITY: Final[str] = "*"
+RAIN_WORDS: Final[tuple[str, ...]] = ("rain", "drizzle", "storm", "thunder")
+
+# Field -> label; every field is numeric so rules are plain threshold checks.
+ALERT_FIELDS: Final[dict[str, str]] = {
+    "temperature": "Temperature",
+    "feels_like": "Feels like",
+    "humidity": "Humidity",
+    "wind_speed": "Wind",
+    "aqi": "AQI",
+    "rain_in_hours": "Rain within (h)",
+}
+OPERATORS: Final[dict[str, Callable[[float, float], bool]]] = {
+    ">": float.__gt__,
+    ">=": float.__ge__,
+    "<": float.__lt__,
+    "<=": float.__le__,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class AlertRule:
+    """Fires when ``field op threshold`` holds for ``city`` (or any city)."""
+
+    field: str
+    op: str
+    threshold: float
+    city: str = ANY_CITY
+
+    def __post_init__(self) -> None:
+        if self.field not in ALERT_FIELDS:
+            raise ValueError(f"Unknown alert field {self.field!r}")
+        if self.op not in OPERATORS:
+            raise ValueError(f"Unknown alert operator {self.op!r}")
+
+    def matches(self, value: float) -> bool:
+        # NaN (no reading) never matches.
+        return OPERATORS[self.op](float(value), float(self.threshold))
+
+    def describe(self) -> str:
+        return f"{ALERT_FIELDS[self.field]} {self.op} {self.threshold:g}"
+
+
+@dataclass(frozen=True, slots=True)
+class Alert:
+    rule: AlertRule
+    city: str
+    value: float
+    at: datetime
+
+    def message(self, city_label: str | None = None) -> str:
+        value = f"{self.value:.1f}".rstrip("0").rstrip(".")
+        return f"{city_label or self.city}: {ALERT_FIELDS[self.rule.field]} {value} ({self.rule.describe()})"
+
+
+def observation_values(
+    weather: WeatherData,
+    air: AirQualityData | None = None,
+    forecast: Sequence[ForecastSlot] | None = None,
+    now: datetime | None = None,
+) -> dict[str, float]:
+    """Alert fields available for one reading; fields that were not fetched are omitted."""
+    values = {
+        "temperature": weather.temperature,
+        "feels_like": weather.feels_like,
+        "humidity": float(weather.humidity),
+        "wind_speed": weather.wind_speed,
+    }
+    if air is not None:
+        values["aqi"] = float(air.aqi)
+    if forecast is not None:
+        now = now or datetime.now(timezone.utc)
+        values["rain_in_hours"] = math.nan
+        for slot in forecast:
+            if any(word in slot.description.lower() for word in RAIN_WORDS):
+                values["rain_in_hours"] = max(0.0, (slot.time - now).total_seconds() / 3600)
+                break
+    return values
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (math.isnan(a) and math.isnan(b))
+
+
+class AlertEngine:
+    """Incremental threshold alerts over per-city observations.
+
+    Rules are indexed by ``(city, field)``. :meth:`observe` diffs the new
+    values against the last ones seen for that city and evaluates only the
+    rules on fields that changed. A rule fires once when it becomes true
+    and re-arms when it turns false again, so repeat readings never fire
+    twice.
+    """
+
+    def __init__(self, rules: Iterable[AlertRule] = (), log_size: int = 50) -> None:
+        self._index: dict[tuple[str, str], list[AlertRule]] = {}
+        self._values: dict[str, dict[str, float]] = {}
+        self._active: set[tuple[AlertRule, str]] = set()
+        self.log: deque[Alert] = deque(maxlen=log_size)
+        self.evaluations = 0
+        for rule in rules:
+            self.add_rule(rule)
+
+    @property
+    def rules(self) -> list[AlertRule]:
+        return [rule for rules in self._index.values() for rule in rules]
+
+    def add_rule(self, rule: AlertRule) -> list[Alert]:
+        """Register ``rule`` and check it against the readings already seen."""
+        rules = self._index.setdefault((rule.city, rule.field), [])
+        if rule in rules:
+            return []
+        rules.append(rule)
+        cities = self._values if rule.city == ANY_CITY else [rule.city]
+        fired = []
+        for city in cities:
+            value = self._values.get(city, {}).get(rule.field)
+            if value is not None:
+                fired.extend(self._check(rule, city, value, datetime.now(timezone.utc)))
+        return fired
+
+    def remove_rule(self, rule: AlertRule) -> None:
+        rules = self._index.get((rule.city, rule.field), [])
+        if rule in rules:
+            rules.remove(rule)
+        self._active = {entry for entry in self._active if entry[0] != rule}
+
+    def forget(self, city: str) -> None:
+        """Drop a city's readings and firing state (e.g. removed from the watchlist)."""
+        self._values.pop(city, None)
+        self._active = {entry for entry in self._active if entry[1] != city}
+
+    def observe(self, city: str, values: Mapping[str, float], at: datetime | None = None) -> list[Alert]:
+        """Record new values for ``city`` and return the alerts that newly fired."""
+        at = at or datetime.now(timezone.utc)
+        previous = self._values.setdefault(city, {})
+        fired: list[Alert] = []
+        for field, value in values.items():
+            old = previous.get(field)
+            if old is not None and _same(old, value):
+                continue
+            previous[field] = value
+            for rule in (*self._index.get((city, field), ()), *self._index.get((ANY_CITY, field), ())):
+                fired.extend(self._check(rule, city, value, at))
+        return fired
+
+    def _check(self, rule: AlertRule, city: str, value: float, at: datetime) -> list[Alert]:
+        self.evaluations += 1
+        key = (rule, city)
+        if not rule.matches(value):
+            self._active.discard(key)
+            return []
+        if key in self._active:
+            return []
+        self._active.add(key)
+        alert = Alert(rule, city, value, at)
+        self.log.append(alert)
+        return [alert]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Hit/miss counters for a single cache."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+class TTLCache(Generic[K, V]):
+    """Size-bounded LRU mapping whose entries expire ``ttl`` seconds after being stored."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = 512,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > self._clock()
+
+    def get(self, key: K) -> V | None:
+        """Return a fresh value and record the lookup in ``stats``."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            if entry is not None:
+                del self._entries[key]
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+@dataclass(slots=True)
+class FlightStats:
+    """Counters for a :class:`SingleFlight` table."""
+
+    calls: int = 0
+    joined: int = 0
+
+    @property
+    def upstream(self) -> int:
+        return self.calls - self.joined
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls for the same key into one in-flight task.
+
+    Callers that arrive while a call for ``key`` is running await its result
+    (or exception) instead of starting their own.
+    """
+
+    def __init__(self) -> None:
+        self.stats = FlightStats()
+        self._inflight: dict[K, asyncio.Future[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        self.stats.calls += 1
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.joined += 1
+            # Shielded so one cancelled session does not cancel everyone's call.
+            return await asyncio.shield(future)
+
+        future = self._inflight[key] = asyncio.ensure_future(call())
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: K, future: asyncio.Future[V]) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # Mark as retrieved when every caller went away
@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Final, Generic, Iterator, Sequence, TypeVar
+
+try:
+    from .models import AirQualityData, ForecastSlot, WeatherData
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, ForecastSlot, WeatherData
+
+T = TypeVar("T")
+
+MAGIC: Final[bytes] = b"WXB\x00"
+VERSION: Final[int] = 1
+
+# magic, version, kind, record count, string count
+HEADER: Final[struct.Struct] = struct.Struct("<4sHHII")
+STRING_OFFSET_SIZE: Final[int] = 4  # String table entries are little-endian uint32 end offsets
+NO_TIME: Final[int] = -(2**63)  # Stands in for ``observed_at=None``
+
+
+class CodecError(ValueError):
+    """Raised when a buffer is not a record batch this module can read."""
+
+
+@dataclass(frozen=True, slots=True)
+class RecordLayout(Generic[T]):
+    """Fixed-size binary layout of one model class."""
+
+    kind: int
+    struct: struct.Struct
+    pack: Callable[[T, Callable[[str], int]], tuple]
+    unpack: Callable[[tuple, Sequence[str]], T]
+
+
+def _epoch(value: datetime | None) -> int:
+    return NO_TIME if value is None else int(value.timestamp())
+
+
+def _time(value: int) -> datetime | None:
+    return None if value == NO_TIME else datetime.fromtimestamp(value, tz=timezone.utc)
+
+
+# Strings are stored once per batch and referenced by index, so a snapshot
+# of many observations of the same city pays for "Manila" only once.
+WEATHER: Final[RecordLayout[WeatherData]] = RecordLayout(
+    kind=1,
+    # city, country, temperature, feels_like, description, humidity, wind_speed,
+    # icon, sunrise, sunset, timezone_offset, latitude, longitude, observed_at
+    struct=struct.Struct("<IIddIhdIqqiddq"),
+    pack=lambda w, s: (
+        s(w.city), s(w.country), w.temperature, w.feels_like, s(w.description), w.humidity,
+        w.wind_speed, s(w.icon), int(w.sunrise.timestamp()), int(w.sunset.timestamp()),
+        w.timezone_offset, w.latitude, w.longitude, _epoch(w.observed_at),
+    ),
+    unpack=lambda r, s: WeatherData(
+        s[r[0]], s[r[1]], r[2], r[3], s[r[4]], r[5], r[6], s[r[7]],
+        _time(r[8]), _time(r[9]), r[10], r[11], r[12], _time(r[13]),
+    ),
+)
+
+AIR_QUALITY: Final[RecordLayout[AirQualityData]] = RecordLayout(
+    kind=2,
+    struct=struct.Struct("<hddddd"),
+    pack=lambda a, s: (a.aqi, a.co, a.no2, a.o3, a.pm2_5, a.pm10),
+    unpack=lambda r, s: AirQualityData(*r),
+)
+
+FORECAST: Final[RecordLayout[ForecastSlot]] = RecordLayout(
+    kind=3,
+    # time, temperature, humidity, description, icon
+    struct=struct.Struct("<qdhII"),
+    pack=lambda f, s: (int(f.time.timestamp()), f.temperature, f.humidity, s(f.description), s(f.icon)),
+    unpack=lambda r, s: ForecastSlot(_time(r[0]), r[1], r[2], s[r[3]], s[r[4]]),
+)
+
+LAYOUTS: Final[dict[type, RecordLayout]] = {
+    WeatherData: WEATHER,
+    AirQualityData: AIR_QUALITY,
+    ForecastSlot: FORECAST,
+}
+# Older versions get their own table here when a layout changes.
+LAYOUTS_BY_VERSION: Final[dict[int, dict[int, RecordLayout]]] = {
+    VERSION: {layout.kind: layout for layout in LAYOUTS.values()},
+}
+
+
+def encode(records: Sequence[T]) -> bytes:
+    """Pack records of one model class into a self-describing batch.
+
+    Layout: header, fixed-size records, then the string table as an offset
+    array followed by UTF-8 data.
+    """
+    if not records:
+        raise CodecError("Cannot encode an empty batch")
+    kind = type(records[0])
+    layout = LAYOUTS.get(kind)
+    if layout is None:
+        raise CodecError(f"No binary layout for {kind.__name__}")
+    mixed = next((record for record in records if type(record) is not kind), None)
+    if mixed is not None:
+        raise CodecError(f"Cannot mix {type(mixed).__name__} into a batch of {kind.__name__}")
+
+    strings: dict[str, int] = {}
+
+    def intern(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    size = layout.struct.size
+    body = bytearray(size * len(records))
+    for i, record in enumerate(records):
+        layout.struct.pack_into(body, i * size, *layout.pack(record, intern))
+
+    encoded = [value.encode("utf-8") for value in strings]
+    offsets, end = [], 0
+    for data in encoded:
+        end += len(data)
+        offsets.append(end)
+
+    return b"".join(
+        (
+            HEADER.pack(MAGIC, VERSION, layout.kind, len(records), len(strings)),
+            body,
+            struct.pack(f"<{len(offsets)}I", *offsets),
+            *encoded,
+        )
+    )
+
+
+class RecordBatch(Generic[T]):
+    """Read-only view over an encoded batch.
+
+    The buffer is never copied: records are unpacked straight from a
+    ``memoryview`` when accessed, so a memory-mapped snapshot can be indexed
+    without decoding the rest of it.
+    """
+
+    def __init__(self, buffer: bytes | bytearray | memoryview | mmap.mmap) -> None:
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise CodecError("Buffer too short for a record batch header")
+        magic, version, kind, count, string_count = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise CodecError("Not a weather record batch")
+        layouts = LAYOUTS_BY_VERSION.get(version)
+        if layouts is None or kind not in layouts:
+            raise CodecError(f"Unsupported batch version {version} / kind {kind}")
+
+        self.version = version
+        self.layout: RecordLayout[T] = layouts[kind]
+        self.count = count
+        start = HEADER.size
+        end = start + count * self.layout.struct.size
+        table_start = end + string_count * STRING_OFFSET_SIZE
+        if len(view) < table_start:
+            raise CodecError("Truncated record batch")
+
+        self.records = view[start:end]
+        offsets = struct.unpack_from(f"<{string_count}I", view, end)
+        data = view[table_start:]
+        previous = 0
+        strings = []
+        for offset in offsets:
+            strings.append(str(data[previous:offset], "utf-8"))
+            previous = offset
+        self.strings: list[str] = strings
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> T:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("record index out of range")
+        row = self.layout.struct.unpack_from(self.records, index * self.layout.struct.size)
+        return self.layout.unpack(row, self.strings)
+
+    def __iter__(self) -> Iterator[T]:
+        unpack, strings = self.layout.unpack, self.strings
+        for row in self.layout.struct.iter_unpack(self.records):
+            yield unpack(row, strings)
+
+    def rows(self) -> Iterator[tuple]:
+        """Raw field tuples (string indices, epoch seconds) without building models."""
+        return self.layout.struct.iter_unpack(self.records)
+
+
+def decode(buffer: bytes | bytearray | memoryview) -> list:
+    """Decode a whole batch into model instances."""
+    return list(RecordBatch(buffer))
+
+
+def write_snapshot(path: Path | str, records: Sequence[T]) -> None:
+    """Atomically write ``records`` to ``path``."""
+    target = Path(path)
+    temporary = target.with_suffix(target.suffix + ".tmp")
+    data = encode(records)
+    try:
+        temporary.write_bytes(data)
+        temporary.replace(target)
+    except OSError:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+def read_snapshot(path: Path | str) -> RecordBatch:
+    """Memory-map a snapshot file; records are decoded on access."""
+    with open(path, "rb") as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    return RecordBatch(mapped)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+from array import array
+from typing import Final
+
+try:
+    from .models import AirQualityData, WeatherData
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, WeatherData
+
+COMPARISON_COLUMNS: Final[tuple[str, ...]] = ("temperature", "humidity", "wind_speed", "aqi", "change")
+
+# View name -> (label, column ranked in descending order)
+COMPARISON_VIEWS: Final[dict[str, tuple[str, str]]] = {
+    "hottest": ("Hottest", "temperature"),
+    "humid": ("Most humid", "humidity"),
+    "windiest": ("Windiest", "wind_speed"),
+    "worst_aqi": ("Worst air quality", "aqi"),
+    "change": ("Biggest change", "change"),
+}
+
+
+class ComparisonTable:
+    """Columnar snapshot of the watchlist for ranking cities.
+
+    One row per city in ``array('d')`` columns; ``change`` holds the
+    absolute temperature change since that city's previous reading.
+    Rankings are cached until a row changes.
+    """
+
+    def __init__(self) -> None:
+        self.cities: list[str] = []
+        self.columns: dict[str, array] = {name: array("d") for name in COMPARISON_COLUMNS}
+        self._rows: dict[str, int] = {}
+        self._observed: list[float] = []
+        self._rankings: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.cities)
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._rows
+
+    def update(self, city: str, weather: WeatherData, air: AirQualityData | None = None) -> None:
+        observed = weather.observed_at.timestamp() if weather.observed_at else math.nan
+        row = self._rows.get(city)
+        if row is None:
+            row = self._rows[city] = len(self.cities)
+            self.cities.append(city)
+            self._observed.append(observed)
+            for column in self.columns.values():
+                column.append(math.nan)
+            change = math.nan
+        elif observed == self._observed[row]:
+            # Same upstream reading (e.g. served from cache): only fill in late air data.
+            if air is not None and self.columns["aqi"][row] != air.aqi:
+                self.columns["aqi"][row] = air.aqi
+                self._rankings.clear()
+            return
+        else:
+            change = abs(weather.temperature - self.columns["temperature"][row])
+            self._observed[row] = observed
+
+        columns = self.columns
+        columns["temperature"][row] = weather.temperature
+        columns["humidity"][row] = weather.humidity
+        columns["wind_speed"][row] = weather.wind_speed
+        if air is not None:
+            columns["aqi"][row] = air.aqi
+        columns["change"][row] = change
+        self._rankings.clear()
+
+    def remove(self, city: str) -> None:
+        """Drop a city by moving the last row into its slot."""
+        row = self._rows.pop(city, None)
+        if row is None:
+            return
+        last = len(self.cities) - 1
+        if row != last:
+            moved = self.cities[last]
+            self.cities[row] = moved
+            self._observed[row] = self._observed[last]
+            for column in self.columns.values():
+                column[row] = column[last]
+            self._rows[moved] = row
+        self.cities.pop()
+        self._observed.pop()
+        for column in self.columns.values():
+            column.pop()
+        self._rankings.clear()
+
+    def value(self, city: str, column: str) -> float:
+        return self.columns[column][self._rows[city]]
+
+    def ranking(self, view: str) -> list[str]:
+        """Cities ordered for ``view``, highest first; cities without a value go last."""
+        ranked = self._rankings.get(view)
+        if ranked is None:
+            column = self.columns[COMPARISON_VIEWS[view][1]]
+            # NaN sorts after every real value in descending order.
+            keys = [-math.inf if math.isnan(v) else v for v in column]
+            order = sorted(range(len(keys)), key=keys.__getitem__, reverse=True)
+            ranked = self._rankings[view] = [self.cities[i] for i in order]
+        return ranked
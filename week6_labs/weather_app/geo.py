@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import math
+from typing import Final, Iterable
+
+try:
+    from .models import City
+except ImportError:
+    # Allow running as a script directly
+    from models import City
+
+EARTH_RADIUS_KM: Final[float] = 6371.0088
+
+# Bundled coordinates used to name a position without a network lookup.
+BUNDLED_CITIES: Final[tuple[tuple[str, str, float, float], ...]] = (
+    # Philippines
+    ("Manila", "PH", 14.5995, 120.9842),
+    ("Quezon City", "PH", 14.6760, 121.0437),
+    ("Caloocan", "PH", 14.6507, 120.9676),
+    ("Makati", "PH", 14.5547, 121.0244),
+    ("Pasig", "PH", 14.5764, 121.0851),
+    ("Taguig", "PH", 14.5176, 121.0509),
+    ("Antipolo", "PH", 14.5860, 121.1761),
+    ("Calamba", "PH", 14.2117, 121.1653),
+    ("Santa Rosa", "PH", 14.3122, 121.1114),
+    ("Dasmarinas", "PH", 14.3294, 120.9367),
+    ("Batangas City", "PH", 13.7565, 121.0583),
+    ("Lipa", "PH", 13.9411, 121.1631),
+    ("Lucena", "PH", 13.9373, 121.6170),
+    ("Angeles", "PH", 15.1450, 120.5887),
+    ("San Fernando", "PH", 15.0286, 120.6898),
+    ("Olongapo", "PH", 14.8292, 120.2828),
+    ("Malolos", "PH", 14.8527, 120.8160),
+    ("Cabanatuan", "PH", 15.4865, 120.9667),
+    ("Tarlac City", "PH", 15.4755, 120.5963),
+    ("Dagupan", "PH", 16.0433, 120.3333),
+    ("Baguio", "PH", 16.4023, 120.5960),
+    ("Vigan", "PH", 17.5747, 120.3869),
+    ("Laoag", "PH", 18.1960, 120.5927),
+    ("Tuguegarao", "PH", 17.6132, 121.7270),
+    ("Naga", "PH", 13.6218, 123.1948),
+    ("Legazpi", "PH", 13.1391, 123.7438),
+    ("Puerto Princesa", "PH", 9.7392, 118.7353),
+    ("Iloilo City", "PH", 10.7202, 122.5621),
+    ("Bacolod", "PH", 10.6765, 122.9509),
+    ("Cebu City", "PH", 10.3157, 123.8854),
+    ("Lapu-Lapu", "PH", 10.3103, 123.9494),
+    ("Tagbilaran", "PH", 9.6500, 123.8500),
+    ("Tacloban", "PH", 11.2443, 125.0039),
+    ("Dumaguete", "PH", 9.3068, 123.3054),
+    ("Cagayan de Oro", "PH", 8.4542, 124.6319),
+    ("Iligan", "PH", 8.2280, 124.2452),
+    ("Butuan", "PH", 8.9475, 125.5406),
+    ("Davao City", "PH", 7.1907, 125.4553),
+    ("General Santos", "PH", 6.1164, 125.1716),
+    ("Zamboanga City", "PH", 6.9214, 122.0790),
+    ("Cotabato City", "PH", 7.2236, 124.2464),
+    # Asia
+    ("Tokyo", "JP", 35.6762, 139.6503),
+    ("Osaka", "JP", 34.6937, 135.5023),
+    ("Seoul", "KR", 37.5665, 126.9780),
+    ("Busan", "KR", 35.1796, 129.0756),
+    ("Beijing", "CN", 39.9042, 116.4074),
+    ("Shanghai", "CN", 31.2304, 121.4737),
+    ("Guangzhou", "CN", 23.1291, 113.2644),
+    ("Shenzhen", "CN", 22.5431, 114.0579),
+    ("Chengdu", "CN", 30.5728, 104.0668),
+    ("Hong Kong", "HK", 22.3193, 114.1694),
+    ("Taipei", "TW", 25.0330, 121.5654),
+    ("Hanoi", "VN", 21.0278, 105.8342),
+    ("Ho Chi Minh City", "VN", 10.8231, 106.6297),
+    ("Bangkok", "TH", 13.7563, 100.5018),
+    ("Kuala Lumpur", "MY", 3.1390, 101.6869),
+    ("Singapore", "SG", 1.3521, 103.8198),
+    ("Jakarta", "ID", -6.2088, 106.8456),
+    ("Surabaya", "ID", -7.2575, 112.7521),
+    ("Denpasar", "ID", -8.6705, 115.2126),
+    ("Phnom Penh", "KH", 11.5564, 104.9282),
+    ("Yangon", "MM", 16.8409, 96.1735),
+    ("Dhaka", "BD", 23.8103, 90.4125),
+    ("Kolkata", "IN", 22.5726, 88.3639),
+    ("Delhi", "IN", 28.7041, 77.1025),
+    ("Mumbai", "IN", 19.0760, 72.8777),
+    ("Bengaluru", "IN", 12.9716, 77.5946),
+    ("Chennai", "IN", 13.0827, 80.2707),
+    ("Karachi", "PK", 24.8607, 67.0011),
+    ("Lahore", "PK", 31.5204, 74.3587),
+    ("Kathmandu", "NP", 27.7172, 85.3240),
+    ("Colombo", "LK", 6.9271, 79.8612),
+    ("Tashkent", "UZ", 41.2995, 69.2401),
+    ("Almaty", "KZ", 43.2220, 76.8512),
+    ("Tehran", "IR", 35.6892, 51.3890),
+    ("Riyadh", "SA", 24.7136, 46.6753),
+    ("Dubai", "AE", 25.2048, 55.2708),
+    ("Doha", "QA", 25.2854, 51.5310),
+    ("Baghdad", "IQ", 33.3152, 44.3661),
+    ("Istanbul", "TR", 41.0082, 28.9784),
+    ("Ankara", "TR", 39.9334, 32.8597),
+    ("Tel Aviv", "IL", 32.0853, 34.7818),
+    # Oceania
+    ("Sydney", "AU", -33.8688, 151.2093),
+    ("Melbourne", "AU", -37.8136, 144.9631),
+    ("Brisbane", "AU", -27.4698, 153.0251),
+    ("Perth", "AU", -31.9505, 115.8605),
+    ("Darwin", "AU", -12.4634, 130.8456),
+    ("Auckland", "NZ", -36.8485, 174.7633),
+    ("Wellington", "NZ", -41.2865, 174.7762),
+    ("Port Moresby", "PG", -9.4438, 147.1803),
+    ("Suva", "FJ", -18.1248, 178.4501),
+    ("Honolulu", "US", 21.3069, -157.8583),
+    # Europe
+    ("London", "GB", 51.5074, -0.1278),
+    ("Manchester", "GB", 53.4808, -2.2426),
+    ("Edinburgh", "GB", 55.9533, -3.1883),
+    ("Dublin", "IE", 53.3498, -6.2603),
+    ("Paris", "FR", 48.8566, 2.3522),
+    ("Lyon", "FR", 45.7640, 4.8357),
+    ("Marseille", "FR", 43.2965, 5.3698),
+    ("Madrid", "ES", 40.4168, -3.7038),
+    ("Barcelona", "ES", 41.3874, 2.1686),
+    ("Lisbon", "PT", 38.7223, -9.1393),
+    ("Rome", "IT", 41.9028, 12.4964),
+    ("Milan", "IT", 45.4642, 9.1900),
+    ("Berlin", "DE", 52.5200, 13.4050),
+    ("Munich", "DE", 48.1351, 11.5820),
+    ("Hamburg", "DE", 53.5511, 9.9937),
+    ("Amsterdam", "NL", 52.3676, 4.9041),
+    ("Brussels", "BE", 50.8503, 4.3517),
+    ("Zurich", "CH", 47.3769, 8.5417),
+    ("Vienna", "AT", 48.2082, 16.3738),
+    ("Prague", "CZ", 50.0755, 14.4378),
+    ("Warsaw", "PL", 52.2297, 21.0122),
+    ("Budapest", "HU", 47.4979, 19.0402),
+    ("Bucharest", "RO", 44.4268, 26.1025),
+    ("Athens", "GR", 37.9838, 23.7275),
+    ("Copenhagen", "DK", 55.6761, 12.5683),
+    ("Oslo", "NO", 59.9139, 10.7522),
+    ("Stockholm", "SE", 59.3293, 18.0686),
+    ("Helsinki", "FI", 60.1699, 24.9384),
+    ("Reykjavik", "IS", 64.1466, -21.9426),
+    ("Kyiv", "UA", 50.4501, 30.5234),
+    ("Moscow", "RU", 55.7558, 37.6173),
+    ("Saint Petersburg", "RU", 59.9311, 30.3609),
+    ("Novosibirsk", "RU", 55.0084, 82.9357),
+    ("Vladivostok", "RU", 43.1198, 131.8869),
+    # Africa
+    ("Cairo", "EG", 30.0444, 31.2357),
+    ("Casablanca", "MA", 33.5731, -7.5898),
+    ("Algiers", "DZ", 36.7538, 3.0588),
+    ("Tunis", "TN", 36.8065, 10.1815),
+    ("Lagos", "NG", 6.5244, 3.3792),
+    ("Accra", "GH", 5.6037, -0.1870),
+    ("Dakar", "SN", 14.7167, -17.4677),
+    ("Addis Ababa", "ET", 9.0300, 38.7400),
+    ("Nairobi", "KE", -1.2921, 36.8219),
+    ("Dar es Salaam", "TZ", -6.7924, 39.2083),
+    ("Kinshasa", "CD", -4.4419, 15.2663),
+    ("Luanda", "AO", -8.8390, 13.2894),
+    ("Johannesburg", "ZA", -26.2041, 28.0473),
+    ("Cape Town", "ZA", -33.9249, 18.4241),
+    ("Antananarivo", "MG", -18.8792, 47.5079),
+    # North America
+    ("New York", "US", 40.7128, -74.0060),
+    ("Boston", "US", 42.3601, -71.0589),
+    ("Washington", "US", 38.9072, -77.0369),
+    ("Miami", "US", 25.7617, -80.1918),
+    ("Atlanta", "US", 33.7490, -84.3880),
+    ("Chicago", "US", 41.8781, -87.6298),
+    ("Houston", "US", 29.7604, -95.3698),
+    ("Dallas", "US", 32.7767, -96.7970),
+    ("Denver", "US", 39.7392, -104.9903),
+    ("Phoenix", "US", 33.4484, -112.0740),
+    ("Los Angeles", "US", 34.0522, -118.2437),
+    ("San Francisco", "US", 37.7749, -122.4194),
+    ("Seattle", "US", 47.6062, -122.3321),
+    ("Anchorage", "US", 61.2181, -149.9003),
+    ("Toronto", "CA", 43.6532, -79.3832),
+    ("Montreal", "CA", 45.5017, -73.5673),
+    ("Vancouver", "CA", 49.2827, -123.1207),
+    ("Calgary", "CA", 51.0447, -114.0719),
+    ("Mexico City", "MX", 19.4326, -99.1332),
+    ("Guadalajara", "MX", 20.6597, -103.3496),
+    ("Havana", "CU", 23.1136, -82.3666),
+    ("Panama City", "PA", 8.9824, -79.5199),
+    # South America
+    ("Bogota", "CO", 4.7110, -74.0721),
+    ("Caracas", "VE", 10.4806, -66.9036),
+    ("Quito", "EC", -0.1807, -78.4678),
+    ("Lima", "PE", -12.0464, -77.0428),
+    ("La Paz", "BO", -16.4897, -68.1193),
+    ("Santiago", "CL", -33.4489, -70.6693),
+    ("Buenos Aires", "AR", -34.6037, -58.3816),
+    ("Montevideo", "UY", -34.9011, -56.1645),
+    ("Asuncion", "PY", -25.2637, -57.5759),
+    ("Sao Paulo", "BR", -23.5505, -46.6333),
+    ("Rio de Janeiro", "BR", -22.9068, -43.1729),
+    ("Brasilia", "BR", -15.7975, -47.8919),
+    ("Manaus", "BR", -3.1190, -60.0217),
+    ("Recife", "BR", -8.0476, -34.8770),
+)
+
+_GEOHASH_ALPHABET: Final[str] = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def geohash(lat: float, lon: float, precision: int = 6) -> str:
+    """Encode a coordinate as a geohash cell of ``precision`` characters."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars: list[str] = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def _to_unit_vector(lat: float, lon: float) -> tuple[float, float, float]:
+    phi, lmb = math.radians(lat), math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lmb), cos_phi * math.sin(lmb), math.sin(phi))
+
+
+class CityIndex:
+    """Static k-d tree over city positions for offline nearest-city lookups.
+
+    Points live on the unit sphere so the tree is free of the seams at the
+    poles and the antimeridian; chord length preserves great-circle ordering.
+    """
+
+    def __init__(self, cities: Iterable[City]) -> None:
+        self._cities = list(cities)
+        self._points = [_to_unit_vector(c.latitude, c.longitude) for c in self._cities]
+        # Flattened tree: node -> (city index, split axis, left node, right node)
+        self._nodes: list[tuple[int, int, int, int]] = []
+        self._root = self._build(list(range(len(self._cities))), 0)
+
+    @classmethod
+    def bundled(cls) -> CityIndex:
+        """Index over the cities shipped with the app."""
+        return cls(City(name, country, lat, lon) for name, country, lat, lon in BUNDLED_CITIES)
+
+    def __len__(self) -> int:
+        return len(self._cities)
+
+    def _build(self, indices: list[int], depth: int) -> int:
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda i: self._points[i][axis])
+        mid = len(indices) // 2
+        node = len(self._nodes)
+        self._nodes.append((indices[mid], axis, -1, -1))
+        left = self._build(indices[:mid], depth + 1)
+        right = self._build(indices[mid + 1 :], depth + 1)
+        self._nodes[node] = (indices[mid], axis, left, right)
+        return node
+
+    def nearest(self, lat: float, lon: float) -> tuple[City, float] | None:
+        """Return the closest bundled city and its distance in kilometres."""
+        if self._root < 0:
+            return None
+        target = _to_unit_vector(lat, lon)
+        best_index = -1
+        best_dist = math.inf
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            index, axis, left, right = self._nodes[node]
+            point = self._points[index]
+            dist = sum((p - t) ** 2 for p, t in zip(point, target))
+            if dist < best_dist:
+                best_index, best_dist = index, dist
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Visit the far side only if the splitting plane is within reach.
+            if diff * diff < best_dist:
+                stack.append(far)
+            stack.append(near)
+
+        city = self._cities[best_index]
+        return city, haversine_km(lat, lon, city.latitude, city.longitude)
+
+
+def parse_coordinates(text: str) -> tuple[float, float] | None:
+    """Parse ``"lat, lon"`` search input, returning ``None`` for city names."""
+    parts = text.replace(";", ",").split(",")
+    if len(parts) != 2:
+        return None
+    try:
+        lat, lon = float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+        return None
+    return lat, lon
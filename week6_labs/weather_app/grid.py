@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Final, Iterator
+
+GRID_FIELDS: Final[tuple[str, ...]] = ("temperature", "humidity", "wind_speed", "aqi")
+MAX_GRID_POINTS: Final[int] = 10_000
+
+
+@dataclass(frozen=True, slots=True)
+class BoundingBox:
+    """Latitude/longitude rectangle, south-west to north-east corner."""
+
+    south: float
+    west: float
+    north: float
+    east: float
+
+    def __post_init__(self) -> None:
+        if not (-90 <= self.south <= self.north <= 90 and -180 <= self.west <= self.east <= 180):
+            raise ValueError("Bounding box must run south-west to north-east within valid coordinates")
+
+    @classmethod
+    def around(cls, lat: float, lon: float, radius_deg: float) -> BoundingBox:
+        return cls(
+            max(-90.0, lat - radius_deg),
+            max(-180.0, lon - radius_deg),
+            min(90.0, lat + radius_deg),
+            min(180.0, lon + radius_deg),
+        )
+
+
+@dataclass(slots=True)
+class GridPoint:
+    """One swept grid cell; ``row`` 0 is the northern edge."""
+
+    row: int
+    col: int
+    latitude: float
+    longitude: float
+    temperature: float
+    humidity: float
+    wind_speed: float
+    aqi: float
+
+
+class WeatherGrid:
+    """Row-major 2-D grids of conditions over a bounding box.
+
+    Each field is a flat ``array('d')`` filled with NaN until its point is
+    swept; :meth:`field` exposes it as a ``rows x cols`` memoryview, which
+    ``numpy.asarray`` wraps without copying.
+    """
+
+    def __init__(self, bbox: BoundingBox, step: float) -> None:
+        if step <= 0:
+            raise ValueError("Grid step must be positive")
+        self.bbox = bbox
+        self.step = step
+        self.rows = int(math.floor((bbox.north - bbox.south) / step + 1e-9)) + 1
+        self.cols = int(math.floor((bbox.east - bbox.west) / step + 1e-9)) + 1
+        if self.rows * self.cols > MAX_GRID_POINTS:
+            raise ValueError(f"Grid of {self.rows}x{self.cols} points exceeds {MAX_GRID_POINTS}")
+        size = self.rows * self.cols
+        self._fields = {name: array("d", [math.nan]) * size for name in GRID_FIELDS}
+        self.filled = 0
+
+    def __len__(self) -> int:
+        return self.rows * self.cols
+
+    def coordinates(self) -> Iterator[tuple[int, int, float, float]]:
+        """Yield ``(row, col, lat, lon)`` for every point, north to south."""
+        for row in range(self.rows):
+            lat = self.bbox.north - row * self.step
+            for col in range(self.cols):
+                yield row, col, lat, self.bbox.west + col * self.step
+
+    def set(self, point: GridPoint) -> None:
+        index = point.row * self.cols + point.col
+        if math.isnan(self._fields["temperature"][index]):
+            self.filled += 1
+        for name in GRID_FIELDS:
+            self._fields[name][index] = getattr(point, name)
+
+    def get(self, name: str, row: int, col: int) -> float:
+        return self._fields[name][row * self.cols + col]
+
+    def field(self, name: str) -> memoryview:
+        """2-D ``rows x cols`` view of one field (NaN where not yet swept)."""
+        return memoryview(self._fields[name]).cast("B").cast("d", (self.rows, self.cols))
+
+    def value_range(self, name: str) -> tuple[float, float] | None:
+        values = [v for v in self._fields[name] if not math.isnan(v)]
+        return (min(values), max(values)) if values else None
+
+
+HEAT_RAMP: Final[str] = " .:-=+*#%@"
+
+
+def render_text(grid: WeatherGrid, name: str = "temperature") -> str:
+    """Coarse character heat map of one field, for headless use."""
+    bounds = grid.value_range(name)
+    if bounds is None:
+        return ""
+    low, high = bounds
+    span = (high - low) or 1.0
+    lines = []
+    for row in range(grid.rows):
+        chars = []
+        for col in range(grid.cols):
+            value = grid.get(name, row, col)
+            if math.isnan(value):
+                chars.append("?")
+            else:
+                chars.append(HEAT_RAMP[min(len(HEAT_RAMP) - 1, int((value - low) / span * len(HEAT_RAMP)))])
+        lines.append("".join(chars))
+    return "\n".join(lines)
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Final, Sequence
+
+try:
+    from .models import AirQualityData, ForecastSlot, WeatherData
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, ForecastSlot, WeatherData
+
+logger = logging.getLogger(__name__)
+
+HOUR: Final[int] = 3600
+DAY: Final[int] = 24 * HOUR
+
+SCHEMA: Final[str] = """
+CREATE TABLE IF NOT EXISTS observations (
+    city TEXT NOT NULL,
+    country TEXT NOT NULL,
+    observed_at INTEGER NOT NULL,
+    temperature REAL NOT NULL,
+    feels_like REAL NOT NULL,
+    humidity INTEGER NOT NULL,
+    wind_speed REAL NOT NULL,
+    aqi INTEGER,
+    description TEXT NOT NULL,
+    icon TEXT NOT NULL,
+    PRIMARY KEY (city, country, observed_at)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS observations_hourly (
+    city TEXT NOT NULL,
+    country TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    samples INTEGER NOT NULL,
+    temp_avg REAL NOT NULL,
+    temp_min REAL NOT NULL,
+    temp_max REAL NOT NULL,
+    humidity_avg REAL NOT NULL,
+    wind_avg REAL NOT NULL,
+    aqi_avg REAL,
+    PRIMARY KEY (city, country, hour)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS forecasts (
+    city TEXT NOT NULL,
+    country TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    slot_time INTEGER NOT NULL,
+    temperature REAL NOT NULL,
+    humidity INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    icon TEXT NOT NULL,
+    PRIMARY KEY (city, country, fetched_at, slot_time)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(slots=True)
+class HistoryPoint:
+    """One stored observation."""
+
+    time: datetime
+    temperature: float
+    feels_like: float
+    humidity: int
+    wind_speed: float
+    aqi: int | None
+
+
+@dataclass(slots=True)
+class HistoryBucket:
+    """Aggregate of the observations that fall into one time bucket."""
+
+    start: datetime
+    samples: int
+    temperature: float
+    temp_min: float
+    temp_max: float
+    humidity: float
+    wind_speed: float
+    aqi: float | None
+
+
+@dataclass(slots=True)
+class RetentionPolicy:
+    """How long each table keeps its rows, in seconds."""
+
+    raw: int = 14 * DAY
+    hourly: int = 365 * DAY
+    forecasts: int = 7 * DAY
+
+
+class HistoryStore:
+    """Append-only SQLite store of every observation and forecast the app fetches.
+
+    Writes are queued and committed in batches by a background thread so the
+    UI loop never waits on disk. Raw rows are rolled up into hourly
+    aggregates as they are written; :meth:`downsample` serves coarse ranges
+    from the rollups, so raw rows can be pruned much earlier.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        retention: RetentionPolicy | None = None,
+        batch_size: int = 256,
+        batch_window: float = 0.25,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = str(path)
+        self.retention = retention or RetentionPolicy()
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.clock = clock
+        self._local = threading.local()
+        self._queue: queue.Queue[tuple[str, tuple] | None] = queue.Queue()
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self._local.conn = conn
+
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    # ------------------------------------------------------------------ writes
+    def record(self, weather: WeatherData, air: AirQualityData | None = None) -> None:
+        """Queue an observation; repeats of the same upstream reading are ignored."""
+        observed = weather.observed_at or datetime.fromtimestamp(self.clock(), tz=timezone.utc)
+        self._queue.put(
+            (
+                "observation",
+                (
+                    weather.city,
+                    weather.country,
+                    int(observed.timestamp()),
+                    weather.temperature,
+                    weather.feels_like,
+                    weather.humidity,
+                    weather.wind_speed,
+                    air.aqi if air else None,
+                    weather.description,
+                    weather.icon,
+                ),
+            )
+        )
+
+    def record_forecast(self, weather: WeatherData, slots: Sequence[ForecastSlot]) -> None:
+        """Queue a forecast snapshot taken for ``weather``'s city."""
+        fetched_at = int(self.clock())
+        for slot in slots:
+            self._queue.put(
+                (
+                    "forecast",
+                    (
+                        weather.city,
+                        weather.country,
+                        fetched_at,
+                        int(slot.time.timestamp()),
+                        slot.temperature,
+                        slot.humidity,
+                        slot.description,
+                        slot.icon,
+                    ),
+                )
+            )
+
+    def flush(self) -> None:
+        """Block until every queued write has been committed."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        last_prune: float | None = None  # Prune with the first batch, then hourly
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                conn.close()
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.batch_window
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    extra = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if extra is None:
+                    stop = True
+                    break
+                batch.append(extra)
+
+            try:
+                self._write_batch(conn, batch)
+                if last_prune is None or time.monotonic() - last_prune > HOUR:
+                    self._prune(conn)
+                    last_prune = time.monotonic()
+            except Exception:
+                # ``with conn`` has rolled the batch back; drop it and keep the
+                # writer alive so flush() and later writes still complete.
+                logger.exception("Dropped %d history writes", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if stop:
+                self._queue.task_done()
+                conn.close()
+                return
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list[tuple[str, tuple]]) -> None:
+        observations = [row for kind, row in batch if kind == "observation"]
+        forecasts = [row for kind, row in batch if kind == "forecast"]
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO observations VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                observations,
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO forecasts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                forecasts,
+            )
+            touched = {(row[0], row[1], row[2] // HOUR * HOUR) for row in observations}
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO observations_hourly
+                SELECT city, country, :hour, COUNT(*), AVG(temperature), MIN(temperature),
+                       MAX(temperature), AVG(humidity), AVG(wind_speed), AVG(aqi)
+                FROM observations
+                WHERE city = :city AND country = :country
+                  AND observed_at >= :hour AND observed_at < :hour + 3600
+                """,
+                [{"city": c, "country": k, "hour": h} for c, k, h in touched],
+            )
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        now = int(self.clock())
+        with conn:
+            conn.execute("DELETE FROM observations WHERE observed_at < ?", (now - self.retention.raw,))
+            conn.execute("DELETE FROM observations_hourly WHERE hour < ?", (now - self.retention.hourly,))
+            conn.execute("DELETE FROM forecasts WHERE fetched_at < ?", (now - self.retention.forecasts,))
+
+    # ------------------------------------------------------------------ reads
+    def observations(
+        self, city: str, country: str, since: datetime, until: datetime | None = None
+    ) -> list[HistoryPoint]:
+        """Raw observations for a city within ``[since, until)``, oldest first."""
+        end = int(until.timestamp()) if until else int(self.clock())
+        rows = self._reader().execute(
+            """
+            SELECT observed_at, temperature, feels_like, humidity, wind_speed, aqi
+            FROM observations
+            WHERE city = ? AND country = ? AND observed_at >= ? AND observed_at < ?
+            ORDER BY observed_at
+            """,
+            (city, country, int(since.timestamp()), end),
+        ).fetchall()
+        return [
+            HistoryPoint(datetime.fromtimestamp(row[0], tz=timezone.utc), *row[1:])
+            for row in rows
+        ]
+
+    def downsample(
+        self,
+        city: str,
+        country: str,
+        since: datetime,
+        until: datetime | None = None,
+        bucket_seconds: int = 3 * HOUR,
+    ) -> list[HistoryBucket]:
+        """Aggregate a city's history into fixed buckets, oldest first.
+
+        Buckets of an hour or more are built from the hourly rollups (weighted
+        by sample count) and therefore outlive raw-row retention.
+        """
+        start = int(since.timestamp())
+        end = int(until.timestamp()) if until else int(self.clock())
+        if bucket_seconds >= HOUR:
+            sql = """
+                SELECT hour / :bucket * :bucket AS bucket, SUM(samples),
+                       SUM(temp_avg * samples) / SUM(samples), MIN(temp_min), MAX(temp_max),
+                       SUM(humidity_avg * samples) / SUM(samples),
+                       SUM(wind_avg * samples) / SUM(samples), AVG(aqi_avg)
+                FROM observations_hourly
+                WHERE city = :city AND country = :country AND hour >= :start AND hour < :end
+                GROUP BY bucket ORDER BY bucket
+            """
+        else:
+            sql = """
+                SELECT observed_at / :bucket * :bucket AS bucket, COUNT(*),
+                       AVG(temperature), MIN(temperature), MAX(temperature),
+                       AVG(humidity), AVG(wind_speed), AVG(aqi)
+                FROM observations
+                WHERE city = :city AND country = :country
+                  AND observed_at >= :start AND observed_at < :end
+                GROUP BY bucket ORDER BY bucket
+            """
+        params = {"bucket": bucket_seconds, "city": city, "country": country, "start": start, "end": end}
+        rows = self._reader().execute(sql, params).fetchall()
+        return [
+            HistoryBucket(datetime.fromtimestamp(row[0], tz=timezone.utc), *row[1:])
+            for row in rows
+        ]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        # SQLite connections stay on their thread; WAL lets readers run beside the writer.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
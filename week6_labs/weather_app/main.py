@@ -1,41 +1,147 @@
 from __future__ import annotations
 
+import time
+
+_launched = time.perf_counter()  # Taken before the heavy imports below
+
+import argparse
 import asyncio
 import json
+import math
+import threading
+from concurrent.futures import Future
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Awaitable
 
 import flet as ft
 
 try:
-    from .models import AirQualityData, WeatherData
+    from .alerts import ALERT_FIELDS, ANY_CITY, OPERATORS, Alert, AlertEngine, AlertRule, observation_values
+    from .codec import read_snapshot, write_snapshot
+    from .comparison import COMPARISON_VIEWS, ComparisonTable
+    from .geo import parse_coordinates
+    from .grid import BoundingBox, WeatherGrid
+    from .history import HistoryStore
+    from .recent import RecentWeather
+    from .recommendations import Evaluation, Recommendation, RuleEngine, evaluate_dashboard
+    from .scheduler import RefreshScheduler
+    from .solar import SolarTable, next_event, solar_day
+    from .startup import StartupTimer
+    from .models import AirQualityData, City, ForecastSlot, WeatherData
     from .services import WeatherService, WeatherServiceError
 except ImportError:
     # Allow running as a script directly
-    from models import AirQualityData, WeatherData
+    from alerts import ALERT_FIELDS, ANY_CITY, OPERATORS, Alert, AlertEngine, AlertRule, observation_values
+    from codec import read_snapshot, write_snapshot
+    from comparison import COMPARISON_VIEWS, ComparisonTable
+    from geo import parse_coordinates
+    from grid import BoundingBox, WeatherGrid
+    from history import HistoryStore
+    from recent import RecentWeather
+    from recommendations import Evaluation, Recommendation, RuleEngine, evaluate_dashboard
+    from scheduler import RefreshScheduler
+    from solar import SolarTable, next_event, solar_day
+    from startup import StartupTimer
+    from models import AirQualityData, City, ForecastSlot, WeatherData
     from services import WeatherService, WeatherServiceError
 
+STARTUP = StartupTimer(origin=_launched)
+STARTUP.mark("imports")
+
+MAIN_CITY_KEY = "@main"  # Scheduler key for the searched city
+WATCH_CARD_HEIGHT = 190  # Approximate card height plus spacing, for visibility estimates
+HEAT_MAP_RADIUS = 1.0  # Degrees around the current city covered by "Scan area"
+HEAT_MAP_STEP = 0.5  # Degrees between grid points (5 x 5 points)
+HEAT_MAP_SUFFIXES = {"temperature": "°", "humidity": "%", "wind_speed": "", "aqi": ""}
+HEAT_MAP_RAMP = ("#3182CE", "#4FD1C5", "#68D391", "#F6E05E", "#F6AD55", "#FC8181", "#E53E3E")
+WATCHLIST_STORAGE_KEY = "weather_app.watchlist"  # Per-browser watchlist in web mode
+ALERTS_STORAGE_KEY = "weather_app.alerts"  # Per-browser alert rules in web mode
+ALERT_LOG_ROWS = 8  # Most recent alerts listed in the event log
+WEB_RATE_LIMIT = 1.0  # Upstream requests per second; OpenWeatherMap's free tier allows 60/min
+DATA_DIR = Path(__file__).parent / "data"
+
+_shared_backend: tuple[WeatherService, HistoryStore] | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_backend() -> tuple[WeatherService, HistoryStore]:
+    """Process-wide service and history store reused by every web session.
+
+    Sessions then share one connection pool, response cache, single-flight
+    table and rate limiter; only UI state stays per session.
+    """
+    global _shared_backend
+    with _shared_lock:
+        if _shared_backend is None:
+            DATA_DIR.mkdir(parents=True, exist_ok=True)
+            _shared_backend = (
+                WeatherService(hedge_requests=True, rate_limit=WEB_RATE_LIMIT),
+                HistoryStore(DATA_DIR / "history.sqlite3"),
+            )
+        return _shared_backend
+
 
 class WeatherApp:
     """Flet-based weather dashboard with multiple enhancements."""
 
-    def __init__(self, page: ft.Page) -> None:
+    def __init__(
+        self,
+        page: ft.Page,
+        service: WeatherService | None = None,
+        history: HistoryStore | None = None,
+    ) -> None:
         self.page = page
-        self.service = WeatherService()
+        self.service = service or WeatherService(hedge_requests=True)
+        # Network work starts now and overlaps with building the UI below.
+        self.page.run_task(self.service.warmup)
+        self.storage_dir = DATA_DIR
+        self.storage_dir.mkdir(parents=True, exist_ok=True)
+        self.location_file = self.storage_dir / "location.json"
+        # A fresh saved position makes the IP lookup unnecessary, so restore it first.
+        restored = None if page.web else self._restore_location()
+        self._location_request: Future | None = None if restored else self.page.run_task(self._locate)
         self.current_weather: WeatherData | None = None
         self.current_air: AirQualityData | None = None
-        self.hourly_forecast: list[dict] = []
+        self.hourly_forecast: list[ForecastSlot] = []
+        self.watch_weather: dict[str, WeatherData] = {}
+        self.watch_air: dict[str, AirQualityData | None] = {}
+        self._watch_cards: dict[str, ft.Container] = {}
+        self.comparison = ComparisonTable()
+        self.watch_sort = "added"
+        self.recommender = RuleEngine()
+        self.evaluation = Evaluation()
+        self._chip_cache: dict[Recommendation, ft.Control] = {}
+        self._shown_recommendations: tuple[Recommendation, ...] = ()
+        self.heat_grid: WeatherGrid | None = None
+        self._heat_cells: list[ft.Container] = []
 
-        self.storage_dir = Path(__file__).parent / "data"
-        self.storage_dir.mkdir(parents=True, exist_ok=True)
         self.watchlist_file = self.storage_dir / "watchlist.json"
         self.watchlist: list[str] = self._load_watchlist()
+        self.watch_snapshot_file = self.storage_dir / "watchlist.wxb"
+        self.alerts_file = self.storage_dir / "alerts.json"
+        self.alerts = AlertEngine(self._load_alert_rules())
+        self.history = history or HistoryStore(self.storage_dir / "history.sqlite3")
+        self.recent = RecentWeather()
         self.units = "metric"
 
+        self.scheduler = RefreshScheduler(self._scheduled_refresh)
+        STARTUP.mark("services")
+
         self._build_ui()
+        self._restore_watch_snapshot()
+        STARTUP.mark("first paint")
+        self.page.on_scroll = self._handle_scroll
+        self.page.on_scroll_interval = 250
+        self.page.on_app_lifecycle_state_change = self._handle_lifecycle
+        self.page.window.on_event = self._handle_window_event
+        self.page.on_close = self._handle_close
         self.page.run_task(self._refresh_watchlist)
-        self.page.run_task(self._countdown_loop)
         self.page.run_task(self._fetch_current_location)
+        self._background: list[Future] = [
+            self.page.run_task(self._countdown_loop),
+            self.page.run_task(self.scheduler.run),
+        ]
 
     # ------------------------------------------------------------------ UI setup
     def _build_ui(self) -> None:
@@ -81,6 +187,7 @@ class WeatherApp:
         self.main_icon = ft.Image(src="", width=120, height=120, fit=ft.ImageFit.CONTAIN, visible=False)
         self.temp_text = ft.Text(size=56, weight=ft.FontWeight.BOLD, color="#2D3748")
         self.feels_like_text = ft.Text(size=16, color="#718096", italic=True)
+        self.trend_text = ft.Text(size=14, color="#4A5568")
         self.description_text = ft.Text(size=18, color="#4A5568")
         self.current_time_text = ft.Text(size=15, color="#718096", italic=True)
         self.details_column = ft.Column(spacing=8)
@@ -99,7 +206,69 @@ class WeatherApp:
         self.air_details = ft.Column(spacing=6)
 
         self.watchlist_column = ft.Column(spacing=12, expand=True)
+        self.watch_sort_field = ft.Dropdown(
+            label="Sort by",
+            value="added",
+            options=[ft.dropdown.Option("added", "Order added")]
+            + [ft.dropdown.Option(view, label) for view, (label, _column) in COMPARISON_VIEWS.items()],
+            width=200,
+            dense=True,
+            on_change=self._handle_watch_sort,
+        )
         self.hourly_scroll = ft.Row(scroll=ft.ScrollMode.AUTO, spacing=10)
+        self.best_time_text = ft.Text(size=14, color="#4A5568", weight=ft.FontWeight.W_500)
+        self.history_caption = ft.Text(size=13, color="#718096")
+        self.history_chart = ft.LineChart(
+            height=180,
+            left_axis=ft.ChartAxis(labels_size=40),
+            bottom_axis=ft.ChartAxis(labels_size=36),
+            horizontal_grid_lines=ft.ChartGridLines(interval=5, color="#E2E8F0", width=1),
+            tooltip_bgcolor="#2D3748",
+            visible=False,
+        )
+        self.heat_map_field = ft.Dropdown(
+            value="temperature",
+            options=[
+                ft.dropdown.Option("temperature", "Temperature"),
+                ft.dropdown.Option("humidity", "Humidity"),
+                ft.dropdown.Option("wind_speed", "Wind"),
+                ft.dropdown.Option("aqi", "Air quality"),
+            ],
+            width=170,
+            dense=True,
+            on_change=lambda e: self._render_heat_map(),
+        )
+        self.heat_map_button = ft.OutlinedButton(
+            text="Scan area",
+            icon=ft.Icons.GRID_ON,
+            disabled=True,
+            on_click=self._handle_sweep,
+        )
+        self.heat_map_caption = ft.Text(
+            f"Scan a {2 * HEAT_MAP_RADIUS:.0f}° square around the current city.", size=13, color="#718096"
+        )
+        self.heat_map_rows = ft.Column(spacing=3)
+        self.alert_field = ft.Dropdown(
+            value="aqi",
+            options=[ft.dropdown.Option(name, label) for name, label in ALERT_FIELDS.items()],
+            width=170,
+            dense=True,
+        )
+        self.alert_op = ft.Dropdown(
+            value=">=",
+            options=[ft.dropdown.Option(op) for op in OPERATORS],
+            width=80,
+            dense=True,
+        )
+        self.alert_threshold = ft.TextField(value="4", width=80, dense=True, on_submit=self._handle_add_alert)
+        self.alert_scope = ft.Dropdown(
+            value=ANY_CITY,
+            options=[ft.dropdown.Option(ANY_CITY, "Any city"), ft.dropdown.Option(MAIN_CITY_KEY, "Current city")],
+            width=150,
+            dense=True,
+        )
+        self.alert_rules_row = ft.Row(wrap=True, spacing=8)
+        self.alert_log = ft.Column(spacing=4)
 
         # Create centered loading spinner overlay
         self.loading_overlay = ft.Container(
@@ -181,18 +350,32 @@ class WeatherApp:
                                 ),
                                 self._build_main_card(),
                                 self._build_hourly_forecast_card(),
+                                self._build_history_card(),
                                 self._build_air_quality_card(),
+                                self._build_heat_map_card(),
+                                self._build_alerts_card(),
                                 ft.Container(height=10),
-                                ft.Text(
-                                    "City Comparison",
-                                    size=22,
-                                    weight=ft.FontWeight.BOLD,
-                                    color="#2D3748",
-                                ),
-                                ft.Text(
-                                    "Compare weather across multiple cities",
-                                    size=14,
-                                    color="#718096",
+                                ft.Row(
+                                    [
+                                        ft.Column(
+                                            [
+                                                ft.Text(
+                                                    "City Comparison",
+                                                    size=22,
+                                                    weight=ft.FontWeight.BOLD,
+                                                    color="#2D3748",
+                                                ),
+                                                ft.Text(
+                                                    "Compare weather across multiple cities",
+                                                    size=14,
+                                                    color="#718096",
+                                                ),
+                                            ],
+                                            spacing=4,
+                                        ),
+                                        self.watch_sort_field,
+                                    ],
+                                    alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                                 ),
                                 ft.Container(height=5),
                                 self.watchlist_column,
@@ -229,6 +412,7 @@ class WeatherApp:
                                 [
                                     self.temp_text,
                                     self.feels_like_text,
+                                    self.trend_text,
                                     self.description_text,
                                     self.current_time_text,
                                     ft.Container(height=10),
@@ -334,6 +518,7 @@ class WeatherApp:
                         ],
                         spacing=10,
                     ),
+                    self.best_time_text,
                     ft.Container(height=10),
                     self.hourly_scroll,
                 ],
@@ -350,6 +535,106 @@ class WeatherApp:
             ),
         )
 
+    def _build_history_card(self) -> ft.Control:
+        """Card charting the last 7 days of stored observations."""
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.Icon(ft.Icons.SHOW_CHART, size=24, color="#667EEA"),
+                            ft.Text("Last 7 Days", size=20, weight=ft.FontWeight.BOLD, color="#2D3748"),
+                        ],
+                        spacing=10,
+                    ),
+                    self.history_caption,
+                    self.history_chart,
+                ],
+                spacing=12,
+            ),
+            padding=25,
+            bgcolor="#FFFFFF",
+            border_radius=15,
+            shadow=ft.BoxShadow(
+                spread_radius=0,
+                blur_radius=10,
+                color="#00000010",
+                offset=ft.Offset(0, 2),
+            ),
+        )
+
+    def _build_heat_map_card(self) -> ft.Control:
+        """Card showing a coarse heat map of conditions around the current city."""
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.Icon(ft.Icons.GRID_ON, size=24, color="#667EEA"),
+                            ft.Text("Area Heat Map", size=20, weight=ft.FontWeight.BOLD, color="#2D3748"),
+                            ft.Container(expand=True),
+                            self.heat_map_field,
+                            self.heat_map_button,
+                        ],
+                        spacing=10,
+                    ),
+                    self.heat_map_caption,
+                    self.heat_map_rows,
+                ],
+                spacing=12,
+            ),
+            padding=25,
+            bgcolor="#FFFFFF",
+            border_radius=15,
+            shadow=ft.BoxShadow(
+                spread_radius=0,
+                blur_radius=10,
+                color="#00000010",
+                offset=ft.Offset(0, 2),
+            ),
+        )
+
+    def _build_alerts_card(self) -> ft.Control:
+        """Card for defining threshold alerts and listing the ones that fired."""
+        self._render_alert_rules()
+        self._render_alert_log()
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row(
+                        [
+                            ft.Icon(ft.Icons.NOTIFICATIONS_ACTIVE, size=24, color="#667EEA"),
+                            ft.Text("Alerts", size=20, weight=ft.FontWeight.BOLD, color="#2D3748"),
+                        ],
+                        spacing=10,
+                    ),
+                    ft.Row(
+                        [
+                            self.alert_field,
+                            self.alert_op,
+                            self.alert_threshold,
+                            self.alert_scope,
+                            ft.IconButton(icon=ft.Icons.ADD_ALERT, tooltip="Add alert", on_click=self._handle_add_alert),
+                        ],
+                        wrap=True,
+                        spacing=8,
+                    ),
+                    self.alert_rules_row,
+                    self.alert_log,
+                ],
+                spacing=12,
+            ),
+            padding=25,
+            bgcolor="#FFFFFF",
+            border_radius=15,
+            shadow=ft.BoxShadow(
+                spread_radius=0,
+                blur_radius=10,
+                color="#00000010",
+                offset=ft.Offset(0, 2),
+            ),
+        )
+
     def _build_air_quality_card(self) -> ft.Control:
         """Card containing air quality metrics."""
         return ft.Container(
@@ -392,11 +677,13 @@ class WeatherApp:
             return
         self.page.run_task(self._fetch_weather, city)
 
+    def _handle_sweep(self, e: ft.ControlEvent) -> None:
+        if self.current_weather:
+            self.page.run_task(self._sweep_area)
+
     def _handle_current_location(self, e: ft.ControlEvent) -> None:
         self.page.run_task(self._fetch_current_location_weather)
 
-        self.page.run_task(self._refresh_watchlist)
-
     def _handle_add_watchlist(self, e: ft.ControlEvent) -> None:
         if not self.current_weather:
             return
@@ -407,7 +694,8 @@ class WeatherApp:
         self.watchlist.append(city)
         self._save_watchlist()
         self._show_status(f"Added {city} to comparison.", success=True)
-        self.page.run_task(self._refresh_watchlist)
+        self._apply_watch_weather(city, self.current_weather, self.current_air)
+        self.scheduler.track(city, observed_at=self.current_weather.observed_at)
 
     def _handle_remove_city(self, city: str) -> None:
         if city not in self.watchlist:
@@ -415,13 +703,90 @@ class WeatherApp:
         self.watchlist.remove(city)
         self._save_watchlist()
         self._show_status(f"Removed {city} from comparison.", success=True)
-        self.page.run_task(self._refresh_watchlist)
+        self.scheduler.untrack(city)
+        self.watch_weather.pop(city, None)
+        self.watch_air.pop(city, None)
+        self._watch_cards.pop(city, None)
+        self.comparison.remove(city)
+        self.alerts.forget(city)
+        self._render_watchlist()
+
+    def _handle_watch_sort(self, e: ft.ControlEvent) -> None:
+        self.watch_sort = self.watch_sort_field.value or "added"
+        self._render_watchlist()
+
+    def _handle_add_alert(self, e: ft.ControlEvent) -> None:
+        try:
+            rule = AlertRule(
+                self.alert_field.value or "aqi",
+                self.alert_op.value or ">=",
+                float(self.alert_threshold.value or ""),
+                self.alert_scope.value or ANY_CITY,
+            )
+        except ValueError:
+            self._show_status("Enter a number for the alert threshold.")
+            return
+        fired = self.alerts.add_rule(rule)
+        self._save_alert_rules()
+        self._render_alert_rules()
+        self._show_status(f"Alert added: {rule.describe()}", success=True)
+        self._announce_alerts(fired)
+
+    def _handle_remove_alert(self, rule: AlertRule) -> None:
+        self.alerts.remove_rule(rule)
+        self._save_alert_rules()
+        self._render_alert_rules()
+        self.page.update()
+
+    def _handle_scroll(self, e: ft.OnScrollEvent) -> None:
+        """Estimate which watchlist cards are on screen from the page scroll offset.
+
+        The watchlist is the last section of the page, so card ``i`` of ``n``
+        sits roughly ``(n - i) * WATCH_CARD_HEIGHT`` above the content end.
+        """
+        content_end = e.max_scroll_extent + e.viewport_dimension
+        view_top, view_bottom = e.pixels, e.pixels + e.viewport_dimension
+        cities = self._watch_order()
+        for index, city in enumerate(cities):
+            bottom = content_end - (len(cities) - 1 - index) * WATCH_CARD_HEIGHT
+            top = bottom - WATCH_CARD_HEIGHT
+            visible = top < view_bottom and bottom > view_top
+            self.scheduler.set_visible(city, visible)
+            if visible:
+                self.recent.view(city)
+
+    def _handle_lifecycle(self, e: ft.AppLifecycleStateChangeEvent) -> None:
+        if e.state in (ft.AppLifecycleState.HIDE, ft.AppLifecycleState.PAUSE):
+            self.scheduler.pause()
+        elif e.state in (ft.AppLifecycleState.SHOW, ft.AppLifecycleState.RESUME):
+            self.scheduler.resume()
+
+    def _handle_close(self, e: ft.ControlEvent) -> None:
+        """Stop this session's background loops; shared resources stay open."""
+        for task in self._background:
+            task.cancel()
+
+    def _handle_window_event(self, e: ft.WindowEvent) -> None:
+        if e.type == ft.WindowEventType.MINIMIZE:
+            self.scheduler.pause()
+        elif e.type == ft.WindowEventType.RESTORE:
+            self.scheduler.resume()
 
     # ------------------------------------------------------------------ Async helpers
     async def _fetch_weather(self, city: str) -> None:
+        coords = parse_coordinates(city)
+        if coords:
+            await self._fetch_weather_at(*coords)
+            return
+        await self._load_weather(self.service.fetch_weather(city, units=self.units))
+
+    async def _fetch_weather_at(self, lat: float, lon: float) -> None:
+        await self._load_weather(self.service.fetch_weather_at(lat, lon, units=self.units))
+
+    async def _load_weather(self, request: Awaitable[WeatherData]) -> None:
         self._set_loading(True)
         try:
-            weather = await self.service.fetch_weather(city, units=self.units)
+            weather = await request
             air = await self.service.fetch_air_quality(weather.latitude, weather.longitude)
             hourly = await self.service.fetch_hourly_forecast(weather.latitude, weather.longitude, units=self.units)
         except WeatherServiceError as exc:
@@ -429,64 +794,235 @@ class WeatherApp:
             self._set_loading(False)
             return
 
+        if self.current_weather is None or self.current_weather.city != weather.city:
+            self.alerts.forget(MAIN_CITY_KEY)  # A different place: its alerts may fire afresh
         self.current_weather = weather
         self.current_air = air
         self.hourly_forecast = hourly
+        fired = self._record(weather, air, hourly, key=MAIN_CITY_KEY)
+        self.recent.view(weather.city)  # The user searched for or located this city
+        self.scheduler.track(MAIN_CITY_KEY, observed_at=weather.observed_at)
         self._update_weather_display()
         self._update_air_quality()
         self._update_hourly_forecast()
         self._set_loading(False)
+        self._announce_alerts(fired)
+        if "first data" not in STARTUP.phases:
+            STARTUP.mark("first data")
+            STARTUP.print_if_enabled()
+        await self._update_history_chart()
 
     async def _fetch_current_location(self) -> None:
         """Fetch weather for current location on app start."""
         try:
-            city = await self.service.get_current_location()
-            if city:
-                await self._fetch_weather(city)
+            if self._location_request is None:
+                location = await self._locate()  # Served by the restored position
+            else:
+                location = await asyncio.wrap_future(self._location_request)
         except WeatherServiceError:
             # Silently fail on app start if location detection fails
-            pass
+            return
+        await self._fetch_weather_at(location.latitude, location.longitude)
 
     async def _fetch_current_location_weather(self) -> None:
         """Fetch weather for current location when button is clicked."""
         self._set_loading(True)
         try:
-            city = await self.service.get_current_location()
-            if city:
-                self.city_field.value = city
-                await self._fetch_weather(city)
-            else:
-                self._show_status("Unable to detect your location")
+            location = await self._locate()
+            self.city_field.value = location.name
+            await self._fetch_weather_at(location.latitude, location.longitude)
         except WeatherServiceError as exc:
             self._show_status(str(exc))
         finally:
             self._set_loading(False)
 
-    async def _refresh_watchlist(self) -> None:
-        if not self.watchlist:
-            self.watchlist_column.controls = [
-                ft.Text("No cities yet. Search for a city and tap 'Add to comparison'.")
-            ]
-            self.page.update()
-            return
+    async def _locate(self) -> City:
+        """Resolve the current position, persisting fresh lookups for the next start."""
+        if self.page.web:
+            # Locate the visitor, not the server; the shared service caches per IP.
+            return await self.service.locate(client_ip=self.page.client_ip)
+        cached = self.service.cached_location()
+        if cached:
+            return cached
+        location = await self.service.locate()
+        self._save_location(location)
+        return location
 
-        cards: list[ft.Control] = []
+    async def _refresh_watchlist(self) -> None:
+        """Load every watchlist city once; the scheduler keeps them fresh afterwards."""
+        watch_weather: dict[str, WeatherData] = {}
+        watch_air: dict[str, AirQualityData | None] = {}
+        fired: list[Alert] = []
         
         for city in self.watchlist:
             try:
                 weather = await self.service.fetch_weather(city, units=self.units)
             except WeatherServiceError as exc:
                 self._show_status(f"{city}: {exc}")
+                self.scheduler.track(city)
                 continue
             
-            cards.append(self._build_watch_card(weather))
+            air = await self._fetch_watch_air(weather)
+            fired += self._record(weather, air)
+            self.comparison.update(city, weather, air)
+            watch_weather[city] = weather
+            watch_air[city] = air
+            self.scheduler.track(city, observed_at=weather.observed_at)
 
-        self.watchlist_column.controls = cards or [
-            ft.Text("Unable to load watchlist. Check your API key or network.")
-        ]
-        
+        self.watch_weather = watch_weather
+        self.watch_air = watch_air
+        self._save_watch_snapshot()
+        self._evaluate_recommendations()
+        self._watch_cards = {
+            city: self._build_watch_card(weather, self._city_alert(weather))
+            for city, weather in watch_weather.items()
+        }
+        self._render_watchlist(failed=bool(self.watchlist) and not watch_weather)
+        self._announce_alerts(fired)
+
+    async def _scheduled_refresh(self, key: str) -> datetime | None:
+        """Background refresh of one city, patching only the affected UI."""
+        if key == MAIN_CITY_KEY:
+            current = self.current_weather
+            if not current:
+                return None
+            weather = await self.service.fetch_weather_at(current.latitude, current.longitude, units=self.units)
+            air = await self.service.fetch_air_quality(weather.latitude, weather.longitude)
+            hourly = await self.service.fetch_hourly_forecast(weather.latitude, weather.longitude, units=self.units)
+            if self.current_weather is not current:
+                return weather.observed_at  # A new search replaced the city meanwhile
+            weather.city, weather.country = current.city, current.country
+            self.current_weather, self.current_air, self.hourly_forecast = weather, air, hourly
+            fired = self._record(weather, air, hourly, key=MAIN_CITY_KEY)
+            self._update_weather_display()
+            self._update_air_quality()
+            self._update_hourly_forecast()
+            self._announce_alerts(fired)
+            return weather.observed_at
+
+        weather = await self.service.fetch_weather(key, units=self.units)
+        air = await self._fetch_watch_air(weather)
+        if key not in self.watchlist:
+            return weather.observed_at
+        fired = self._record(weather, air)
+        self._apply_watch_weather(key, weather, air)
+        self._announce_alerts(fired)
+        return weather.observed_at
+
+    async def _fetch_watch_air(self, weather: WeatherData) -> AirQualityData | None:
+        """Air quality for a watchlist city; it is optional, so failures are ignored."""
+        try:
+            return await self.service.fetch_air_quality(weather.latitude, weather.longitude)
+        except WeatherServiceError:
+            return None
+
+    def _apply_watch_weather(self, city: str, weather: WeatherData, air: AirQualityData | None = None) -> None:
+        """Update a single watchlist card in place, or append it if new."""
+        self.watch_weather[city] = weather
+        self.watch_air[city] = air
+        self._save_watch_snapshot()
+        self.comparison.update(city, weather, air)
+        self._evaluate_recommendations()
+        card = self._build_watch_card(weather, self._city_alert(weather))
+        existing = self._watch_cards.get(city)
+        if existing is None:
+            self._watch_cards[city] = card
+            self._render_watchlist()
+            return
+        existing.content = card.content
+        if self.watch_sort != "added":
+            self._render_watchlist()  # The new reading may move the card
+        else:
+            self.page.update()
+
+    def _watch_order(self) -> list[str]:
+        """Cities with a card, in the order chosen by the sort dropdown."""
+        order = self.watchlist if self.watch_sort == "added" else self.comparison.ranking(self.watch_sort)
+        return [city for city in order if city in self._watch_cards]
+
+    def _render_watchlist(self, failed: bool = False) -> None:
+        if not self.watchlist:
+            placeholder = "No cities yet. Search for a city and tap 'Add to comparison'."
+        elif failed:
+            placeholder = "Unable to load watchlist. Check your API key or network."
+        else:
+            placeholder = ""
+        # Existing card controls are reordered, never rebuilt.
+        cards = [self._watch_cards[city] for city in self._watch_order()]
+        self.watchlist_column.controls = cards or [ft.Text(placeholder)]
         self.page.update()
 
+    def _record(
+        self,
+        weather: WeatherData,
+        air: AirQualityData | None = None,
+        hourly: list[ForecastSlot] | None = None,
+        key: str | None = None,
+    ) -> list[Alert]:
+        """Store a fetched reading on disk and in the in-memory recent history.
+
+        Returns the alerts it fired; callers announce them once the UI is updated.
+        """
+        self.history.record(weather, air)
+        self.recent.record(weather, air)
+        if hourly is not None:
+            self.history.record_forecast(weather, hourly)
+            self.recent.record_forecast(weather.city, hourly)
+        return self.alerts.observe(key or weather.city, observation_values(weather, air, hourly))
+
+    def _alert_city_label(self, key: str) -> str:
+        if key == MAIN_CITY_KEY:
+            return self.current_weather.city if self.current_weather else "Current city"
+        return key
+
+    def _announce_alerts(self, fired: list[Alert]) -> None:
+        """Show the newest alert in the status bar and refresh the event log."""
+        if not fired:
+            return
+        latest = fired[-1]
+        more = f" (+{len(fired) - 1} more)" if len(fired) > 1 else ""
+        self._render_alert_log()
+        self._show_status(f"🔔 {latest.message(self._alert_city_label(latest.city))}{more}")
+
+    def _render_alert_rules(self) -> None:
+        self.alert_rules_row.controls = [
+            ft.Chip(
+                label=ft.Text(
+                    f"{rule.describe()} · {'any city' if rule.city == ANY_CITY else self._alert_city_label(rule.city)}",
+                    size=12,
+                ),
+                on_delete=lambda e, rule=rule: self._handle_remove_alert(rule),
+            )
+            for rule in self.alerts.rules
+        ] or [ft.Text("No alerts yet. Pick a field and threshold, then tap the bell.", size=13, color="#718096")]
+
+    def _render_alert_log(self) -> None:
+        entries = list(self.alerts.log)[-ALERT_LOG_ROWS:]
+        self.alert_log.controls = [
+            ft.Text(
+                f"{alert.at.astimezone().strftime('%H:%M')}  {alert.message(self._alert_city_label(alert.city))}",
+                size=13,
+                color="#C53030",
+            )
+            for alert in reversed(entries)
+        ]
+
+    def _trend_summary(self, city: str) -> str:
+        """Short "change over the last hour, range over the last day" line."""
+        # Cards are rebuilt on every background refresh, which is not a view.
+        buffer = self.recent.peek(city)
+        if buffer is None:
+            return ""
+        parts = []
+        change = buffer.delta("temperature", 3600)
+        if change is not None and abs(change) >= 0.1:
+            parts.append(f"{'▲' if change > 0 else '▼'} {abs(change):.1f}° vs 1 h ago")
+        latest = buffer.latest_time()
+        day_range = buffer.min_max("temperature", since=latest - 86400) if latest else None
+        if day_range and day_range[1] > day_range[0]:
+            parts.append(f"24 h range {day_range[0]:.1f}–{day_range[1]:.1f}°")
+        return " · ".join(parts)
+
     # ------------------------------------------------------------------ UI updates
     def _update_weather_display(self) -> None:
         if not self.current_weather:
@@ -497,6 +1033,7 @@ class WeatherApp:
 
         self.temp_text.value = f"{weather.temperature:.1f}{unit_symbol}"
         self.feels_like_text.value = f"Feels like {weather.feels_like:.1f}{unit_symbol}"
+        self.trend_text.value = self._trend_summary(weather.city)
         self.description_text.value = f"{weather.city}, {weather.country} · {weather.description}"
         
         # Display current time in the city's timezone
@@ -530,6 +1067,7 @@ class WeatherApp:
         self._update_solar_section()
 
         self.add_watch_button.disabled = False
+        self.heat_map_button.disabled = False
         self._show_status(f"Updated weather for {weather.city}.", success=True)
         self.page.update()
 
@@ -612,7 +1150,7 @@ class WeatherApp:
         ]
         self.page.update()
 
-    def _build_watch_card(self, weather: WeatherData) -> ft.Control:
+    def _build_watch_card(self, weather: WeatherData, alert: Recommendation | None = None) -> ft.Control:
         unit_symbol = "°C" if self.units == "metric" else "°F"
         wind_unit = "m/s" if self.units == "metric" else "mph"
         
@@ -666,6 +1204,11 @@ class WeatherApp:
                                         size=14,
                                         color="#718096",
                                     ),
+                                    ft.Text(
+                                        self._trend_summary(weather.city),
+                                        size=12,
+                                        color="#4A5568",
+                                    ),
                                 ],
                                 spacing=5,
                             ),
@@ -690,6 +1233,13 @@ class WeatherApp:
                                         ],
                                         spacing=5,
                                     ),
+                                    ft.Row(
+                                        [
+                                            ft.Icon(ft.Icons.WB_SUNNY, size=16, color="#ED8936"),
+                                            ft.Text(self._daylight_summary(weather, current_time), size=13, color="#4A5568"),
+                                        ],
+                                        spacing=5,
+                                    ),
                                 ],
                                 spacing=8,
                             ),
@@ -697,6 +1247,17 @@ class WeatherApp:
                         alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                         spacing=15,
                     ),
+                    ft.Container(
+                        content=ft.Text(
+                            f"{alert.title} · {alert.subtitle}" if alert else "",
+                            size=13,
+                            color="#2D3748",
+                        ),
+                        padding=ft.padding.symmetric(horizontal=10, vertical=6),
+                        bgcolor=alert.color if alert else None,
+                        border_radius=8,
+                        visible=alert is not None,
+                    ),
                 ],
                 spacing=10,
             ),
@@ -723,24 +1284,35 @@ class WeatherApp:
         self.city_field.disabled = is_loading
         self.page.update()
 
-    def _format_countdown(
-        self, sunrise: datetime, sunset: datetime, tz: timezone
-    ) -> str:
-        now = datetime.now(tz)
-        if now < sunrise:
-            delta = sunrise - now
-            label = "Sunrise in"
-        elif now < sunset:
-            delta = sunset - now
-            label = "Sunset in"
+    def _format_countdown(self, weather: WeatherData, tz: timezone) -> str:
+        now = datetime.now(timezone.utc)
+        if now < weather.sunrise:
+            label, at = "Sunrise in", weather.sunrise
+        elif now < weather.sunset:
+            label, at = "Sunset in", weather.sunset
         else:
-            next_sunrise = sunrise + timedelta(days=1)
-            delta = next_sunrise - now
-            label = "Next sunrise in"
-        hours, remainder = divmod(int(delta.total_seconds()), 3600)
+            # The API only reports the current day; later events are computed locally.
+            upcoming = next_event(weather.latitude, weather.longitude, now, tz)
+            if upcoming is None:
+                return "No sunrise or sunset in the next two days."
+            event, at = upcoming
+            label = "Next sunrise in" if event == "sunrise" else "Next sunset in"
+        hours, remainder = divmod(int((at - now).total_seconds()), 3600)
         minutes = remainder // 60
         return f"{label} {hours}h {minutes}m"
 
+    def _daylight_summary(self, weather: WeatherData, local_now: datetime) -> str:
+        """Today's sun times for a city, computed locally instead of fetched."""
+        day = solar_day(weather.latitude, weather.longitude, local_now.date())
+        if day.sunrise is None or day.sunset is None:
+            return "Sun up all day" if day.daylight else "Sun down all day"
+        tz = local_now.tzinfo
+        hours, remainder = divmod(int(day.daylight.total_seconds()), 3600)
+        return (
+            f"{day.sunrise.astimezone(tz).strftime('%H:%M')}–{day.sunset.astimezone(tz).strftime('%H:%M')}"
+            f" · {hours}h {remainder // 60:02d}m"
+        )
+
     def _update_solar_section(self) -> None:
         if not self.current_weather:
             self.sunrise_text.value = "--:--"
@@ -750,11 +1322,9 @@ class WeatherApp:
 
         weather = self.current_weather
         tz = timezone(timedelta(seconds=weather.timezone_offset))
-        sunrise_local = weather.sunrise.astimezone(tz)
-        sunset_local = weather.sunset.astimezone(tz)
-        self.sunrise_text.value = sunrise_local.strftime("%I:%M %p")
-        self.sunset_text.value = sunset_local.strftime("%I:%M %p")
-        self.countdown_text.value = self._format_countdown(sunrise_local, sunset_local, tz)
+        self.sunrise_text.value = weather.sunrise.astimezone(tz).strftime("%I:%M %p")
+        self.sunset_text.value = weather.sunset.astimezone(tz).strftime("%I:%M %p")
+        self.countdown_text.value = self._format_countdown(weather, tz)
 
     async def _countdown_loop(self) -> None:
         while True:
@@ -775,6 +1345,8 @@ class WeatherApp:
         return scale.get(aqi, ("Unknown", "#A0AEC0"))
 
     def _load_watchlist(self) -> list[str]:
+        if self.page.web:
+            return list(self.page.client_storage.get(WATCHLIST_STORAGE_KEY) or [])
         if not self.watchlist_file.exists():
             return []
         try:
@@ -783,8 +1355,92 @@ class WeatherApp:
             return []
 
     def _save_watchlist(self) -> None:
+        if self.page.web:
+            self.page.client_storage.set(WATCHLIST_STORAGE_KEY, self.watchlist)
+            return
         self.watchlist_file.write_text(json.dumps(self.watchlist, indent=2), encoding="utf-8")
 
+    def _load_alert_rules(self) -> list[AlertRule]:
+        if self.page.web:
+            stored = self.page.client_storage.get(ALERTS_STORAGE_KEY) or []
+        elif self.alerts_file.exists():
+            try:
+                stored = json.loads(self.alerts_file.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                return []
+        else:
+            return []
+        rules = []
+        for data in stored:
+            try:
+                rules.append(AlertRule(**data))
+            except (TypeError, ValueError):
+                continue  # Skip rules saved by an incompatible version
+        return rules
+
+    def _save_alert_rules(self) -> None:
+        data = [
+            {"field": r.field, "op": r.op, "threshold": r.threshold, "city": r.city} for r in self.alerts.rules
+        ]
+        if self.page.web:
+            self.page.client_storage.set(ALERTS_STORAGE_KEY, data)
+            return
+        self.alerts_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def _restore_watch_snapshot(self) -> None:
+        """Show the watchlist readings saved last time until fresh ones arrive."""
+        if self.page.web or not self.watch_snapshot_file.exists():
+            return
+        try:
+            saved = {weather.city: weather for weather in read_snapshot(self.watch_snapshot_file)}
+        except (OSError, ValueError):  # Also CodecError, or an empty file mmap refuses
+            return
+        for city in self.watchlist:
+            weather = saved.get(city)
+            if weather is not None:
+                self.watch_weather[city] = weather
+                self.comparison.update(city, weather, None)
+                self._watch_cards[city] = self._build_watch_card(weather)
+        if self._watch_cards:
+            self._render_watchlist()
+
+    def _save_watch_snapshot(self) -> None:
+        if self.page.web:
+            return
+        records = list(self.watch_weather.values())
+        try:
+            if records:
+                write_snapshot(self.watch_snapshot_file, records)
+            else:
+                self.watch_snapshot_file.unlink(missing_ok=True)  # Nothing left to save
+        except OSError:
+            pass  # A full disk or read-only data directory only costs the warm start
+
+    def _restore_location(self) -> City | None:
+        """Seed the service with the last saved position; its TTL still applies.
+
+        Returns the position if it is still fresh.
+        """
+        if not self.location_file.exists():
+            return None
+        try:
+            data = json.loads(self.location_file.read_text(encoding="utf-8"))
+            location = City(data["name"], data["country"], data["latitude"], data["longitude"])
+            self.service.remember_location(location, resolved_at=data["resolved_at"])
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return None
+        return self.service.cached_location()
+
+    def _save_location(self, location: City) -> None:
+        data = {
+            "name": location.name,
+            "country": location.country,
+            "latitude": location.latitude,
+            "longitude": location.longitude,
+            "resolved_at": datetime.now(timezone.utc).timestamp(),
+        }
+        self.location_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
     def _update_hourly_forecast(self) -> None:
         """Update hourly forecast display."""
         if not self.hourly_forecast:
@@ -795,27 +1451,29 @@ class WeatherApp:
             return
 
         unit_symbol = "°C" if self.units == "metric" else "°F"
+        offset = self.current_weather.timezone_offset if self.current_weather else 0
+        tz = timezone(timedelta(seconds=offset))
         cards = []
         
-        for hour_data in self.hourly_forecast[:12]:  # Show next 12 hours
+        for slot in self.hourly_forecast[:12]:  # Show next 12 hours
             cards.append(
                 ft.Container(
                     content=ft.Column(
                         [
                             ft.Text(
-                                hour_data["time"],
+                                slot.time.astimezone(tz).strftime("%I %p"),
                                 size=13,
                                 weight=ft.FontWeight.BOLD,
                                 color="#4A5568",
                                 text_align=ft.TextAlign.CENTER,
                             ),
                             ft.Image(
-                                src=f"https://openweathermap.org/img/wn/{hour_data['icon']}@2x.png",
+                                src=f"https://openweathermap.org/img/wn/{slot.icon}@2x.png",
                                 width=50,
                                 height=50,
                             ),
                             ft.Text(
-                                f"{hour_data['temp']:.0f}{unit_symbol}",
+                                f"{slot.temperature:.0f}{unit_symbol}",
                                 size=18,
                                 weight=ft.FontWeight.BOLD,
                                 color="#2D3748",
@@ -824,7 +1482,7 @@ class WeatherApp:
                             ft.Row(
                                 [
                                     ft.Icon(ft.Icons.WATER_DROP, size=14, color="#4299E1"),
-                                    ft.Text(f"{hour_data['humidity']}%", size=12, color="#718096"),
+                                    ft.Text(f"{slot.humidity}%", size=12, color="#718096"),
                                 ],
                                 spacing=3,
                                 alignment=ft.MainAxisAlignment.CENTER,
@@ -844,150 +1502,177 @@ class WeatherApp:
         self.hourly_scroll.controls = cards
         self.page.update()
 
-    def _update_recommendations(self, weather: WeatherData) -> None:
-        """Generate smart weather recommendations."""
-        recommendations = []
-        
-        # Temperature-based recommendations
-        temp = weather.temperature
-        feels = weather.feels_like
-        
-        if temp > 30:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "🌡️ Hot day ahead",
-                    "Stay hydrated and seek shade",
-                    "#FED7D7"
-                )
-            )
-        elif temp < 10:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "🧥 Bundle up",
-                    "Wear warm clothing",
-                    "#BEE3F8"
-                )
+    async def _sweep_area(self) -> None:
+        """Sweep a grid around the current city, colouring cells as results stream in."""
+        weather = self.current_weather
+        grid = WeatherGrid(BoundingBox.around(weather.latitude, weather.longitude, HEAT_MAP_RADIUS), HEAT_MAP_STEP)
+        self.heat_grid = grid
+        self._heat_cells = [
+            ft.Container(width=36, height=36, border_radius=6, bgcolor="#E2E8F0")
+            for _ in range(len(grid))
+        ]
+        self.heat_map_rows.controls = [
+            ft.Row(self._heat_cells[row * grid.cols:(row + 1) * grid.cols], spacing=3)
+            for row in range(grid.rows)
+        ]
+        self.heat_map_button.disabled = True
+        self.heat_map_caption.value = f"Scanning {len(grid)} points around {weather.city}..."
+        self.page.update()
+
+        async for _point in self.service.sweep(grid, units=self.units):
+            if grid is not self.heat_grid:
+                return
+            if grid.filled % grid.cols == 0:
+                self._render_heat_map()
+        self.heat_map_button.disabled = False
+        self._render_heat_map()
+
+    def _render_heat_map(self) -> None:
+        grid = self.heat_grid
+        if grid is None:
+            return
+        name = self.heat_map_field.value or "temperature"
+        bounds = grid.value_range(name)
+        for index, cell in enumerate(self._heat_cells):
+            value = grid.get(name, *divmod(index, grid.cols))
+            cell.bgcolor = self._heat_color(name, value, bounds)
+            cell.tooltip = None if math.isnan(value) else f"{value:.1f}"
+
+        suffix = HEAT_MAP_SUFFIXES[name]
+        caption = f"{grid.filled}/{len(grid)} points · {grid.step}° grid, north at top"
+        if bounds:
+            caption += f" · {bounds[0]:.1f}{suffix} to {bounds[1]:.1f}{suffix}"
+        self.heat_map_caption.value = caption
+        self.page.update()
+
+    def _heat_color(self, name: str, value: float, bounds: tuple[float, float] | None) -> str:
+        if math.isnan(value) or bounds is None:  # Not swept yet, or the fetch failed
+            return "#E2E8F0"
+        if name == "aqi":
+            return self._aqi_label_color(int(value))[1]
+        low, high = bounds
+        position = (value - low) / (high - low) if high > low else 0.5
+        return HEAT_MAP_RAMP[min(len(HEAT_MAP_RAMP) - 1, int(position * len(HEAT_MAP_RAMP)))]
+
+    async def _update_history_chart(self) -> None:
+        """Chart the current city's stored history; this never calls the API."""
+        weather = self.current_weather
+        if not weather:
+            return
+        since = datetime.now(timezone.utc) - timedelta(days=7)
+        # Let queued writes land, then query off the UI loop.
+        await asyncio.to_thread(self.history.flush)
+        buckets = await asyncio.to_thread(
+            self.history.downsample, weather.city, weather.country, since, None, 3 * 3600
+        )
+        if weather is not self.current_weather:
+            return  # A newer search replaced this city meanwhile
+
+        if len(buckets) < 2:
+            self.history_chart.visible = False
+            self.history_caption.value = "History builds up each time you check this city."
+            self.page.update()
+            return
+
+        unit_symbol = "°C" if self.units == "metric" else "°F"
+        tz = timezone(timedelta(seconds=weather.timezone_offset))
+        origin = buckets[0].start
+        points = [
+            ft.LineChartDataPoint(
+                (bucket.start - origin).total_seconds() / 3600,
+                round(bucket.temperature, 1),
+                tooltip=f"{bucket.start.astimezone(tz).strftime('%a %I %p')}: {bucket.temperature:.1f}{unit_symbol}",
             )
-        
-        # Feels like difference
-        if abs(feels - temp) > 5:
-            if feels > temp:
-                recommendations.append(
-                    self._create_recommendation_chip(
-                        "🌡️ Feels warmer",
-                        f"Humidity makes it feel like {feels:.0f}°",
-                        "#FED7D7"
-                    )
-                )
-            else:
-                recommendations.append(
-                    self._create_recommendation_chip(
-                        "❄️ Feels colder",
-                        f"Wind chill makes it feel like {feels:.0f}°",
-                        "#BEE3F8"
+            for bucket in buckets
+        ]
+        first_day = origin.astimezone(tz).date()
+        days = (buckets[-1].start.astimezone(tz).date() - first_day).days + 1
+        solar = SolarTable([(weather.latitude, weather.longitude)], first_day, days)
+        day_labels = []
+        for bucket in buckets:
+            local = bucket.start.astimezone(tz)
+            if local.hour < 3:
+                daylight = solar.day(0, (local.date() - first_day).days).daylight.total_seconds()
+                day_labels.append(
+                    ft.ChartAxisLabel(
+                        value=(bucket.start - origin).total_seconds() / 3600,
+                        label=ft.Text(
+                            f"{local.strftime('%a')}\n☀ {daylight / 3600:.1f}h",
+                            size=11,
+                            color="#718096",
+                            text_align=ft.TextAlign.CENTER,
+                        ),
                     )
                 )
-        
-        # Weather condition recommendations
-        condition = weather.description.lower()
-        icon_code = weather.icon
-        
-        if "rain" in condition or "drizzle" in condition:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "☔ Bring an umbrella",
-                    "Rain expected today",
-                    "#BEE3F8"
-                )
-            )
-        elif "clear" in condition and "d" in icon_code:  # Daytime clear
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "☀️ Sunny day",
-                    "Don't forget sunscreen",
-                    "#FEF5E7"
-                )
-            )
-        elif "cloud" in condition:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "☁️ Cloudy skies",
-                    "Good day for outdoor activities",
-                    "#E6FFFA"
-                )
-            )
-        elif "snow" in condition:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "❄️ Snowy weather",
-                    "Drive carefully and dress warmly",
-                    "#E6F7FF"
-                )
-            )
-        elif "storm" in condition or "thunder" in condition:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "⚡ Thunderstorm alert",
-                    "Stay indoors if possible",
-                    "#FED7D7"
-                )
-            )
-        
-        # Humidity recommendations
-        if weather.humidity > 80:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "💧 High humidity",
-                    "May feel muggy outside",
-                    "#E6FFFA"
-                )
-            )
-        elif weather.humidity < 30:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "🏜️ Low humidity",
-                    "Use moisturizer for dry skin",
-                    "#FEF5E7"
-                )
-            )
-        
-        # Wind recommendations
-        if weather.wind_speed > 10:  # m/s or mph depending on units
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "💨 Windy conditions",
-                    "Secure loose objects",
-                    "#E6F7FF"
-                )
-            )
-        
-        # Time-based recommendations
-        tz = timezone(timedelta(seconds=weather.timezone_offset))
-        current_time = datetime.now(tz)
-        hour = current_time.hour
-        
-        if 20 <= hour or hour < 6:  # Night time
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "🌙 Evening/Night",
-                    "Good time for stargazing" if "clear" in condition else "Stay cozy indoors",
-                    "#E6E6FA"
-                )
+
+        self.history_chart.data_series = [
+            ft.LineChartData(
+                data_points=points,
+                curved=True,
+                stroke_width=3,
+                color="#667EEA",
+                below_line_bgcolor="#667EEA22",
             )
-        
-        # If pleasant weather
-        if 18 <= temp <= 26 and weather.humidity < 70 and "clear" in condition:
-            recommendations.append(
-                self._create_recommendation_chip(
-                    "✨ Perfect weather",
-                    "Great day for outdoor activities!",
-                    "#C6F6D5"
-                )
+        ]
+        low = min(b.temp_min for b in buckets)
+        high = max(b.temp_max for b in buckets)
+        self.history_chart.bottom_axis.labels = day_labels
+        self.history_chart.min_y = low - 2
+        self.history_chart.max_y = high + 2
+        self.history_chart.visible = True
+        self.history_caption.value = (
+            f"{sum(b.samples for b in buckets)} readings · "
+            f"low {low:.1f}{unit_symbol} · high {high:.1f}{unit_symbol}"
+        )
+        self.page.update()
+
+    def _evaluate_recommendations(self) -> Evaluation:
+        """Run the rule table over the main city, its forecast and the watchlist at once."""
+        self.evaluation = evaluate_dashboard(
+            self.recommender,
+            self.current_weather,
+            self.current_air,
+            self.hourly_forecast,
+            list(self.watch_weather.values()),
+            {weather.city: self.watch_air.get(city) for city, weather in self.watch_weather.items()},
+        )
+        return self.evaluation
+
+    def _city_alert(self, weather: WeatherData) -> Recommendation | None:
+        """Most severe warning for a watchlist city, if any."""
+        warnings = [r for r in self.evaluation.watchlist.get(weather.city, ()) if r.score <= -2]
+        return min(warnings, key=lambda r: r.score) if warnings else None
+
+    def _update_recommendations(self, weather: WeatherData) -> None:
+        """Show smart weather recommendations for the current city."""
+        evaluation = self._evaluate_recommendations()
+        recommendations = evaluation.main[:4]  # Show max 4
+
+        best = evaluation.best_slot
+        if best:
+            tz = timezone(timedelta(seconds=weather.timezone_offset))
+            unit_symbol = "°C" if self.units == "metric" else "°F"
+            self.best_time_text.value = (
+                f"🕒 Best time today: {best.time.astimezone(tz).strftime('%I %p')} · "
+                f"{best.temperature:.0f}{unit_symbol}, {best.description}"
             )
-        
-        self.recommendations_column.controls = recommendations[:4]  # Show max 4
+        else:
+            self.best_time_text.value = ""
+
+        if recommendations == self._shown_recommendations:
+            return
+        self._shown_recommendations = recommendations
+        self.recommendations_column.controls = [self._recommendation_chip(r) for r in recommendations]
         self.page.update()
 
+    def _recommendation_chip(self, recommendation: Recommendation) -> ft.Control:
+        chip = self._chip_cache.get(recommendation)
+        if chip is None:
+            chip = self._chip_cache[recommendation] = self._create_recommendation_chip(
+                recommendation.title, recommendation.subtitle, recommendation.color
+            )
+        return chip
+
     def _create_recommendation_chip(self, title: str, subtitle: str, bg_color: str) -> ft.Control:
         """Create a recommendation chip with icon and text."""
         return ft.Container(
@@ -1011,10 +1696,21 @@ class WeatherApp:
 
 
 def main(page: ft.Page) -> None:
-    WeatherApp(page)
+    if page.web:
+        service, history = shared_backend()
+        WeatherApp(page, service=service, history=history)
+    else:
+        WeatherApp(page)
 
 
 if __name__ == "__main__":
-    ft.app(target=main)
+    parser = argparse.ArgumentParser(description="Weather dashboard")
+    parser.add_argument("--web", action="store_true", help="serve the app to browsers on --port")
+    parser.add_argument("--port", type=int, default=8550)
+    args = parser.parse_args()
+    if args.web:
+        ft.app(target=main, view=ft.AppView.WEB_BROWSER, port=args.port)
+    else:
+        ft.app(target=main)
 
 
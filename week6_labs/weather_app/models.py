@@ -21,6 +21,7 @@ class WeatherData:
     timezone_offset: int
     latitude: float
     longitude: float
+    observed_at: datetime | None = None
 
 
 @dataclass(slots=True)
@@ -35,3 +36,22 @@ class AirQualityData:
     pm10: float
 
 
+@dataclass(slots=True)
+class ForecastSlot:
+    """One step of the hourly forecast."""
+
+    time: datetime
+    temperature: float
+    humidity: int
+    description: str
+    icon: str
+
+
+@dataclass(slots=True, frozen=True)
+class City:
+    """Named coordinate used for offline location lookups."""
+
+    name: str
+    country: str
+    latitude: float
+    longitude: float
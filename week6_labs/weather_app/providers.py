@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, ClassVar, Final, Sequence
+from weakref import WeakKeyDictionary
+
+import httpx
+
+try:
+    import orjson
+except ImportError:
+    # Optional: ``pip install orjson`` decodes responses several times faster
+    orjson = None
+
+try:
+    from .models import AirQualityData, ForecastSlot, WeatherData
+    from .transport import HttpClient
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, ForecastSlot, WeatherData
+    from transport import HttpClient
+
+FORECAST_SLOTS: Final[int] = 16  # 48 hours in 3-hour steps
+JSON_BACKEND: Final[str] = "orjson" if orjson is not None else "json"
+
+
+class ProviderError(Exception):
+    """Raised by a provider; ``retryable`` errors make the router try another one."""
+
+    def __init__(self, message: str, retryable: bool = True) -> None:
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def decode_json(content: bytes) -> Any:
+    """Decode a JSON body with orjson when installed, else the standard library."""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def utc(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+# Upstream descriptions come from a small vocabulary, so title-casing is memoized.
+title_case = lru_cache(maxsize=512)(str.title)
+
+# Decoded bodies by response: HttpClient hands back the same response object
+# after a 304, which then skips JSON decoding entirely.
+_decoded: WeakKeyDictionary[httpx.Response, Any] = WeakKeyDictionary()
+
+
+async def get_json(
+    http: HttpClient, url: str, params: dict[str, Any], network_error: str
+) -> Any:
+    """GET ``url`` and decode JSON, mapping failures onto :class:`ProviderError`."""
+    try:
+        resp = await http.get(url, params=params)
+        resp.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        try:
+            message = decode_json(exc.response.content).get("message", "Request failed")
+        except ValueError:
+            message = "Request failed"
+        # Rate limits and server errors may succeed elsewhere; bad input won't.
+        status = exc.response.status_code
+        retryable = status == 429 or status >= 500
+        raise ProviderError(title_case(str(message)), retryable=retryable) from exc
+    except httpx.HTTPError as exc:
+        raise ProviderError(network_error) from exc
+    payload = _decoded.get(resp)
+    if payload is None:
+        payload = _decoded[resp] = decode_json(resp.content)
+    return payload
+
+
+class WeatherProvider(ABC):
+    """Upstream weather API normalized into the app's models.
+
+    ``weather_at`` may leave ``WeatherData.city`` empty when the upstream
+    does not name coordinates; the service fills it in from the city index.
+    """
+
+    name: ClassVar[str]
+    WARMUP_URL: ClassVar[str]  # Cheap URL on the main API host, used to pre-open a connection
+
+    def __init__(self, http: HttpClient) -> None:
+        self.http = http
+
+    @abstractmethod
+    async def weather_by_name(self, city: str, units: str) -> WeatherData: ...
+
+    @abstractmethod
+    async def weather_at(self, lat: float, lon: float, units: str) -> WeatherData: ...
+
+    @abstractmethod
+    async def air_quality(self, lat: float, lon: float) -> AirQualityData: ...
+
+    @abstractmethod
+    async def hourly_forecast(self, lat: float, lon: float, units: str) -> list[ForecastSlot]: ...
+
+
+class OpenWeatherMapProvider(WeatherProvider):
+    """OpenWeatherMap 2.5 current weather, air pollution and forecast endpoints."""
+
+    name = "openweathermap"
+    WARMUP_URL = "https://api.openweathermap.org/"
+
+    WEATHER_URL: Final[str] = "https://api.openweathermap.org/data/2.5/weather"
+    AIR_URL: Final[str] = "https://api.openweathermap.org/data/2.5/air_pollution"
+    FORECAST_URL: Final[str] = "https://api.openweathermap.org/data/2.5/forecast"
+
+    def __init__(self, http: HttpClient, api_key: str) -> None:
+        super().__init__(http)
+        self.api_key = api_key
+
+    async def weather_by_name(self, city: str, units: str) -> WeatherData:
+        params = {"q": city, "appid": self.api_key, "units": units}
+        return await self._weather(params)
+
+    async def weather_at(self, lat: float, lon: float, units: str) -> WeatherData:
+        params = {"lat": lat, "lon": lon, "appid": self.api_key, "units": units}
+        return await self._weather(params)
+
+    async def _weather(self, params: dict[str, Any]) -> WeatherData:
+        payload = await get_json(self.http, self.WEATHER_URL, params, "Network error while fetching weather")
+        sys_data = payload.get("sys", {})
+        coord = payload.get("coord", {})
+        main = payload["main"]
+        condition = payload["weather"][0]
+
+        return WeatherData(
+            city=(payload.get("name") or "").strip(),
+            country=sys_data.get("country", ""),
+            temperature=main["temp"],
+            feels_like=main["feels_like"],
+            description=title_case(condition["description"]),
+            humidity=main["humidity"],
+            wind_speed=payload["wind"]["speed"],
+            icon=condition["icon"],
+            sunrise=utc(sys_data["sunrise"]),
+            sunset=utc(sys_data["sunset"]),
+            timezone_offset=payload.get("timezone", 0),
+            latitude=coord.get("lat", 0.0),
+            longitude=coord.get("lon", 0.0),
+            observed_at=utc(payload["dt"]),
+        )
+
+    async def air_quality(self, lat: float, lon: float) -> AirQualityData:
+        params = {"lat": lat, "lon": lon, "appid": self.api_key}
+        payload = await get_json(self.http, self.AIR_URL, params, "Network error while fetching air quality")
+        record = payload["list"][0]
+        components = record["components"]
+
+        return AirQualityData(
+            aqi=record["main"]["aqi"],
+            co=components.get("co", 0.0),
+            no2=components.get("no2", 0.0),
+            o3=components.get("o3", 0.0),
+            pm2_5=components.get("pm2_5", 0.0),
+            pm10=components.get("pm10", 0.0),
+        )
+
+    async def hourly_forecast(self, lat: float, lon: float, units: str) -> list[ForecastSlot]:
+        # ``cnt`` trims the 5-day (40 step) response to the slots we show.
+        params = {"lat": lat, "lon": lon, "appid": self.api_key, "units": units, "cnt": FORECAST_SLOTS}
+        payload = await get_json(self.http, self.FORECAST_URL, params, "Network error while fetching forecast")
+
+        # OpenWeatherMap 5-day forecast returns data in 3-hour intervals
+        slots = []
+        for item in payload["list"][:FORECAST_SLOTS]:
+            main, condition = item["main"], item["weather"][0]
+            slots.append(
+                ForecastSlot(
+                    time=utc(item["dt"]),
+                    temperature=main["temp"],
+                    humidity=main["humidity"],
+                    description=title_case(condition["description"]),
+                    icon=condition["icon"],
+                )
+            )
+        return slots
+
+
+# WMO weather interpretation codes -> (description, OpenWeatherMap icon prefix)
+WMO_CODES: Final[dict[int, tuple[str, str]]] = {
+    0: ("Clear Sky", "01"),
+    1: ("Mainly Clear", "02"),
+    2: ("Partly Cloudy", "03"),
+    3: ("Overcast Clouds", "04"),
+    45: ("Fog", "50"),
+    48: ("Rime Fog", "50"),
+    51: ("Light Drizzle", "09"),
+    53: ("Drizzle", "09"),
+    55: ("Dense Drizzle", "09"),
+    56: ("Freezing Drizzle", "09"),
+    57: ("Freezing Drizzle", "09"),
+    61: ("Light Rain", "10"),
+    63: ("Moderate Rain", "10"),
+    65: ("Heavy Rain", "10"),
+    66: ("Freezing Rain", "13"),
+    67: ("Freezing Rain", "13"),
+    71: ("Light Snow", "13"),
+    73: ("Snow", "13"),
+    75: ("Heavy Snow", "13"),
+    77: ("Snow Grains", "13"),
+    80: ("Light Rain Showers", "09"),
+    81: ("Rain Showers", "09"),
+    82: ("Violent Rain Showers", "09"),
+    85: ("Snow Showers", "13"),
+    86: ("Heavy Snow Showers", "13"),
+    95: ("Thunderstorm", "11"),
+    96: ("Thunderstorm With Hail", "11"),
+    99: ("Thunderstorm With Heavy Hail", "11"),
+}
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Open-Meteo forecast, geocoding and air-quality APIs (no API key needed)."""
+
+    name = "open-meteo"
+    WARMUP_URL = "https://api.open-meteo.com/"
+
+    GEOCODING_URL: Final[str] = "https://geocoding-api.open-meteo.com/v1/search"
+    FORECAST_URL: Final[str] = "https://api.open-meteo.com/v1/forecast"
+    AIR_URL: Final[str] = "https://air-quality-api.open-meteo.com/v1/air-quality"
+
+    async def weather_by_name(self, city: str, units: str) -> WeatherData:
+        name, _, country = (part.strip() for part in city.partition(","))
+        # Fetch alternatives only when they must be filtered by country.
+        params = {"name": name, "count": 10 if country else 1, "format": "json"}
+        payload = await get_json(self.http, self.GEOCODING_URL, params, "Network error while fetching weather")
+        results = payload.get("results") or []
+        if country:
+            results = [r for r in results if r.get("country_code", "").upper() == country.upper()]
+        if not results:
+            raise ProviderError("City Not Found", retryable=False)
+
+        place = results[0]
+        weather = await self.weather_at(place["latitude"], place["longitude"], units)
+        weather.city = place.get("name", name)
+        weather.country = place.get("country_code", "")
+        return weather
+
+    async def weather_at(self, lat: float, lon: float, units: str) -> WeatherData:
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "current": "temperature_2m,apparent_temperature,relative_humidity_2m,"
+            "wind_speed_10m,weather_code,is_day",
+            "daily": "sunrise,sunset",
+            "forecast_days": 1,
+            "timezone": "auto",
+            "timeformat": "unixtime",
+            **self._unit_params(units),
+        }
+        payload = await get_json(self.http, self.FORECAST_URL, params, "Network error while fetching weather")
+        current = payload["current"]
+        daily = payload["daily"]
+        description, icon = self._describe(current["weather_code"], current.get("is_day", 1))
+
+        return WeatherData(
+            city="",
+            country="",
+            temperature=current["temperature_2m"],
+            feels_like=current["apparent_temperature"],
+            description=description,
+            humidity=round(current["relative_humidity_2m"]),
+            wind_speed=current["wind_speed_10m"],
+            icon=icon,
+            sunrise=utc(daily["sunrise"][0]),
+            sunset=utc(daily["sunset"][0]),
+            timezone_offset=payload.get("utc_offset_seconds", 0),
+            latitude=payload.get("latitude", lat),
+            longitude=payload.get("longitude", lon),
+            observed_at=utc(current["time"]),
+        )
+
+    async def air_quality(self, lat: float, lon: float) -> AirQualityData:
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "current": "european_aqi,pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,ozone",
+        }
+        payload = await get_json(self.http, self.AIR_URL, params, "Network error while fetching air quality")
+        current = payload["current"]
+
+        return AirQualityData(
+            aqi=self._european_to_owm_aqi(current.get("european_aqi") or 0),
+            co=current.get("carbon_monoxide") or 0.0,
+            no2=current.get("nitrogen_dioxide") or 0.0,
+            o3=current.get("ozone") or 0.0,
+            pm2_5=current.get("pm2_5") or 0.0,
+            pm10=current.get("pm10") or 0.0,
+        )
+
+    async def hourly_forecast(self, lat: float, lon: float, units: str) -> list[ForecastSlot]:
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": "temperature_2m,relative_humidity_2m,weather_code,is_day",
+            "forecast_hours": FORECAST_SLOTS * 3,
+            "timeformat": "unixtime",
+            **self._unit_params(units),
+        }
+        payload = await get_json(self.http, self.FORECAST_URL, params, "Network error while fetching forecast")
+        hourly = payload["hourly"]
+        times, temperatures = hourly["time"], hourly["temperature_2m"]
+        humidity, codes, is_day = hourly["relative_humidity_2m"], hourly["weather_code"], hourly["is_day"]
+
+        # Sample every third hour to match the OpenWeatherMap forecast cadence.
+        slots = []
+        for i in range(0, min(len(times), FORECAST_SLOTS * 3), 3):
+            description, icon = self._describe(codes[i], is_day[i])
+            slots.append(
+                ForecastSlot(
+                    time=utc(times[i]),
+                    temperature=temperatures[i],
+                    humidity=round(humidity[i]),
+                    description=description,
+                    icon=icon,
+                )
+            )
+        return slots
+
+    @staticmethod
+    def _unit_params(units: str) -> dict[str, str]:
+        if units == "imperial":
+            return {"temperature_unit": "fahrenheit", "wind_speed_unit": "mph"}
+        return {"temperature_unit": "celsius", "wind_speed_unit": "ms"}
+
+    @staticmethod
+    def _describe(code: int, is_day: int) -> tuple[str, str]:
+        description, icon = WMO_CODES.get(code, ("Unknown", "03"))
+        return description, icon + ("d" if is_day else "n")
+
+    @staticmethod
+    def _european_to_owm_aqi(value: float) -> int:
+        """Map the European AQI (0-100+) onto OpenWeatherMap's 1-5 scale."""
+        for aqi, upper in enumerate((20, 40, 60, 80), start=1):
+            if value < upper:
+                return aqi
+        return 5
+
+
+@dataclass(slots=True)
+class ProviderHealth:
+    """Rolling latency and failure record for one provider."""
+
+    latency: float | None = None  # exponentially weighted, seconds
+    consecutive_failures: int = 0
+    retry_at: float = 0.0
+    served: int = 0
+    failed: int = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.retry_at
+
+
+class ProviderRouter:
+    """Orders providers by health and latency and fails over between them.
+
+    Providers are tried fastest first, after any without recent failures;
+    an unmeasured provider is scored at the mean measured latency so it
+    neither jumps the queue nor starves. After ``failure_threshold``
+    consecutive failures a provider is skipped for ``cooldown`` seconds.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[WeatherProvider],
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        smoothing: float = 0.3,
+    ) -> None:
+        if not providers:
+            raise ValueError("At least one provider is required")
+        self.providers = list(providers)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.health = {provider.name: ProviderHealth() for provider in self.providers}
+
+    def ranked(self) -> list[WeatherProvider]:
+        """Available providers in the order they should be tried."""
+        now = time.monotonic()
+        available = [p for p in self.providers if self.health[p.name].available(now)]
+        if not available:
+            # Everything is cooling down: try them all rather than fail outright.
+            available = list(self.providers)
+        measured = [h.latency for h in self.health.values() if h.latency is not None]
+        neutral = sum(measured) / len(measured) if measured else 0.0
+
+        def score(provider: WeatherProvider) -> tuple[int, float]:
+            health = self.health[provider.name]
+            return health.consecutive_failures, neutral if health.latency is None else health.latency
+
+        # sorted() is stable, so registration order breaks ties.
+        return sorted(available, key=score)
+
+    def record_success(self, provider: WeatherProvider, seconds: float) -> None:
+        health = self.health[provider.name]
+        health.served += 1
+        health.consecutive_failures = 0
+        health.retry_at = 0.0
+        if health.latency is None:
+            health.latency = seconds
+        else:
+            health.latency += self.smoothing * (seconds - health.latency)
+
+    def record_failure(self, provider: WeatherProvider) -> None:
+        health = self.health[provider.name]
+        health.failed += 1
+        health.consecutive_failures += 1
+        if health.consecutive_failures >= self.failure_threshold:
+            health.retry_at = time.monotonic() + self.cooldown
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Final, Sequence
+
+try:
+    from .models import AirQualityData, ForecastSlot, WeatherData
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, ForecastSlot, WeatherData
+
+OBSERVATION_FIELDS: Final[tuple[str, ...]] = ("temperature", "feels_like", "humidity", "wind_speed", "aqi")
+FORECAST_FIELDS: Final[tuple[str, ...]] = ("temperature", "humidity")
+
+
+class RingBuffer:
+    """Fixed-capacity, time-ordered numeric series stored in ``array('d')`` columns.
+
+    Appending past ``capacity`` overwrites the oldest sample; memory never
+    grows after construction.
+    """
+
+    def __init__(self, capacity: int, fields: Sequence[str]) -> None:
+        if capacity < 1:
+            raise ValueError("Ring buffer capacity must be at least 1")
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._times = array("d", bytes(8 * capacity))
+        self._columns = {name: array("d", bytes(8 * capacity)) for name in self.fields}
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return 8 * self.capacity * (len(self.fields) + 1)
+
+    def append(self, time: float, **values: float) -> None:
+        """Add a sample at epoch ``time``; fields not given are stored as NaN."""
+        if self._size < self.capacity:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._times[slot] = time
+        for name, column in self._columns.items():
+            column[slot] = values.get(name, math.nan)
+
+    def clear(self) -> None:
+        self._start = self._size = 0
+
+    def _ordered(self, column: array) -> array:
+        # At most two slices: the ring from ``_start`` to the end, then the wrap.
+        end = self._start + self._size
+        if end <= self.capacity:
+            return column[self._start:end]
+        return column[self._start:] + column[: end - self.capacity]
+
+    def times(self) -> array:
+        return self._ordered(self._times)
+
+    def values(self, name: str) -> array:
+        """Chronological copy of one field."""
+        return self._ordered(self._columns[name])
+
+    def latest(self, name: str) -> float | None:
+        if not self._size:
+            return None
+        return self._columns[name][(self._start + self._size - 1) % self.capacity]
+
+    def latest_time(self) -> float | None:
+        if not self._size:
+            return None
+        return self._times[(self._start + self._size - 1) % self.capacity]
+
+    def delta(self, name: str, seconds: float) -> float | None:
+        """Latest value minus the value at or before ``seconds`` earlier."""
+        if self._size < 2:
+            return None
+        times = self.times()
+        index = bisect_right(times, times[-1] - seconds) - 1
+        if index < 0:
+            return None
+        values = self.values(name)
+        change = values[-1] - values[index]
+        return None if math.isnan(change) else change
+
+    def min_max(self, name: str, since: float | None = None) -> tuple[float, float] | None:
+        """Range of a field, optionally only over samples at or after epoch ``since``."""
+        values = self.values(name)
+        if since is not None:
+            values = values[bisect_right(self.times(), since - 1e-9):]
+        present = [v for v in values if not math.isnan(v)]
+        return (min(present), max(present)) if present else None
+
+
+class RecentWeather:
+    """In-memory recent history for many cities under one memory budget.
+
+    Each city gets an observation ring and a forecast snapshot. When the
+    total exceeds ``budget_bytes`` the least recently viewed cities are
+    evicted first.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int = 2 * 1024 * 1024,
+        observations_per_city: int = 288,
+        forecast_slots: int = 16,
+    ) -> None:
+        self.budget_bytes = budget_bytes
+        self.observations_per_city = observations_per_city
+        self.forecast_slots = forecast_slots
+        self._observations: OrderedDict[str, RingBuffer] = OrderedDict()
+        self._forecasts: dict[str, RingBuffer] = {}
+        self.city_bytes = 8 * (
+            observations_per_city * (len(OBSERVATION_FIELDS) + 1)
+            + forecast_slots * (len(FORECAST_FIELDS) + 1)
+        )
+        self.evictions = 0
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._observations
+
+    def __len__(self) -> int:
+        return len(self._observations)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(b.nbytes for b in self._observations.values()) + sum(
+            b.nbytes for b in self._forecasts.values()
+        )
+
+    def record(self, weather: WeatherData, air: AirQualityData | None = None) -> None:
+        """Append an observation; repeats of the same upstream reading are ignored."""
+        buffer = self._observations.get(weather.city)
+        if buffer is None:
+            # New cities join as most recently viewed, so they survive the budget check.
+            buffer = RingBuffer(self.observations_per_city, OBSERVATION_FIELDS)
+            self._observations[weather.city] = buffer
+            self._enforce_budget()
+        observed = (weather.observed_at or datetime.now(timezone.utc)).timestamp()
+        latest = buffer.latest_time()
+        if latest is not None and observed <= latest:
+            return
+        buffer.append(
+            observed,
+            temperature=weather.temperature,
+            feels_like=weather.feels_like,
+            humidity=weather.humidity,
+            wind_speed=weather.wind_speed,
+            aqi=air.aqi if air else math.nan,
+        )
+
+    def record_forecast(self, city: str, slots: Sequence[ForecastSlot]) -> None:
+        """Replace the city's forecast snapshot."""
+        if city not in self._observations:
+            return
+        buffer = self._forecasts.get(city)
+        if buffer is None:
+            buffer = self._forecasts[city] = RingBuffer(self.forecast_slots, FORECAST_FIELDS)
+        buffer.clear()
+        for slot in slots[: self.forecast_slots]:
+            buffer.append(slot.time.timestamp(), temperature=slot.temperature, humidity=slot.humidity)
+
+    def view(self, city: str) -> RingBuffer | None:
+        """Observation buffer for ``city``, marking it as recently viewed."""
+        buffer = self._observations.get(city)
+        if buffer is not None:
+            self._observations.move_to_end(city)
+        return buffer
+
+    def peek(self, city: str) -> RingBuffer | None:
+        """Observation buffer for ``city`` without counting it as a view."""
+        return self._observations.get(city)
+
+    def forecast(self, city: str) -> RingBuffer | None:
+        return self._forecasts.get(city)
+
+    def evict(self, city: str) -> None:
+        self._observations.pop(city, None)
+        self._forecasts.pop(city, None)
+
+    def _enforce_budget(self) -> None:
+        # Whole cities (observations plus forecast) are budgeted up front.
+        while len(self._observations) > 1 and len(self._observations) * self.city_bytes > self.budget_bytes:
+            oldest = next(iter(self._observations))
+            self.evict(oldest)
+            self.evictions += 1
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Final, Iterable, Mapping, Sequence
+
+try:
+    from .models import AirQualityData, ForecastSlot, WeatherData
+except ImportError:
+    # Allow running as a script directly
+    from models import AirQualityData, ForecastSlot, WeatherData
+
+NAN: Final[float] = math.nan
+
+# (column, operator, operand). Numeric columns compare with <, <=, >, >=;
+# text columns use "contains" with a tuple of substrings; flags use "is".
+Predicate = tuple[str, str, Any]
+
+
+@dataclass(frozen=True, slots=True)
+class Recommendation:
+    """A tip shown as a chip; ``score`` rates how pleasant the conditions are."""
+
+    title: str
+    subtitle: str
+    color: str
+    score: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    """Declarative recommendation: fires when every predicate in ``when`` holds.
+
+    Within a ``group`` only the first matching rule fires, like an if/elif chain.
+    ``subtitle`` may reference columns, e.g. ``"{feels_like:.0f}°"``.
+    """
+
+    title: str
+    subtitle: str
+    color: str
+    when: tuple[Predicate, ...]
+    group: str | None = None
+    score: int = 0
+
+
+RULES: Final[tuple[Rule, ...]] = (
+    # Temperature
+    Rule("🌡️ Hot day ahead", "Stay hydrated and seek shade", "#FED7D7",
+         (("temperature", ">", 30),), group="temperature", score=-1),
+    Rule("🧥 Bundle up", "Wear warm clothing", "#BEE3F8",
+         (("temperature", "<", 10),), group="temperature", score=-1),
+    # Feels-like difference
+    Rule("🌡️ Feels warmer", "Humidity makes it feel like {feels_like:.0f}°", "#FED7D7",
+         (("feels_delta", ">", 5),)),
+    Rule("❄️ Feels colder", "Wind chill makes it feel like {feels_like:.0f}°", "#BEE3F8",
+         (("feels_delta", "<", -5),)),
+    # Conditions
+    Rule("☔ Bring an umbrella", "Rain expected today", "#BEE3F8",
+         (("description", "contains", ("rain", "drizzle")),), group="condition", score=-2),
+    Rule("☀️ Sunny day", "Don't forget sunscreen", "#FEF5E7",
+         (("description", "contains", ("clear",)), ("daytime", "is", True)), group="condition", score=1),
+    Rule("☁️ Cloudy skies", "Good day for outdoor activities", "#E6FFFA",
+         (("description", "contains", ("cloud",)),), group="condition", score=1),
+    Rule("❄️ Snowy weather", "Drive carefully and dress warmly", "#E6F7FF",
+         (("description", "contains", ("snow",)),), group="condition", score=-2),
+    Rule("⚡ Thunderstorm alert", "Stay indoors if possible", "#FED7D7",
+         (("description", "contains", ("storm", "thunder")),), group="condition", score=-3),
+    # Humidity
+    Rule("💧 High humidity", "May feel muggy outside", "#E6FFFA",
+         (("humidity", ">", 80),), group="humidity", score=-1),
+    Rule("🏜️ Low humidity", "Use moisturizer for dry skin", "#FEF5E7",
+         (("humidity", "<", 30),), group="humidity"),
+    # Wind (m/s or mph depending on units)
+    Rule("💨 Windy conditions", "Secure loose objects", "#E6F7FF",
+         (("wind_speed", ">", 10),), score=-1),
+    # Air quality (OpenWeatherMap 1-5 scale)
+    Rule("😷 Poor air quality", "Limit strenuous outdoor activity", "#FED7D7",
+         (("aqi", ">=", 4),), score=-2),
+    # Time of day
+    Rule("🌙 Evening/Night", "Good time for stargazing", "#E6E6FA",
+         (("night", "is", True), ("description", "contains", ("clear",))), group="night"),
+    Rule("🌙 Evening/Night", "Stay cozy indoors", "#E6E6FA",
+         (("night", "is", True),), group="night"),
+    # Pleasant weather
+    Rule("✨ Perfect weather", "Great day for outdoor activities!", "#C6F6D5",
+         (("temperature", ">=", 18), ("temperature", "<=", 26), ("humidity", "<", 70),
+          ("description", "contains", ("clear",))), score=2),
+)
+
+NUMERIC_COLUMNS: Final[tuple[str, ...]] = (
+    "temperature", "feels_like", "feels_delta", "humidity", "wind_speed", "aqi", "hour",
+)
+TEXT_COLUMNS: Final[tuple[str, ...]] = ("description",)
+FLAG_COLUMNS: Final[tuple[str, ...]] = ("daytime", "night")
+
+
+class ConditionTable:
+    """Columnar view of observations and forecast slots for batch evaluation.
+
+    Missing values (no AQI for a watchlist city, no wind in a forecast slot)
+    are NaN, which fails every numeric comparison.
+    """
+
+    def __init__(self) -> None:
+        self.numeric: dict[str, array] = {name: array("d") for name in NUMERIC_COLUMNS}
+        self.text: dict[str, list[str]] = {name: [] for name in TEXT_COLUMNS}
+        self.flags: dict[str, list[bool]] = {name: [] for name in FLAG_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.text["description"])
+
+    def append(
+        self,
+        temperature: float,
+        feels_like: float,
+        humidity: float,
+        wind_speed: float,
+        aqi: float,
+        description: str,
+        icon: str,
+        local_hour: int,
+    ) -> None:
+        values = {
+            "temperature": temperature,
+            "feels_like": feels_like,
+            "feels_delta": feels_like - temperature,
+            "humidity": humidity,
+            "wind_speed": wind_speed,
+            "aqi": aqi,
+            "hour": local_hour,
+        }
+        for name, column in self.numeric.items():
+            column.append(values[name])
+        self.text["description"].append(description.lower())
+        self.flags["daytime"].append("d" in icon)
+        self.flags["night"].append(local_hour >= 20 or local_hour < 6)
+
+    def add_weather(self, weather: WeatherData, air: AirQualityData | None, now: datetime) -> None:
+        local = now.astimezone(timezone(timedelta(seconds=weather.timezone_offset)))
+        self.append(
+            weather.temperature,
+            weather.feels_like,
+            weather.humidity,
+            weather.wind_speed,
+            air.aqi if air else NAN,
+            weather.description,
+            weather.icon,
+            local.hour,
+        )
+
+    def add_forecast(self, slot: ForecastSlot, timezone_offset: int) -> None:
+        local = slot.time.astimezone(timezone(timedelta(seconds=timezone_offset)))
+        # The forecast has no feels-like value; reuse the temperature so the
+        # feels-like rules stay quiet.
+        self.append(
+            slot.temperature, slot.temperature, slot.humidity, NAN, NAN,
+            slot.description, slot.icon, local.hour,
+        )
+
+    def row_key(self, index: int) -> tuple:
+        """Hashable snapshot of one row, used to memoize its evaluation."""
+        # NaN never equals itself, so missing values are keyed as None.
+        return (
+            tuple(
+                None if math.isnan(value := self.numeric[name][index]) else value
+                for name in NUMERIC_COLUMNS
+            ),
+            tuple(self.text[name][index] for name in TEXT_COLUMNS),
+            tuple(self.flags[name][index] for name in FLAG_COLUMNS),
+        )
+
+    def take(self, indices: Sequence[int]) -> ConditionTable:
+        subset = ConditionTable()
+        for name, column in self.numeric.items():
+            subset.numeric[name] = array("d", (column[i] for i in indices))
+        for name, values in self.text.items():
+            subset.text[name] = [values[i] for i in indices]
+        for name, flags in self.flags.items():
+            subset.flags[name] = [flags[i] for i in indices]
+        return subset
+
+    def row(self, index: int) -> dict[str, Any]:
+        values: dict[str, Any] = {name: column[index] for name, column in self.numeric.items()}
+        values.update((name, column[index]) for name, column in self.text.items())
+        return values
+
+
+def _mask(bits: Iterable[bool]) -> int:
+    """Pack booleans into an int bitmask (bit i is row i)."""
+    mask = 0
+    for i, bit in enumerate(bits):
+        if bit:
+            mask |= 1 << i
+    return mask
+
+
+class RuleEngine:
+    """Evaluates a rule table over a whole :class:`ConditionTable` at once.
+
+    Each distinct predicate is computed once per batch as a row bitmask; a
+    rule is then the AND of its predicate masks and if/elif groups are
+    resolved with a running "already taken" mask. Results are memoized
+    per row, so re-rendering unchanged observations costs a dict lookup.
+    """
+
+    def __init__(self, rules: Sequence[Rule] = RULES, memo_size: int = 4096) -> None:
+        self.rules = tuple(rules)
+        self.memo_size = memo_size
+        self._memo: dict[tuple, tuple[Recommendation, ...]] = {}
+        self._predicates = sorted({p for rule in self.rules for p in rule.when}, key=repr)
+
+    def evaluate(self, table: ConditionTable) -> list[tuple[Recommendation, ...]]:
+        """Return the recommendations for every row, in rule-table order."""
+        keys = [table.row_key(i) for i in range(len(table))]
+        # Taken from the memo up front: filling it below may evict rows of this batch.
+        found = {key: self._memo[key] for key in keys if key in self._memo}
+        missing = [i for i, key in enumerate(keys) if key not in found]
+        if missing:
+            subset = table.take(missing) if len(missing) < len(table) else table
+            for key, result in zip((keys[i] for i in missing), self._evaluate_batch(subset)):
+                found[key] = result
+                if len(self._memo) >= self.memo_size:
+                    self._memo.pop(next(iter(self._memo)))
+                self._memo[key] = result
+        return [found[key] for key in keys]
+
+    def _evaluate_batch(self, table: ConditionTable) -> list[tuple[Recommendation, ...]]:
+        rows = len(table)
+        all_rows = (1 << rows) - 1
+        masks = {predicate: self._predicate_mask(table, predicate) for predicate in self._predicates}
+
+        results: list[list[Recommendation]] = [[] for _ in range(rows)]
+        taken: dict[str, int] = {}
+        for rule in self.rules:
+            mask = all_rows
+            for predicate in rule.when:
+                mask &= masks[predicate]
+            if rule.group is not None:
+                mask &= ~taken.get(rule.group, 0)
+                taken[rule.group] = taken.get(rule.group, 0) | mask
+            while mask:
+                low = mask & -mask
+                index = low.bit_length() - 1
+                mask ^= low
+                subtitle = rule.subtitle.format(**table.row(index)) if "{" in rule.subtitle else rule.subtitle
+                results[index].append(Recommendation(rule.title, subtitle, rule.color, rule.score))
+        return [tuple(result) for result in results]
+
+    @staticmethod
+    def _predicate_mask(table: ConditionTable, predicate: Predicate) -> int:
+        column, op, operand = predicate
+        if op == "contains":
+            return _mask(any(term in text for term in operand) for text in table.text[column])
+        if op == "is":
+            return _mask(flag is operand for flag in table.flags[column])
+        values = table.numeric[column]
+        if op == ">":
+            return _mask(v > operand for v in values)
+        if op == ">=":
+            return _mask(v >= operand for v in values)
+        if op == "<":
+            return _mask(v < operand for v in values)
+        if op == "<=":
+            return _mask(v <= operand for v in values)
+        raise ValueError(f"Unknown operator {op!r} in {predicate!r}")
+
+
+@dataclass(slots=True)
+class Evaluation:
+    """Recommendations for the main city, its forecast and the watchlist."""
+
+    main: tuple[Recommendation, ...] = ()
+    forecast: list[tuple[Recommendation, ...]] = field(default_factory=list)
+    watchlist: dict[str, tuple[Recommendation, ...]] = field(default_factory=dict)
+    best_slot: ForecastSlot | None = None
+
+
+def evaluate_dashboard(
+    engine: RuleEngine,
+    weather: WeatherData | None,
+    air: AirQualityData | None,
+    forecast: Sequence[ForecastSlot],
+    watchlist: Sequence[WeatherData],
+    watch_air: Mapping[str, AirQualityData | None] | None = None,
+    now: datetime | None = None,
+    best_within: timedelta = timedelta(hours=24),
+) -> Evaluation:
+    """Evaluate every known observation and forecast slot in a single batch.
+
+    ``watch_air`` maps watchlist city names to their latest air reading, so
+    air-quality rules apply to watchlist cards too.
+    """
+    now = now or datetime.now(timezone.utc)
+    watch_air = watch_air or {}
+    table = ConditionTable()
+    if weather:
+        table.add_weather(weather, air, now)
+    for city_weather in watchlist:
+        table.add_weather(city_weather, watch_air.get(city_weather.city), now)
+    offset = weather.timezone_offset if weather else 0
+    for slot in forecast:
+        table.add_forecast(slot, offset)
+
+    results = engine.evaluate(table)
+    evaluation = Evaluation()
+    cursor = 0
+    if weather:
+        evaluation.main = results[0]
+        cursor = 1
+    for city_weather in watchlist:
+        evaluation.watchlist[city_weather.city] = results[cursor]
+        cursor += 1
+    evaluation.forecast = results[cursor:]
+
+    # Best time today: the highest-scoring upcoming slot, earliest on ties.
+    best_score = None
+    for slot, recommendations in zip(forecast, evaluation.forecast):
+        if slot.time > now + best_within:
+            break
+        score = sum(r.score for r in recommendations)
+        if best_score is None or score > best_score:
+            best_score, evaluation.best_slot = score, slot
+    return evaluation
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+
+
+@dataclass(slots=True)
+class RefreshJob:
+    """Scheduling state for one refreshable city."""
+
+    key: str
+    due: float
+    visible: bool = True
+    failures: int = 0
+    observed_at: datetime | None = None  # Of the last data fetched
+    wait: float = 0.0  # Last delay before jitter and the hidden factor
+
+
+class RefreshScheduler:
+    """Background loop that refreshes cities as their data goes stale.
+
+    A city is due ``cadence`` seconds after its upstream observation time
+    (OpenWeatherMap publishes roughly every 10 minutes), never sooner than
+    ``min_interval``. A refresh that brings back the same observation doubles
+    the wait, up to ``cadence``, so a provider that publishes late is not
+    polled every ``min_interval``. Cities whose card is off screen wait
+    ``hidden_factor`` times longer, failures back off exponentially up to
+    ``max_backoff``, and every delay is jittered so cities added together
+    drift apart. While paused (window hidden or minimized) nothing is
+    fetched.
+
+    ``refresh(key)`` performs the fetch and returns the observation time of
+    the new data, or ``None`` if unknown.
+    """
+
+    def __init__(
+        self,
+        refresh: Callable[[str], Awaitable[datetime | None]],
+        cadence: float = 10 * 60,
+        min_interval: float = 2 * 60,
+        hidden_factor: float = 3.0,
+        max_backoff: float = 30 * 60,
+        jitter: float = 0.15,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.refresh = refresh
+        self.cadence = cadence
+        self.min_interval = min_interval
+        self.hidden_factor = hidden_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.clock = clock
+        self.jobs: dict[str, RefreshJob] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake = asyncio.Event()
+        self._running = asyncio.Event()
+        self._running.set()
+
+    # ------------------------------------------------------------------ control
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def pause(self) -> None:
+        self._call_in_loop(self._running.clear)
+
+    def resume(self) -> None:
+        self._call_in_loop(self._running.set)
+        self._notify()
+
+    def track(self, key: str, observed_at: datetime | None = None, visible: bool = True) -> None:
+        """Start refreshing ``key``; pass ``observed_at`` if its data was just fetched."""
+        job = self.jobs.get(key)
+        if job is None:
+            job = self.jobs[key] = RefreshJob(key, due=self.clock(), visible=visible)
+        else:
+            job.visible = visible
+        if observed_at is not None:
+            self.mark_fresh(key, observed_at)
+        self._notify()
+
+    def untrack(self, key: str) -> None:
+        self.jobs.pop(key, None)
+        self._notify()
+
+    def set_visible(self, key: str, visible: bool) -> None:
+        job = self.jobs.get(key)
+        if job is None or job.visible == visible:
+            return
+        job.visible = visible
+        if visible:
+            # Data that was fine for an off-screen card may be stale on screen.
+            job.due = min(job.due, self.clock() + self.min_interval)
+            self._notify()
+
+    def mark_fresh(self, key: str, observed_at: datetime | None) -> None:
+        """Record data fetched outside the scheduler (e.g. a manual search)."""
+        job = self.jobs.get(key)
+        if job is None:
+            return
+        job.failures = 0
+        job.due = self._next_due(job, observed_at)
+        self._notify()
+
+    def _notify(self) -> None:
+        self._call_in_loop(self._wake.set)
+
+    def _call_in_loop(self, callback: Callable[[], None]) -> None:
+        # Synchronous Flet handlers run on worker threads; asyncio events must
+        # be set from the loop that waits on them.
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            callback()
+            return
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is loop:
+            callback()
+        else:
+            loop.call_soon_threadsafe(callback)
+
+    # ------------------------------------------------------------------ loop
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        while True:
+            await self._running.wait()
+            job = min(list(self.jobs.values()), key=lambda j: j.due, default=None)
+            delay = None if job is None else job.due - self.clock()
+            if job is None or delay > 0:
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                observed_at = await self.refresh(job.key)
+            except Exception:
+                job.failures += 1
+                backoff = min(self.max_backoff, self.min_interval * 2 ** (job.failures - 1))
+                job.due = self.clock() + self._jittered(backoff)
+            else:
+                job.failures = 0
+                job.due = self._next_due(job, observed_at)
+
+    def _next_due(self, job: RefreshJob, observed_at: datetime | None) -> float:
+        now = self.clock()
+        if observed_at is not None and observed_at == job.observed_at:
+            # Nothing new upstream yet: waiting on the observation age alone
+            # would refetch the same data every min_interval.
+            wait = min(self.cadence, max(self.min_interval, job.wait) * 2)
+        else:
+            age = max(0.0, now - observed_at.timestamp()) if observed_at else 0.0
+            wait = max(self.min_interval, self.cadence - age)
+        job.observed_at, job.wait = observed_at, wait
+        if not job.visible:
+            wait *= self.hidden_factor
+        return now + self._jittered(wait)
+
+    def _jittered(self, seconds: float) -> float:
+        return seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
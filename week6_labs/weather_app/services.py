@@ -1,142 +1,344 @@
 from __future__ import annotations
 
+import asyncio
+import math
 import os
-from datetime import datetime, timezone
-from typing import Final
-
-import httpx
-from dotenv import load_dotenv
+import time
+from copy import copy
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Final, Hashable, Sequence, TypeVar
 
 try:
-    from .models import AirQualityData, WeatherData
+    from .cache import CacheStats, FlightStats, SingleFlight, TTLCache
+    from .geo import CityIndex, geohash
+    from .grid import GridPoint, WeatherGrid
+    from .models import AirQualityData, City, ForecastSlot, WeatherData
+    from .providers import (
+        OpenMeteoProvider,
+        OpenWeatherMapProvider,
+        ProviderError,
+        ProviderHealth,
+        ProviderRouter,
+        WeatherProvider,
+        get_json,
+    )
+    from .transport import HttpClient, RateLimiter, RequestStats
 except ImportError:
     # Allow running as a script directly
-    from models import AirQualityData, WeatherData
+    from cache import CacheStats, FlightStats, SingleFlight, TTLCache
+    from geo import CityIndex, geohash
+    from grid import GridPoint, WeatherGrid
+    from models import AirQualityData, City, ForecastSlot, WeatherData
+    from providers import (
+        OpenMeteoProvider,
+        OpenWeatherMapProvider,
+        ProviderError,
+        ProviderHealth,
+        ProviderRouter,
+        WeatherProvider,
+        get_json,
+    )
+    from transport import HttpClient, RateLimiter, RequestStats
 
-load_dotenv()
+T = TypeVar("T")
 
 
 class WeatherServiceError(Exception):
     """Raised when the weather service fails."""
 
 
+@dataclass(slots=True)
+class ServiceMetrics:
+    """Counters describing how the service used the network and its caches."""
+
+    http: RequestStats = field(default_factory=RequestStats)
+    air_requests: int = 0
+    air_cache: CacheStats = field(default_factory=CacheStats)
+    weather_cache: CacheStats = field(default_factory=CacheStats)
+    forecast_cache: CacheStats = field(default_factory=CacheStats)
+    flights: FlightStats = field(default_factory=FlightStats)
+    providers: dict[str, ProviderHealth] = field(default_factory=dict)
+
+
 class WeatherService:
-    """Wrapper around the OpenWeatherMap REST endpoints."""
+    """Weather facade over pluggable providers with caching and failover.
+
+    One instance may be shared by every session of a web deployment: identical
+    concurrent requests are coalesced, results are cached for all sessions,
+    and an optional ``rate_limit`` caps the upstream request rate.
+    """
 
-    WEATHER_URL: Final[str] = "https://api.openweathermap.org/data/2.5/weather"
-    AIR_URL: Final[str] = "https://api.openweathermap.org/data/2.5/air_pollution"
-    FORECAST_URL: Final[str] = "https://api.openweathermap.org/data/2.5/forecast"
     IPAPI_URL: Final[str] = "http://ip-api.com/json/"
+    LOCATION_TTL: Final[float] = 6 * 60 * 60  # seconds
+    CELL_PRECISION: Final[int] = 6  # ~1 km cells for coordinate weather and forecasts
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        aqi_precision: int = 5,
+        aqi_ttl: float = 30 * 60,
+        weather_ttl: float = 5 * 60,
+        forecast_ttl: float = 30 * 60,
+        hedge_requests: bool = False,
+        rate_limit: float | None = None,
+        http: HttpClient | None = None,
+        providers: Sequence[WeatherProvider] | None = None,
+    ) -> None:
+        # One pooled client for every endpoint; slow calls may be hedged.
+        self.http = http or HttpClient(hedge=hedge_requests, rate_limit=rate_limit)
 
-    def __init__(self, api_key: str | None = None) -> None:
-        self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY")
-        if not self.api_key:
-            raise WeatherServiceError(
-                "Missing API key. Define OPENWEATHER_API_KEY in .env or environment."
-            )
+        if providers is None:
+            self.api_key = api_key or os.getenv("OPENWEATHER_API_KEY")
+            if not self.api_key:
+                # Only parse .env when the environment does not already provide the key.
+                from dotenv import load_dotenv
+
+                load_dotenv()
+                self.api_key = os.getenv("OPENWEATHER_API_KEY")
+            if not self.api_key:
+                raise WeatherServiceError(
+                    "Missing API key. Define OPENWEATHER_API_KEY in .env or environment."
+                )
+            providers = [
+                OpenWeatherMapProvider(self.http, self.api_key),
+                OpenMeteoProvider(self.http),
+            ]
+        self.router = ProviderRouter(providers)
+
+        self.city_index = CityIndex.bundled()
+        self._location: City | None = None
+        self._location_resolved_at = 0.0
+        self._client_locations: TTLCache[str, City] = TTLCache(ttl=self.LOCATION_TTL, max_entries=4096)
+
+        # Air readings are shared by every coordinate inside the same geohash
+        # cell (precision 5 is roughly 5 km x 5 km). Caches are keyed by place
+        # alone so a failover or re-ranking keeps fresh entries usable; each
+        # entry is (name of the provider that served it, value).
+        self.aqi_precision = aqi_precision
+        self._air_cache: TTLCache[str, tuple[str, AirQualityData]] = TTLCache(ttl=aqi_ttl)
+        self._weather_cache: TTLCache[tuple[str, str, str], tuple[str, WeatherData]] = TTLCache(ttl=weather_ttl)
+        self._forecast_cache: TTLCache[tuple[str, str], tuple[str, list[ForecastSlot]]] = TTLCache(
+            ttl=forecast_ttl
+        )
+        self._flights: SingleFlight[Hashable, Any] = SingleFlight()
+
+        self.metrics = ServiceMetrics(
+            http=self.http.stats,
+            air_cache=self._air_cache.stats,
+            weather_cache=self._weather_cache.stats,
+            forecast_cache=self._forecast_cache.stats,
+            flights=self._flights.stats,
+            providers=self.router.health,
+        )
+
+    async def warmup(self) -> None:
+        """Resolve and connect to the preferred provider before the first request."""
+        await self.http.warmup(self.router.ranked()[0].WARMUP_URL)
+
+    async def aclose(self) -> None:
+        """Release pooled connections."""
+        await self.http.aclose()
+
+    async def _call(self, operation: Callable[[WeatherProvider], Awaitable[T]]) -> tuple[str, T]:
+        """Run ``operation`` on the best provider, failing over on upstream errors."""
+        last_error: Exception | None = None
+        rejected: ProviderError | None = None
+        refused: list[WeatherProvider] = []
+        for provider in self.router.ranked():
+            started = time.perf_counter()
+            try:
+                result = await operation(provider)
+            except ProviderError as exc:
+                if not exc.retryable:
+                    # The provider refused the request (a bad key, an unknown
+                    # city); another provider may still answer it.
+                    rejected = rejected or exc
+                    refused.append(provider)
+                    continue
+                last_error = exc
+            except (KeyError, IndexError, TypeError, ValueError) as exc:
+                last_error = ProviderError("Unexpected response from weather provider")
+                last_error.__cause__ = exc
+            else:
+                # Refusing what another provider answers counts against a
+                # provider; a request every provider refuses does not.
+                for refuser in refused:
+                    self.router.record_failure(refuser)
+                self.router.record_success(provider, time.perf_counter() - started)
+                return provider.name, result
+            self.router.record_failure(provider)
+        error = rejected or last_error
+        raise WeatherServiceError(str(error)) from error
 
     async def fetch_weather(self, city: str, units: str = "metric") -> WeatherData:
         """Return normalized weather data for a given city."""
-        params = {"q": city, "appid": self.api_key, "units": units}
+        key = ("name", city.strip().casefold(), units)
 
-        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-            try:
-                resp = await client.get(self.WEATHER_URL, params=params)
-                resp.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                message = exc.response.json().get("message", "Request failed")
-                raise WeatherServiceError(message.title()) from exc
-            except httpx.HTTPError as exc:
-                raise WeatherServiceError("Network error while fetching weather") from exc
-
-        payload = resp.json()
-        sys_data = payload.get("sys", {})
-        coord = payload.get("coord", {})
-
-        return WeatherData(
-            city=payload.get("name", city).strip(),
-            country=sys_data.get("country", ""),
-            temperature=payload["main"]["temp"],
-            feels_like=payload["main"]["feels_like"],
-            description=payload["weather"][0]["description"].title(),
-            humidity=payload["main"]["humidity"],
-            wind_speed=payload["wind"]["speed"],
-            icon=payload["weather"][0]["icon"],
-            sunrise=datetime.fromtimestamp(sys_data["sunrise"], tz=timezone.utc),
-            sunset=datetime.fromtimestamp(sys_data["sunset"], tz=timezone.utc),
-            timezone_offset=payload.get("timezone", 0),
-            latitude=coord.get("lat", 0.0),
-            longitude=coord.get("lon", 0.0),
-        )
+        async def load() -> tuple[str, WeatherData]:
+            provider, weather = await self._call(lambda p: p.weather_by_name(city, units))
+            if not weather.city:
+                weather.city = city.strip()
+            return provider, weather
+
+        return copy(await self._cached_weather(key, load))
+
+    async def fetch_weather_at(self, lat: float, lon: float, units: str = "metric") -> WeatherData:
+        """Return normalized weather data for a coordinate pair."""
+        key = ("at", geohash(lat, lon, self.CELL_PRECISION), units)
+
+        async def load() -> tuple[str, WeatherData]:
+            provider, weather = await self._call(lambda p: p.weather_at(lat, lon, units))
+            if not weather.city:
+                nearest = self.nearest_city(lat, lon)
+                weather.city, weather.country = nearest.name, nearest.country
+            return provider, weather
+
+        return copy(await self._cached_weather(key, load))
+
+    async def _cached_weather(
+        self, key: tuple[str, str, str], load: Callable[[], Awaitable[tuple[str, WeatherData]]]
+    ) -> WeatherData:
+        cached = self._weather_cache.get(key)
+        if cached:
+            return cached[1]
+        reading = await self._flights.run(key, load)
+        self._weather_cache.set(key, reading)
+        return reading[1]
 
     async def fetch_air_quality(self, lat: float, lon: float) -> AirQualityData:
-        """Return air quality data for a coordinate pair."""
-        params = {"lat": lat, "lon": lon, "appid": self.api_key}
+        """Return air quality data for a coordinate pair, reusing nearby readings."""
+        cell = geohash(lat, lon, self.aqi_precision)
+        cached = self._air_cache.get(cell)
+        if cached:
+            return cached[1]
 
-        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-            try:
-                resp = await client.get(self.AIR_URL, params=params)
-                resp.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                message = exc.response.json().get("message", "Request failed")
-                raise WeatherServiceError(message.title()) from exc
-            except httpx.HTTPError as exc:
-                raise WeatherServiceError("Network error while fetching air quality") from exc
-
-        payload = resp.json()
-        record = payload["list"][0]
-        components = record["components"]
-
-        return AirQualityData(
-            aqi=record["main"]["aqi"],
-            co=components.get("co", 0.0),
-            no2=components.get("no2", 0.0),
-            o3=components.get("o3", 0.0),
-            pm2_5=components.get("pm2_5", 0.0),
-            pm10=components.get("pm10", 0.0),
-        )
+        async def load() -> tuple[str, AirQualityData]:
+            self.metrics.air_requests += 1
+            return await self._call(lambda p: p.air_quality(lat, lon))
 
-    async def fetch_hourly_forecast(self, lat: float, lon: float, units: str = "metric") -> list[dict]:
-        """Return hourly forecast for next 24 hours."""
-        params = {"lat": lat, "lon": lon, "appid": self.api_key, "units": units}
+        reading = await self._flights.run(("air", cell), load)
+        self._air_cache.set(cell, reading)
+        return reading[1]
 
-        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
-            try:
-                resp = await client.get(self.FORECAST_URL, params=params)
-                resp.raise_for_status()
-            except httpx.HTTPStatusError as exc:
-                message = exc.response.json().get("message", "Request failed")
-                raise WeatherServiceError(message.title()) from exc
-            except httpx.HTTPError as exc:
-                raise WeatherServiceError("Network error while fetching forecast") from exc
-
-        payload = resp.json()
-        hourly_data = []
-        
-        # OpenWeatherMap 5-day forecast returns data in 3-hour intervals
-        for item in payload["list"][:16]:  # Get next 48 hours (16 * 3 hours)
-            dt = datetime.fromtimestamp(item["dt"], tz=timezone.utc)
-            hourly_data.append({
-                "time": dt.strftime("%I %p"),  # e.g., "03 PM"
-                "temp": item["main"]["temp"],
-                "icon": item["weather"][0]["icon"],
-                "humidity": item["main"]["humidity"],
-                "description": item["weather"][0]["description"].title(),
-            })
-        
-        return hourly_data
-
-    async def get_current_location(self) -> str:
-        """Get current location city name using IP geolocation."""
-        async with httpx.AsyncClient(timeout=httpx.Timeout(10.0)) as client:
+    async def fetch_hourly_forecast(
+        self, lat: float, lon: float, units: str = "metric"
+    ) -> list[ForecastSlot]:
+        """Return the next 48 hours of forecast in 3-hour steps."""
+        key = (geohash(lat, lon, self.CELL_PRECISION), units)
+        cached = self._forecast_cache.get(key)
+        if cached is None:
+
+            async def load() -> tuple[str, list[ForecastSlot]]:
+                return await self._call(lambda p: p.hourly_forecast(lat, lon, units))
+
+            cached = await self._flights.run(("forecast", *key), load)
+            self._forecast_cache.set(key, cached)
+        return list(cached[1])
+
+    async def sweep(
+        self,
+        grid: WeatherGrid,
+        units: str = "metric",
+        concurrency: int = 8,
+        rate_limit: float | None = 5.0,
+        air: bool = True,
+    ) -> AsyncIterator[GridPoint]:
+        """Fill ``grid`` with current conditions, yielding points as they arrive.
+
+        Points falling into the same cache cell are fetched once and cells
+        already cached cost nothing. At most ``concurrency`` cells are in
+        flight and uncached requests are paced to ``rate_limit`` per second.
+        Points whose fetch fails stay NaN in the grid.
+        """
+        cells: dict[str, list[tuple[int, int, float, float]]] = {}
+        for row, col, lat, lon in grid.coordinates():
+            cells.setdefault(geohash(lat, lon, self.CELL_PRECISION), []).append((row, col, lat, lon))
+
+        limiter = RateLimiter(rate_limit, burst=concurrency) if rate_limit else None
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(cell: str, points: list[tuple[int, int, float, float]]) -> list[GridPoint]:
+            _, _, lat, lon = points[0]
+            async with semaphore:
+                if limiter and ("at", cell, units) not in self._weather_cache:
+                    await limiter.acquire()
+                weather = await self.fetch_weather_at(lat, lon, units)
+                aqi = math.nan
+                if air:
+                    if limiter and geohash(lat, lon, self.aqi_precision) not in self._air_cache:
+                        await limiter.acquire()
+                    aqi = (await self.fetch_air_quality(lat, lon)).aqi
+            return [
+                GridPoint(row, col, p_lat, p_lon, weather.temperature, weather.humidity, weather.wind_speed, aqi)
+                for row, col, p_lat, p_lon in points
+            ]
+
+        tasks = [asyncio.ensure_future(fetch(cell, points)) for cell, points in cells.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    points = await next_done
+                except WeatherServiceError:
+                    continue
+                for point in points:
+                    grid.set(point)
+                    yield point
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def remember_location(
+        self, location: City, resolved_at: float | None = None, client_ip: str | None = None
+    ) -> None:
+        """Seed the location cache, e.g. from a position persisted on disk.
+
+        ``client_ip`` keys the entry to one web visitor; without it the entry
+        describes the machine running the app.
+        """
+        if client_ip:
+            self._client_locations.set(client_ip, location)
+            return
+        self._location = location
+        self._location_resolved_at = time.time() if resolved_at is None else resolved_at
+
+    def cached_location(self, client_ip: str | None = None) -> City | None:
+        """Return the last resolved location while it is still within its TTL."""
+        if client_ip:
+            return self._client_locations.get(client_ip)
+        if self._location and time.time() - self._location_resolved_at < self.LOCATION_TTL:
+            return self._location
+        return None
+
+    def nearest_city(self, lat: float, lon: float) -> City:
+        """Name a coordinate using the bundled city index, without any request."""
+        nearest = self.city_index.nearest(lat, lon)
+        if nearest is None:
+            return City(f"{lat:.2f}, {lon:.2f}", "", lat, lon)
+        city, _distance = nearest
+        return City(city.name, city.country, lat, lon)
+
+    async def locate(self, client_ip: str | None = None) -> City:
+        """Return the current position, hitting IP geolocation only on a cache miss.
+
+        The position keeps the detected coordinates and takes its name from
+        the nearest bundled city, so weather can be fetched by coordinates.
+        Pass ``client_ip`` to locate a web visitor instead of this machine.
+        """
+        cached = self.cached_location(client_ip)
+        if cached:
+            return cached
+
+        async def load() -> City:
+            params = {"fields": "status,lat,lon"}
+            url = self.IPAPI_URL + (client_ip or "")
             try:
-                resp = await client.get(self.IPAPI_URL)
-                resp.raise_for_status()
-                data = resp.json()
-                if data.get("status") == "success":
-                    return data.get("city", "")
+                data = await get_json(self.http, url, params, "Network error while detecting location")
+            except ProviderError as exc:
+                raise WeatherServiceError(str(exc)) from exc
+            if data.get("status") != "success":
                 raise WeatherServiceError("Unable to detect location")
-            except httpx.HTTPError as exc:
-                raise WeatherServiceError("Network error while detecting location") from exc
-
+            return self.nearest_city(data["lat"], data["lon"])
 
+        location = await self._flights.run(("locate", client_ip), load)
+        self.remember_location(location, client_ip=client_ip)
+        return location
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import math
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Final, Sequence
+
+# NOAA "General Solar Position Calculations"; good to about a minute away from the poles.
+ZENITH: Final[float] = math.radians(90.833)  # Sun's upper limb on the horizon, with refraction
+DAY_SECONDS: Final[int] = 86_400
+
+
+@dataclass(slots=True)
+class SolarDay:
+    """Sun times for one place and local date; ``None`` during polar day or night."""
+
+    day: date
+    sunrise: datetime | None
+    sunset: datetime | None
+    daylight: timedelta
+
+
+def _day_terms(day: date) -> tuple[float, float]:
+    """Declination (radians) and equation of time (minutes) at noon UTC."""
+    gamma = 2 * math.pi / 365 * (day.timetuple().tm_yday - 1)
+    declination = (
+        0.006918
+        - 0.399912 * math.cos(gamma)
+        + 0.070257 * math.sin(gamma)
+        - 0.006758 * math.cos(2 * gamma)
+        + 0.000907 * math.sin(2 * gamma)
+        - 0.002697 * math.cos(3 * gamma)
+        + 0.00148 * math.sin(3 * gamma)
+    )
+    eqtime = 229.18 * (
+        0.000075
+        + 0.001868 * math.cos(gamma)
+        - 0.032077 * math.sin(gamma)
+        - 0.014615 * math.cos(2 * gamma)
+        - 0.040849 * math.sin(2 * gamma)
+    )
+    return declination, eqtime
+
+
+class SolarTable:
+    """Sunrise and sunset for many places over consecutive days.
+
+    The per-day terms (declination, equation of time) are computed once and
+    shared by every place; each place then only needs its hour angle.
+    Times are stored as epoch seconds in ``cities x days`` ``array('d')``
+    grids, NaN where the sun does not rise or set.
+    """
+
+    def __init__(self, locations: Sequence[tuple[float, float]], start: date, days: int = 1) -> None:
+        if days < 1:
+            raise ValueError("Solar table needs at least one day")
+        self.start = start
+        self.days = days
+        self.locations = list(locations)
+        size = len(self.locations) * days
+        self.sunrise = array("d", [math.nan]) * size
+        self.sunset = array("d", [math.nan]) * size
+        self.daylight = array("d", bytes(8 * size))
+
+        terms = [_day_terms(start + timedelta(days=d)) for d in range(days)]
+        cos_zenith = math.cos(ZENITH)
+        midnight = datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp()
+        for row, (lat, lon) in enumerate(self.locations):
+            phi = math.radians(lat)
+            cos_phi, tan_phi = math.cos(phi), math.tan(phi)
+            for d, (declination, eqtime) in enumerate(terms):
+                index = row * days + d
+                cos_ha = cos_zenith / (cos_phi * math.cos(declination)) - tan_phi * math.tan(declination)
+                if cos_ha >= 1:
+                    continue  # Polar night: daylight stays 0
+                if cos_ha <= -1:
+                    self.daylight[index] = DAY_SECONDS  # Polar day
+                    continue
+                hour_angle = math.degrees(math.acos(cos_ha))
+                # Minutes after UTC midnight of the date; negative means the previous UTC day.
+                noon = 720 - 4 * lon - eqtime
+                base = midnight + d * DAY_SECONDS
+                self.sunrise[index] = base + 60 * (noon - 4 * hour_angle)
+                self.sunset[index] = base + 60 * (noon + 4 * hour_angle)
+                self.daylight[index] = 480 * hour_angle
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def day(self, row: int, offset: int = 0) -> SolarDay:
+        index = row * self.days + offset
+        return SolarDay(
+            self.start + timedelta(days=offset),
+            _datetime(self.sunrise[index]),
+            _datetime(self.sunset[index]),
+            timedelta(seconds=self.daylight[index]),
+        )
+
+
+def _datetime(epoch: float) -> datetime | None:
+    return None if math.isnan(epoch) else datetime.fromtimestamp(epoch, tz=timezone.utc)
+
+
+def solar_day(lat: float, lon: float, day: date) -> SolarDay:
+    return SolarTable([(lat, lon)], day).day(0)
+
+
+def next_event(lat: float, lon: float, now: datetime, tz: timezone) -> tuple[str, datetime] | None:
+    """The next sunrise or sunset after ``now``, or ``None`` if neither occurs within two days."""
+    table = SolarTable([(lat, lon)], now.astimezone(tz).date() - timedelta(days=1), days=4)
+    stamp = now.timestamp()
+    for offset in range(table.days):
+        for name, times in (("sunrise", table.sunrise), ("sunset", table.sunset)):
+            if times[offset] > stamp:
+                return name, datetime.fromtimestamp(times[offset], tz=timezone.utc)
+    return None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Final
+
+PROFILE_ENV: Final[str] = "WEATHER_APP_PROFILE"  # Set to print the phase report on first data
+IMPORT_BUDGET_MS: Final[float] = 50.0  # Self time of the app's own modules, excluding libraries
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class StartupTimer:
+    """Wall-clock marks for the phases of a cold start, relative to ``origin``."""
+
+    def __init__(self, origin: float | None = None) -> None:
+        self.origin = time.perf_counter() if origin is None else origin
+        self.phases: dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """Record ``phase`` the first time it is reached; repeats are ignored."""
+        if phase not in self.phases:
+            self.phases[phase] = time.perf_counter() - self.origin
+
+    def report(self) -> str:
+        lines = ["Startup phases (ms since launch):"]
+        previous = 0.0
+        for phase, at in self.phases.items():
+            lines.append(f"  {phase:<12} {at * 1000:8.1f}  (+{(at - previous) * 1000:.1f})")
+            previous = at
+        return "\n".join(lines)
+
+    def print_if_enabled(self) -> None:
+        if os.getenv(PROFILE_ENV):
+            print(self.report())
+
+
+def import_times(module: str = "weather_app.main") -> dict[str, int]:
+    """Run ``python -X importtime`` and sum self time (us) per top-level package."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    totals: dict[str, int] = defaultdict(int)
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            totals[match.group(4).split(".")[0]] += int(match.group(1))
+    return dict(totals)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time report for the weather app")
+    parser.add_argument("--top", type=int, default=12, help="packages to list")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    totals = import_times()
+    total_ms = sum(totals.values()) / 1000
+    print(f"{'package':<24} {'self ms':>9} {'share':>7}")
+    for package, micros in sorted(totals.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{package:<24} {micros / 1000:9.1f} {micros / 1000 / total_ms:7.1%}")
+    own_ms = totals.get("weather_app", 0) / 1000
+    print(f"{'total':<24} {total_ms:9.1f}")
+    print(f"weather_app modules: {own_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    return 0 if own_ms <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import httpx
+
+
+@dataclass(slots=True)
+class RequestStats:
+    """Counters for requests sent by an :class:`HttpClient`."""
+
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    throttled: int = 0
+    not_modified: int = 0
+    bytes_received: int = 0
+    bytes_saved: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedges / self.requests if self.requests else 0.0
+
+
+@dataclass(slots=True)
+class Validators:
+    """Cache validators of the last full response for one request."""
+
+    etag: str | None
+    last_modified: str | None
+    response: httpx.Response
+
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class LatencyTracker:
+    """Sliding window of response times used to learn percentile thresholds."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the ``q`` quantile (0-1), or ``None`` until enough samples exist."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second with bursts of ``burst``."""
+
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> bool:
+        """Take one token, sleeping until one is available; ``True`` if it had to wait."""
+        async with self._lock:
+            waited = False
+            while True:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                waited = True
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HttpClient:
+    """Pooled async HTTP client with optional request hedging.
+
+    With hedging enabled, a GET that has not answered within the learned
+    ``hedge_percentile`` latency is duplicated and the first response wins.
+    Duplicates are capped at ``hedge_budget`` of all requests so a slow
+    upstream is never hit with twice the traffic. An optional ``rate_limit``
+    (requests per second) throttles everything sent, hedges included.
+
+    Responses carrying an ``ETag`` or ``Last-Modified`` header are remembered
+    and later requests are made conditional; a ``304 Not Modified`` answer is
+    replaced by the remembered response, so callers never see it.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.95,
+        hedge_budget: float = 0.05,
+        min_hedge_delay: float = 0.05,
+        rate_limit: float | None = None,
+        rate_burst: int = 10,
+        max_validators: int = 256,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_budget = hedge_budget
+        self.min_hedge_delay = min_hedge_delay
+        self.latency = LatencyTracker()
+        self.stats = RequestStats()
+        self.limiter = RateLimiter(rate_limit, rate_burst) if rate_limit else None
+        self.max_validators = max_validators
+        self._validators: OrderedDict[tuple, Validators] = OrderedDict()
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._client_loop: asyncio.AbstractEventLoop | None = None
+        self._warmed: set[str] = set()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # A client's connection pool belongs to the loop that created it.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout), transport=self._transport
+            )
+            self._client_loop = loop
+            self._warmed.clear()
+        return self._client
+
+    async def warmup(self, url: str) -> None:
+        """Resolve DNS and open a pooled (TLS) connection to ``url``'s host ahead of use.
+
+        Only the first call per host and client does anything, so sessions
+        sharing a client do not each pay for a request.
+        """
+        client = self._get_client()
+        host = httpx.URL(url).host
+        if host in self._warmed:
+            return
+        self._warmed.add(host)
+        try:
+            await client.head(url)
+        except httpx.HTTPError:
+            pass  # The real request will report any problem
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get(self, url: str, params: dict[str, Any] | None = None) -> httpx.Response:
+        """Send a GET request, conditional when possible and hedged if slow."""
+        key = (url, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        cached = self._validators.get(key)
+        headers = cached.headers() if cached else None
+        response = await self._hedged(url, params, headers)
+
+        if response.status_code == 304 and cached is not None:
+            self._validators.move_to_end(key)
+            self.stats.not_modified += 1
+            self.stats.bytes_saved += len(cached.response.content)
+            return cached.response
+
+        self.stats.bytes_received += len(response.content)
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            self._validators[key] = Validators(etag, last_modified, response)
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.max_validators:
+                self._validators.popitem(last=False)
+        return response
+
+    async def _hedged(
+        self, url: str, params: dict[str, Any] | None, headers: dict[str, str] | None
+    ) -> httpx.Response:
+        self.stats.requests += 1
+        delay = self._hedge_delay()
+        primary = asyncio.create_task(self._send(url, params, headers))
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not self._hedge_allowed():
+            return await primary
+
+        self.stats.hedges += 1
+        hedge = asyncio.create_task(self._send(url, params, headers))
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        assert error is not None
+        raise error
+
+    async def _send(
+        self, url: str, params: dict[str, Any] | None, headers: dict[str, str] | None
+    ) -> httpx.Response:
+        if self.limiter is not None and await self.limiter.acquire():
+            self.stats.throttled += 1
+        started = time.perf_counter()
+        response = await self._get_client().get(url, params=params, headers=headers)
+        self.latency.record(time.perf_counter() - started)
+        return response
+
+    def _hedge_delay(self) -> float | None:
+        if not self.hedge:
+            return None
+        threshold = self.latency.percentile(self.hedge_percentile)
+        if threshold is None:
+            return None
+        return max(threshold, self.min_hedge_delay)
+
+    def _hedge_allowed(self) -> bool:
+        return self.stats.hedges + 1 <= self.hedge_budget * self.stats.requests